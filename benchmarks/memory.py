@@ -0,0 +1,111 @@
+"""Memory of a full ``score`` pipeline (load, column lineage, scoring), as listed in the README.
+
+Each run is measured with ``tracemalloc`` in a fresh process, with ``--jobs 1`` and no analysis
+cache. "Steady state" is what stays allocated after scoring while the project is still held.
+
+    python -m benchmarks.memory                  # examples/sample_project and a synthetic 20,000 x 10 project
+    python -m benchmarks.memory --models 2000    # a smaller synthetic project
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import tempfile
+import tracemalloc
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Tuple
+
+from modaryn.analyzers.lineage import LineageAnalyzer
+from modaryn.loaders.manifest import ManifestLoader
+from modaryn.scorers.score import Scorer
+
+SAMPLE_PROJECT = Path(__file__).resolve().parent.parent / "examples" / "sample_project"
+MIB = 1024 * 1024
+
+
+def write_synthetic_project(root: Path, models: int, columns: int) -> Path:
+    """Writes a compiled dbt project of ``models`` models with ``columns`` columns each.
+
+    The first ten models are roots; of the rest, 40% are passthrough selects of one parent and
+    60% join two parents.
+    """
+    names = [f"c{j}" for j in range(columns)]
+    compiled = root / "target" / "compiled" / "synthetic" / "models"
+    compiled.mkdir(parents=True)
+    (root / "dbt_project.yml").write_text("name: synthetic\n")
+    nodes = {}
+    for i in range(models):
+        name = f"m{i}"
+        if i < 10:
+            parents = []
+            sql = "select " + ", ".join(f"{j} as {c}" for j, c in enumerate(names))
+        elif i % 5 < 2:
+            parents = [f"m{i - 1}"]
+            sql = f"select {', '.join(names)} from {parents[0]}"
+        else:
+            parents = [f"m{i - 1}", f"m{i // 2}"]
+            half = columns // 2
+            selected = [f"a.{c}" for c in names[:half]] + [f"b.{c}" for c in names[half:]]
+            sql = f"select {', '.join(selected)} from {parents[0]} as a join {parents[1]} as b on a.c0 = b.c0"
+        (compiled / f"{name}.sql").write_text(sql)
+        nodes[f"model.synthetic.{name}"] = {
+            "resource_type": "model",
+            "name": name,
+            "path": f"{name}.sql",
+            "tags": [],
+            "columns": {c: {"name": c, "description": ""} for c in names},
+            "depends_on": {"nodes": [f"model.synthetic.{p}" for p in parents]},
+        }
+    manifest = {"metadata": {"adapter_type": "duckdb"}, "nodes": nodes}
+    (root / "target" / "manifest.json").write_text(json.dumps(manifest))
+    return root
+
+
+def measure(project_path: Path, compact: bool) -> Tuple[int, int]:
+    """Runs load, lineage and scoring on ``project_path``; returns (steady state, peak) bytes."""
+    tracemalloc.start()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        loader = ManifestLoader(project_path, compact=compact)
+        project = loader.load()
+        analyzer = LineageAnalyzer(dialect=loader.dialect, parse_cache=loader.parse_cache)
+        analyzer.analyze(project, reuse=loader.lineage_reuse)
+        if compact:
+            project.release_sql()
+        Scorer().score_project(project)
+    del loader, analyzer
+    gc.collect()
+    steady, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return steady, peak
+
+
+def measure_in_fresh_process(project_path: Path, compact: bool) -> Tuple[int, int]:
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(measure, project_path, compact).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=20_000, help="Models in the synthetic project (0 to skip it).")
+    parser.add_argument("--columns", type=int, default=10, help="Columns per synthetic model.")
+    args = parser.parse_args()
+
+    print("| Project | Run | Steady state | Peak |")
+    print("|---|---|---|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        projects = [("`examples/sample_project`", SAMPLE_PROJECT)]
+        if args.models:
+            label = f"synthetic, {args.models:,} models × {args.columns} columns"
+            projects.append((label, write_synthetic_project(Path(tmp), args.models, args.columns)))
+        for label, project_path in projects:
+            for compact in (False, True):
+                steady, peak = measure_in_fresh_process(project_path, compact)
+                run = "`--compact`" if compact else "default"
+                print(f"| {label} | {run} | {steady / MIB:.1f} MiB | {peak / MIB:.1f} MiB |", flush=True)
+
+
+if __name__ == "__main__":
+    main()
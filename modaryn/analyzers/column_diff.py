@@ -0,0 +1,238 @@
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.optimizer.scope import Scope, build_scope, find_all_in_scope
+
+from modaryn.analyzers.impact import ColumnKey
+from modaryn.domain.model import DbtProject
+from modaryn.loaders.state import sql_hash
+
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+
+
+def column_fingerprints(sql: str, dialect: str) -> Optional[Dict[str, str]]:
+    """Hashes what every output column of ``sql`` computes, keyed by lowercased column name.
+
+    A column's hash covers its normalized projection expression, the projections it reads in
+    CTEs and derived tables, and the row context (FROM, JOIN, WHERE, GROUP BY, ...) of every scope
+    on the way, so formatting and comments do not count as changes while a new filter changes
+    every column. Returns None when the output columns cannot be enumerated (a parse failure or a
+    top-level ``SELECT *``); callers then treat every column as modified.
+    """
+    try:
+        root = build_scope(sqlglot.parse_one(sql, read=dialect))
+    except Exception:
+        return None
+    if root is None:
+        return None
+    selects = root.expression.selects
+    if any(select.is_star for select in selects):
+        return None
+    fingerprinter = _Fingerprinter(dialect)
+    fingerprints = {}
+    for index, select in enumerate(selects):
+        fingerprints.setdefault(select.alias_or_name.lower(), fingerprinter.column(root, index))
+    return fingerprints
+
+
+class _Fingerprinter:
+    def __init__(self, dialect: str):
+        self.dialect = dialect
+        self._columns: Dict[Tuple[int, Union[str, int]], str] = {}
+        self._rows: Dict[int, str] = {}
+        # Guards against self-referencing (recursive) CTEs.
+        self._active: Set[Tuple[int, Union[str, int]]] = set()
+
+    def column(self, scope: Scope, column: Union[str, int]) -> str:
+        key = (id(scope), column)
+        if key in self._columns:
+            return self._columns[key]
+        if key in self._active:
+            return "cycle"
+        self._active.add(key)
+        try:
+            fingerprint = self._column(scope, column)
+        finally:
+            self._active.discard(key)
+        self._columns[key] = fingerprint
+        return fingerprint
+
+    def _column(self, scope: Scope, column: Union[str, int]) -> str:
+        expression = scope.expression
+        if isinstance(expression, exp.Subquery):
+            return _digest("subquery", *(self.column(source, column) for source in scope.subquery_scopes))
+
+        if isinstance(expression, exp.SetOperation):
+            index = column if isinstance(column, int) else next(
+                (i for i, select in enumerate(expression.selects) if select.alias_or_name.lower() == column.lower()), None
+            )
+            if index is None:
+                return _digest("missing", str(column))
+            return _digest(
+                type(expression).__name__,
+                str(bool(expression.args.get("distinct"))),
+                *(self.column(union_scope, index) for union_scope in scope.union_scopes),
+            )
+
+        if isinstance(column, int):
+            select = expression.selects[column] if column < len(expression.selects) else None
+        else:
+            select = next((s for s in expression.selects if s.alias_or_name.lower() == column.lower()), None)
+        if select is None or select.is_star:
+            # The column comes through a star: it is whatever the sources provide under that name.
+            name = column if isinstance(column, str) else ""
+            return _digest("star", self.row_context(scope), *(self._source_column(scope, None, name)))
+
+        inputs = [self._source_column(scope, c.table, c.name) for c in find_all_in_scope(select, exp.Column)]
+        return _digest(
+            "select",
+            self._normalize(select.unalias()),
+            self.row_context(scope),
+            *(part for parts in inputs for part in parts),
+        )
+
+    def row_context(self, scope: Scope) -> str:
+        """What decides the rows of ``scope``: every clause but the projections, plus its sources' rows."""
+        if id(scope) in self._rows:
+            return self._rows[id(scope)]
+        self._rows[id(scope)] = "cycle"
+        expression = scope.expression
+        if isinstance(expression, exp.Select):
+            stripped = expression.copy()
+            stripped.set("expressions", [exp.Star()])
+            # CTE bodies are reached through the columns and sources that use them ("with_" in newer sqlglot).
+            for key in ("with", "with_"):
+                if stripped.args.get(key) is not None:
+                    stripped.set(key, None)
+            parts = [self._normalize(stripped)]
+            # Columns read by joins, filters and grouping shape the rows of every output column.
+            for clause in ("joins", "where", "group", "having", "qualify", "order", "distinct"):
+                value = expression.args.get(clause)
+                for node in value if isinstance(value, list) else [value] if value is not None else []:
+                    for c in node.find_all(exp.Column):
+                        parts.extend(self._source_column(scope, c.table, c.name))
+            for source in scope.sources.values():
+                if isinstance(source, Scope):
+                    parts.append(self.row_context(source))
+            fingerprint = _digest("rows", *parts)
+        else:
+            fingerprint = _digest("rows", self._normalize(expression))
+        self._rows[id(scope)] = fingerprint
+        return fingerprint
+
+    def _source_column(self, scope: Scope, table: str, name: str) -> List[str]:
+        """Fingerprints of whatever ``table.name`` (or an unqualified ``name``) reads in ``scope``."""
+        if table:
+            candidates = {table: scope.sources.get(table)}
+        else:
+            candidates = dict(scope.sources)
+        parts = []
+        for alias, source in sorted(candidates.items()):
+            if isinstance(source, Scope):
+                names = {s.alias_or_name.lower() for s in source.expression.selects}
+                if table or name.lower() in names or source.expression.is_star:
+                    parts.append(self.column(source, name))
+            elif isinstance(source, exp.Table):
+                parts.append(_digest("table", exp.table_name(source, dialect=self.dialect).lower(), name.lower()))
+            else:
+                parts.append(_digest("unknown", alias or "", name.lower()))
+        return parts
+
+    def _normalize(self, expression: exp.Expression) -> str:
+        return expression.sql(dialect=self.dialect, normalize=True, comments=False)
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ColumnChange:
+    model_id: str
+    column: str
+    kind: str  # ADDED, REMOVED or MODIFIED
+
+
+@dataclass
+class ProjectDiff:
+    """Column-level differences between a previous manifest and the current project."""
+    changes: List[ColumnChange] = field(default_factory=list)
+    new_models: List[str] = field(default_factory=list)
+    removed_models: List[str] = field(default_factory=list)
+    # Models in both manifests whose checksum or compiled SQL differs; only these are parsed.
+    modified_models: List[str] = field(default_factory=list)
+    # Modified models whose output columns could not be compared: all their columns count as modified.
+    uncompared_models: List[str] = field(default_factory=list)
+
+    def columns(self, *kinds: str) -> List[ColumnKey]:
+        return [(change.model_id, change.column) for change in self.changes if change.kind in kinds]
+
+
+def modified_models(
+    project: DbtProject,
+    previous_models: Dict[str, Tuple[str, Tuple[str, ...]]],
+    previous_sql_hashes: Optional[Dict[str, str]] = None,
+) -> List[str]:
+    """Models in both manifests whose checksum differs, or whose compiled SQL differs from ``previous_sql_hashes``."""
+    modified = []
+    for unique_id, model in project.models.items():
+        previous = previous_models.get(unique_id)
+        if previous is None:
+            continue
+        stored_hash = (previous_sql_hashes or {}).get(unique_id)
+        if previous[0] != model.checksum or (stored_hash is not None and stored_hash != sql_hash(model.compiled_sql)):
+            modified.append(unique_id)
+    return modified
+
+
+def diff_project(
+    project: DbtProject,
+    previous_models: Dict[str, Tuple[str, Tuple[str, ...]]],
+    previous_sql: Dict[str, str],
+    dialect: str,
+    previous_sql_hashes: Optional[Dict[str, str]] = None,
+) -> ProjectDiff:
+    """Compares ``project`` with a previous manifest, column by column.
+
+    ``previous_models`` is ``{unique_id: (checksum, declared columns)}`` (see
+    ``read_previous_models``) and ``previous_sql`` the previous compiled SQL of the
+    ``modified_models``; only those are parsed. ``previous_sql_hashes`` are the compiled SQL
+    hashes of a ``modaryn_state.json``, when available, to catch compiled SQL that changed
+    without a checksum change (e.g. a macro edit). Column names follow the declared names where
+    a column is documented.
+    """
+    diff = ProjectDiff(modified_models=modified_models(project, previous_models, previous_sql_hashes))
+    for unique_id, model in project.models.items():
+        if unique_id not in previous_models:
+            diff.new_models.append(unique_id)
+            diff.changes.extend(ColumnChange(unique_id, name, ADDED) for name in model.columns)
+
+    for unique_id in diff.modified_models:
+        model = project.models[unique_id]
+        old_names = {name.lower(): name for name in previous_models[unique_id][1]}
+        new_names = {name.lower(): name for name in model.columns}
+        old_sql = previous_sql.get(unique_id)
+        old = column_fingerprints(old_sql, dialect) if old_sql else None
+        new = column_fingerprints(model.compiled_sql, dialect) if model.compiled_sql and model.language == "sql" else None
+        if old is None or new is None:
+            diff.uncompared_models.append(unique_id)
+            old, new = dict.fromkeys(old_names, "?"), dict.fromkeys(new_names, "")
+        for name in new:
+            if name not in old:
+                diff.changes.append(ColumnChange(unique_id, new_names.get(name, name), ADDED))
+            elif old[name] != new[name]:
+                diff.changes.append(ColumnChange(unique_id, new_names.get(name, name), MODIFIED))
+        for name in old:
+            if name not in new:
+                diff.changes.append(ColumnChange(unique_id, old_names.get(name, name), REMOVED))
+
+    for unique_id, (_, columns) in previous_models.items():
+        if unique_id not in project.models:
+            diff.removed_models.append(unique_id)
+            diff.changes.extend(ColumnChange(unique_id, name, REMOVED) for name in columns)
+    return diff
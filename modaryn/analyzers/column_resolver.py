@@ -0,0 +1,240 @@
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+from sqlglot import exp
+from sqlglot.optimizer.scope import Scope, find_all_in_scope
+from sqlglot.schema import normalize_name
+
+# (table name, column name), both lowercased and unquoted.
+SourcePair = Tuple[str, str]
+# (scope, projected column name or positional index for set operations)
+_Key = Tuple[int, Union[str, int]]
+
+
+@dataclass
+class ResolutionStats:
+    """How many normalized spellings were tried before a column matched a model's output."""
+    attempts: Dict[int, int] = field(default_factory=dict)
+    unresolved: int = 0
+    # Models resolved straight from their projection list (see passthrough_sources).
+    passthrough_models: int = 0
+
+    def record(self, attempts: Optional[int]):
+        if attempts is None:
+            self.unresolved += 1
+        else:
+            self.attempts[attempts] = self.attempts.get(attempts, 0) + 1
+
+    def merge(self, other: "ResolutionStats"):
+        for attempts, count in other.attempts.items():
+            self.attempts[attempts] = self.attempts.get(attempts, 0) + count
+        self.unresolved += other.unresolved
+        self.passthrough_models += other.passthrough_models
+
+    @property
+    def resolved(self) -> int:
+        return sum(self.attempts.values())
+
+    @property
+    def retried(self) -> int:
+        """Columns that needed more than one spelling."""
+        return sum(count for attempts, count in self.attempts.items() if attempts > 1)
+
+
+def node_source(name: str, expression: Optional[exp.Expression]) -> Optional[SourcePair]:
+    """Reads the ``(table, column)`` a lineage node points at from its name and expression.
+
+    Table expressions give the physical table; otherwise a dotted ``table.column`` name is used.
+    """
+    if isinstance(expression, exp.Table):
+        table_id_raw = expression.this
+        if hasattr(table_id_raw, 'name'):
+            table_name = table_id_raw.name.lower().strip('"`')
+        else:
+            table_name = str(table_id_raw).lower().strip('"`')
+        return table_name, name.split('.')[-1].lower().strip('"`')
+    if '.' in name:
+        parts = name.split('.')
+        return parts[-2].lower().strip('"`'), parts[-1].lower().strip('"`')
+    return None
+
+
+class OutputNamespace:
+    """A model's normalized output column names, computed once, with their case folds."""
+
+    def __init__(self, names: Iterable[str], dialect: str):
+        self.dialect = dialect
+        self._projected = set(names)
+        self._casefolded: Dict[str, List[str]] = {}
+        for name in self._projected:
+            self._casefolded.setdefault(name.lower(), []).append(name)
+
+    def find(self, column_name: str) -> Tuple[Optional[str], int]:
+        """Matches a declared column name against the output names.
+
+        Tries the dialect's case folding of the bare name, then the exact (quoted) spelling, then a
+        unique case-insensitive match. Returns ``(projected name or None, spellings tried)``.
+        """
+        bare = normalize_name(exp.to_identifier(column_name), dialect=self.dialect).name
+        quoted = normalize_name(exp.to_identifier(column_name, quoted=True), dialect=self.dialect).name
+        # BigQuery models conventionally quote with backticks, so the exact spelling goes first there.
+        candidates = [quoted, bare] if self.dialect == "bigquery" else [bare, quoted]
+        tried = 0
+        for candidate in dict.fromkeys(candidates):
+            tried += 1
+            if candidate in self._projected:
+                return candidate, tried
+        tried += 1
+        matches = self._casefolded.get(column_name.lower(), [])
+        if len(matches) == 1:
+            return matches[0], tried
+        return None, tried
+
+
+class ModelColumnResolver:
+    """Traces every projected column of a qualified query through its scopes in one pass.
+
+    Mirrors the lineage graph ``sqlglot.lineage.lineage`` builds for a single column, but walks
+    it iteratively and memoizes each ``(scope, column)`` sub-result, so columns that share CTEs or
+    derived tables are only traced once per model. Results are the ``(table, column)`` pairs of
+    every node reachable from the output column, as read by ``node_source``.
+    """
+
+    def __init__(self, root: Scope, dialect: str):
+        self.root = root
+        self.dialect = dialect
+        self._memo: Dict[_Key, FrozenSet[SourcePair]] = {}
+        self._children: Dict[_Key, List[Tuple[Optional[Scope], Union[str, int], Optional[SourcePair]]]] = {}
+        self._scopes: Dict[int, Scope] = {}
+        self.namespace = OutputNamespace([select.alias_or_name for select in root.expression.selects], dialect)
+
+    def resolve(self, column: str) -> FrozenSet[SourcePair]:
+        return self._resolve(self.root, column)
+
+    def _resolve(self, scope: Scope, column: Union[str, int]) -> FrozenSet[SourcePair]:
+        root_key = (id(scope), column)
+        self._scopes[id(scope)] = scope
+        stack = [root_key]
+        in_progress: Set[_Key] = set()
+
+        while stack:
+            key = stack[-1]
+            if key in self._memo:
+                stack.pop()
+                continue
+            if key not in in_progress:
+                in_progress.add(key)
+                children = self._expand(self._scopes[key[0]], key[1])
+                self._children[key] = children
+                unresolved = []
+                for child_scope, child_column, _ in children:
+                    if child_scope is None:
+                        continue
+                    child_key = (id(child_scope), child_column)
+                    self._scopes[id(child_scope)] = child_scope
+                    if child_key not in self._memo and child_key not in in_progress:
+                        unresolved.append(child_key)
+                if unresolved:
+                    stack.extend(unresolved)
+                    continue
+
+            # Every child is resolved (or part of a cycle, which contributes nothing further).
+            result: Set[SourcePair] = set()
+            for child_scope, child_column, pair in self._children.pop(key):
+                if pair is not None:
+                    result.add(pair)
+                if child_scope is not None:
+                    result.update(self._memo.get((id(child_scope), child_column), ()))
+            self._memo[key] = frozenset(result)
+            in_progress.discard(key)
+            stack.pop()
+
+        return self._memo[root_key]
+
+    def _expand(self, scope: Scope, column: Union[str, int]) -> List[Tuple[Optional[Scope], Union[str, int], Optional[SourcePair]]]:
+        """Lists the lineage children of ``column`` in ``scope``.
+
+        Each child is ``(scope to recurse into or None, column there, pair contributed by the node)``.
+        """
+        expression = scope.expression
+        children: List[Tuple[Optional[Scope], Union[str, int], Optional[SourcePair]]] = []
+
+        if isinstance(expression, exp.Subquery):
+            for source in scope.subquery_scopes:
+                return [(source, column, None)]
+            return children
+
+        if isinstance(expression, exp.SetOperation):
+            if isinstance(column, int):
+                index = column
+            else:
+                index = next(
+                    (i for i, select in enumerate(expression.selects) if select.alias_or_name == column or select.is_star),
+                    -1,
+                )
+            if index == -1:
+                raise ValueError(f"Could not find {column} in {expression}")
+            return [(union_scope, index, None) for union_scope in scope.union_scopes]
+
+        if isinstance(column, int):
+            select = expression.selects[column]
+        else:
+            select = next(
+                (select for select in expression.selects if select.alias_or_name == column),
+                exp.Star() if expression.is_star else expression,
+            )
+
+        subquery_scopes = {id(subquery_scope.expression): subquery_scope for subquery_scope in scope.subquery_scopes}
+        for subquery in find_all_in_scope(select, exp.UNWRAPPED_QUERIES):
+            subquery_scope = subquery_scopes.get(id(subquery))
+            if subquery_scope:
+                for name in subquery.named_selects:
+                    children.append((subquery_scope, name, None))
+
+        source_columns = list(find_all_in_scope(select, exp.Column))
+        if isinstance(expression, exp.UDTF):
+            source_columns.extend(expression.find_all(exp.Column))
+
+        pivots = scope.pivots
+        pivot = pivots[0] if len(pivots) == 1 and not pivots[0].unpivot else None
+        pivot_column_mapping = {}
+        if pivot:
+            pivot_columns = pivot.args["columns"]
+            pivot_aggs_count = len(pivot.expressions)
+            for i, agg in enumerate(pivot.expressions):
+                agg_cols = list(agg.find_all(exp.Column))
+                for col_index in range(i, len(pivot_columns), pivot_aggs_count):
+                    pivot_column_mapping[pivot_columns[col_index].name] = agg_cols
+
+        for c in source_columns:
+            table = c.table
+            source = scope.sources.get(table)
+            if isinstance(source, Scope):
+                children.append((source, c.name, self._scope_node_pair(source, table, c.name)))
+            elif pivot and pivot.alias_or_name == c.table:
+                if c.name in pivot_column_mapping:
+                    downstream_columns = pivot_column_mapping[c.name]
+                else:
+                    downstream_columns = [exp.column(c.this, table=pivot.parent.alias_or_name)]
+                for downstream_column in downstream_columns:
+                    downstream_source = scope.sources.get(downstream_column.table)
+                    if isinstance(downstream_source, Scope):
+                        children.append((
+                            downstream_source,
+                            downstream_column.name,
+                            self._scope_node_pair(downstream_source, downstream_column.table, downstream_column.name),
+                        ))
+                    else:
+                        children.append((None, "", node_source(downstream_column.sql(comments=False), downstream_source)))
+            else:
+                # Reached a physical table (or an unknown source): a leaf of the lineage graph.
+                children.append((None, "", node_source(c.sql(comments=False), source)))
+        return children
+
+    @staticmethod
+    def _scope_node_pair(source: Scope, scope_name: str, column: str) -> Optional[SourcePair]:
+        # lineage() names the node for a nested scope "<scope_name>.<column>", except when the scope
+        # is a wrapper (subquery or set operation) that forwards to its children without a node.
+        if isinstance(source.expression, (exp.Subquery, exp.SetOperation)):
+            return None
+        return node_source(f"{scope_name}.{column}", None)
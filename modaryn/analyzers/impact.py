@@ -0,0 +1,190 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from modaryn.analyzers.lineage import LineageAnalyzer
+from modaryn.domain.model import DbtProject, DbtTest
+
+# (model unique_id, column name)
+ColumnKey = Tuple[str, str]
+
+
+@dataclass
+class ImpactResult:
+    """Union of the columns affected by a set of changed (source) columns."""
+    sources: List[ColumnKey]
+    # Affected columns grouped by hop distance from the nearest source. Sources are not listed,
+    # even when another source reaches them.
+    by_hop: Dict[int, List[ColumnKey]] = field(default_factory=dict)
+    # Affected column -> the sources whose change reaches it, in ``sources`` order.
+    attribution: Dict[ColumnKey, List[ColumnKey]] = field(default_factory=dict)
+
+
+def multi_source_bfs(
+    source_ids: Sequence[int],
+    downstream: Callable[[int], Iterable[int]],
+) -> Tuple[Dict[int, List[int]], Dict[int, int]]:
+    """One BFS from every source at once.
+
+    Returns the reached ids grouped by hop distance from the nearest source, and for every
+    reached id a bitmask of the sources (bit ``i`` = ``source_ids[i]``) that reach it. The masks
+    are propagated with a worklist that revisits a column only when its mask grows, so shared
+    downstream columns are walked once per distinct set of sources rather than once per source.
+    """
+    visited = set(source_ids)
+    by_hop: Dict[int, List[int]] = {}
+    frontier = list(dict.fromkeys(source_ids))
+    hop = 0
+    while frontier:
+        hop += 1
+        next_frontier = []
+        for column_id in frontier:
+            for target_id in downstream(column_id):
+                if target_id not in visited:
+                    visited.add(target_id)
+                    next_frontier.append(target_id)
+        if next_frontier:
+            by_hop[hop] = next_frontier
+        frontier = next_frontier
+
+    masks: Dict[int, int] = {}
+    for i, source_id in enumerate(source_ids):
+        masks[source_id] = masks.get(source_id, 0) | (1 << i)
+    worklist = deque(masks)
+    while worklist:
+        column_id = worklist.popleft()
+        mask = masks[column_id]
+        for target_id in downstream(column_id):
+            current = masks.get(target_id, 0)
+            if current | mask != current:
+                masks[target_id] = current | mask
+                worklist.append(target_id)
+    return by_hop, masks
+
+
+def impact_result(
+    sources: List[ColumnKey],
+    source_ids: List[int],
+    downstream: Callable[[int], Iterable[int]],
+    column_ref: Callable[[int], ColumnKey],
+) -> ImpactResult:
+    """Runs ``multi_source_bfs`` and maps the ids back to column keys."""
+    by_hop, masks = multi_source_bfs(source_ids, downstream)
+    result = ImpactResult(sources=sources)
+    for hop, column_ids in by_hop.items():
+        result.by_hop[hop] = [column_ref(column_id) for column_id in column_ids]
+        for column_id in column_ids:
+            mask = masks[column_id]
+            result.attribution[column_ref(column_id)] = [source for i, source in enumerate(sources) if mask >> i & 1]
+    return result
+
+
+def impacted_tests(project: DbtProject, result: ImpactResult) -> List[DbtTest]:
+    """Tests to run after a change, in manifest order.
+
+    These are the tests on a changed or affected column plus the model-level tests of every model
+    holding one; tests on the other columns of those models are left out.
+    """
+    columns = set(result.sources) | set(result.attribution)
+    models = {model_id for model_id, _ in columns}
+    return [
+        test for test in project.tests.values()
+        if any((model_id, column) in columns if column else model_id in models for model_id, column in test.attachments)
+    ]
+
+
+class ImpactAnalyzer:
+    """Downstream column impact, with column lineage traced only where the impact can reach.
+
+    A model's column lineage depends only on its own SQL and its parents' declared columns, so
+    the edges leaving a column are complete once every child of its model is traced. Given a
+    ``LineageAnalyzer``, ``downstream()`` walks the descendants of the source model in topological
+    order and traces a model only when one of its parents has an impacted column, stopping as
+    soon as no remaining descendant can be reached. Without one, the project's column graph is
+    taken as already complete (e.g. after a full ``analyze()``).
+    """
+
+    def __init__(self, project: DbtProject, lineage_analyzer: Optional[LineageAnalyzer] = None):
+        self.project = project
+        self.lineage_analyzer = lineage_analyzer
+        # Models whose lineage has been traced by this analyzer.
+        self.traced: Set[str] = set()
+        self._positions = {unique_id: i for i, unique_id in enumerate(project.models)}
+
+    def descendants(self, *model_ids: str) -> List[str]:
+        """Models downstream of any of ``model_ids`` (via the children DAG) in topological order."""
+        closure: Set[str] = set()
+        stack = list(model_ids)
+        while stack:
+            for child_id in self.project.models[stack.pop()].children:
+                if child_id not in closure:
+                    closure.add(child_id)
+                    stack.append(child_id)
+
+        # Kahn's algorithm over the closure; ties follow project order.
+        indegree = {
+            unique_id: sum(1 for parent_id in self.project.models[unique_id].parents if parent_id in closure)
+            for unique_id in closure
+        }
+        ready = deque(sorted((u for u, d in indegree.items() if d == 0), key=self._positions.__getitem__))
+        order = []
+        while ready:
+            unique_id = ready.popleft()
+            order.append(unique_id)
+            for child_id in self.project.models[unique_id].children:
+                indegree[child_id] -= 1
+                if indegree[child_id] == 0:
+                    ready.append(child_id)
+        return order
+
+    def downstream(self, model_id: str, column: str) -> Dict[int, List[ColumnKey]]:
+        """Columns affected by a change to ``model_id.column``, grouped by hop distance (BFS)."""
+        return self.downstream_many([(model_id, column)]).by_hop
+
+    def downstream_many(self, sources: Sequence[ColumnKey]) -> ImpactResult:
+        """The union of the columns affected by changes to every column in ``sources``.
+
+        Lineage is traced once for all sources, and one multi-source BFS gives each affected
+        column its distance from the nearest source and the sources that reach it. Sources
+        missing from the column graph are ignored.
+        """
+        graph = self.project.column_graph
+        sources = list(dict.fromkeys(sources))
+        known = [(key, graph.column_id(*key)) for key in sources]
+        known = [(key, column_id) for key, column_id in known if column_id is not None]
+        if self.lineage_analyzer is not None and known:
+            self._trace_reachable([key[0] for key, _ in known], [column_id for _, column_id in known])
+        return impact_result(
+            [key for key, _ in known],
+            [column_id for _, column_id in known],
+            self._ordered_downstream,
+            graph.column_ref,
+        )
+
+    def _trace_reachable(self, model_ids: List[str], source_ids: List[int]):
+        """Traces the descendants of ``model_ids`` that have a parent with an impacted column."""
+        graph = self.project.column_graph
+        impacted: Set[int] = set(source_ids)
+        candidates: Set[str] = {child_id for model_id in model_ids for child_id in self.project.models[model_id].children}
+        for unique_id in self.descendants(*dict.fromkeys(model_ids)):
+            if not candidates:
+                break  # No remaining descendant has an impacted parent.
+            if unique_id not in candidates:
+                continue
+            candidates.discard(unique_id)
+            model = self.project.models[unique_id]
+            if unique_id not in self.traced:
+                self.lineage_analyzer.trace_models(self.project, [unique_id])
+                self.traced.add(unique_id)
+            hit = False
+            for column in model.columns.values():
+                if column.column_id in impacted or any(upstream_id in impacted for upstream_id in graph.upstream(column.column_id)):
+                    impacted.add(column.column_id)
+                    hit = True
+            if hit:
+                candidates.update(model.children)
+
+    def _ordered_downstream(self, column_id: int) -> List[int]:
+        """Downstream ids in project model order, as a full analysis would have inserted them."""
+        graph = self.project.column_graph
+        return sorted(graph.downstream(column_id), key=lambda target_id: self._positions[graph.model_of(target_id)])
@@ -1,140 +1,393 @@
 import warnings
-from typing import Callable, Dict, List, Optional, Set
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 import sqlglot
 from sqlglot import exp
 from sqlglot.lineage import lineage
-from modaryn.domain.model import DbtProject, ColumnReference, DbtModel
+from sqlglot.optimizer.qualify import qualify
+from sqlglot.optimizer.scope import Scope, build_scope
+from modaryn.analyzers.column_resolver import ModelColumnResolver, OutputNamespace, ResolutionStats, SourcePair, node_source
+from modaryn.analyzers.passthrough import passthrough_sources
+from modaryn.analyzers.project_schema import ProjectSchema
+from modaryn.analyzers.sql_parse import SqlParseCache
+from modaryn.cache import LINEAGE, AnalysisCache
+from modaryn.domain.model import DbtProject, DbtModel
+from modaryn.parallel import resolve_jobs
+
+# Traced lineage of one model: (upstream refs per column, warning messages, unresolved columns).
+# The unresolved columns are None when the whole model failed.
+TraceResult = Tuple[Dict[str, List[Tuple[str, str]]], List[str], Optional[List[str]]]
+
+# Per-worker state for parallel lineage; set once by the pool initializer.
+_worker_context: Optional[Tuple["LineageAnalyzer", ProjectSchema, Dict[str, str], Dict[str, Dict[str, str]]]] = None
+
+
+def _init_worker(dialect: str, schema: ProjectSchema, table_to_id: Dict[str, str], column_lookup: Dict[str, Dict[str, str]]):
+    global _worker_context
+    _worker_context = (LineageAnalyzer(dialect=dialect), schema, table_to_id, column_lookup)
+
+
+def _trace_in_worker(unique_id: str, model_name: str, raw_sql: str, column_names: List[str]):
+    """Process-pool entry point. Returns plain tuples so results pickle cheaply."""
+    analyzer, schema, table_to_id, column_lookup = _worker_context
+    stats = ResolutionStats()
+    upstream, messages, unresolved = analyzer._trace_model(model_name, raw_sql, column_names, schema, table_to_id, column_lookup, stats)
+    return unique_id, upstream, messages, unresolved, stats
 
 
 class LineageAnalyzer:
-    def __init__(self, dialect: str = "bigquery"):
+    def __init__(
+        self,
+        dialect: str = "bigquery",
+        parse_cache: Optional[SqlParseCache] = None,
+        cache: Optional[AnalysisCache] = None,
+        jobs: Union[int, str] = 1,
+    ):
         self.dialect = dialect
+        self.cache = cache
+        self.jobs = resolve_jobs(jobs)
+        # Warning messages of the last analyze() run, per model unique_id; for display only.
+        self.model_warnings: Dict[str, List[str]] = {}
+        # Columns whose lineage failed in the last analyze() run, per model unique_id; None when the
+        # whole model failed. Models without failures are not listed.
+        self.unresolved: Dict[str, Optional[List[str]]] = {}
+        # Column name resolution attempts of the last analyze() run, per dialect.
+        self.resolution_stats: Dict[str, ResolutionStats] = {}
+        # Reuse the ASTs parsed during complexity analysis when they were parsed with the same dialect.
+        if parse_cache is None or parse_cache.dialect != dialect:
+            parse_cache = SqlParseCache(dialect=dialect)
+        self.parse_cache = parse_cache
+        # (project, schema, table_to_id, column_lookup) of the project last traced.
+        self._prepared: Optional[Tuple[DbtProject, ProjectSchema, Dict[str, str], Dict[str, Dict[str, str]]]] = None
 
-    def analyze(self, project: DbtProject, on_progress: Optional[Callable[[int, int], None]] = None):
+    def analyze(
+        self,
+        project: DbtProject,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        reuse: Optional[Dict[str, TraceResult]] = None,
+    ):
         """
-        Analyzes column-level lineage for all models in the project.
+        Analyzes column-level lineage for all models in the project, including its context models.
         on_progress: optional callback(current, total) called after each model is processed.
+        reuse: optional stored (upstream refs per column, warnings, unresolved columns) by
+            unique_id, e.g. from --state; those models are not re-analyzed.
+
+        With jobs > 1, models are traced on a process pool (largest SQL first) and the results are
+        merged in project order, so references and warnings come out exactly as in a serial run.
+        The workers parse the SQL themselves; the shared parse cache is only used by serial traces.
+        Every model's cached AST is released once its lineage is traced or served from ``reuse`` or
+        the analysis cache.
         """
-        schema = self._build_schema(project)
-        # Store table names in lowercase for case-insensitive lookup
-        table_to_id = {model.model_name.lower(): model.unique_id for model in project.models.values()}
+        self.model_warnings = {}
+        self.unresolved = {}
+        stats = ResolutionStats()
+        self.resolution_stats = {self.dialect: stats}
+        self._prepared = None
+        self._trace(project, list(project.all_models.values()), stats, on_progress, reuse)
+
+        # The column graph is final now; scoring and rendering read the per-model metrics from here.
+        project.materialize_metrics()
+
+    def trace_models(self, project: DbtProject, unique_ids: Iterable[str]):
+        """Traces only the given models, adding their upstream edges to the project's column graph.
+
+        For on-demand lineage (e.g. ``impact``), where only a few descendants of one model are
+        needed. The schema built for ``project`` is kept between calls, and warnings and resolution
+        stats accumulate until the next ``analyze()``. Metrics materialized before the new edges are
+        dropped, so the metric properties read the live column graph.
+        """
+        stats = self.resolution_stats.setdefault(self.dialect, ResolutionStats())
+        self._trace(project, [project.models[unique_id] for unique_id in unique_ids], stats)
+        if project.metrics_version is not None and not project.metrics_current:
+            project.invalidate_metrics()
+
+    def unresolved_columns(self, unique_id: str) -> Optional[Set[str]]:
+        """Columns of a traced model whose lineage failed, or None when the whole model failed."""
+        if unique_id not in self.unresolved:
+            return set()
+        columns = self.unresolved[unique_id]
+        return None if columns is None else set(columns)
+
+    def _prepare(self, project: DbtProject) -> Tuple[ProjectSchema, Dict[str, str], Dict[str, Dict[str, str]]]:
+        """Schema and name lookups of ``project``, built once per project."""
+        if self._prepared is None or self._prepared[0] is not project:
+            # Store table names in lowercase for case-insensitive lookup
+            table_to_id = {model.model_name.lower(): model.unique_id for model in project.all_models.values()}
+            self._prepared = (project, self._build_schema(project), table_to_id, self._build_column_lookup(project))
+        return self._prepared[1:]
 
-        models = list(project.models.values())
+    def _trace(
+        self,
+        project: DbtProject,
+        models: List[DbtModel],
+        stats: ResolutionStats,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        reuse: Optional[Dict[str, TraceResult]] = None,
+    ):
+        schema, table_to_id, column_lookup = self._prepare(project)
         total = len(models)
+
+        # Resolve stored results first so only the remaining models are traced.
+        stored: Dict[str, TraceResult] = {}
+        cache_keys: Dict[str, str] = {}
+        for model in models:
+            if not self._is_traceable(model):
+                continue
+            if reuse and model.unique_id in reuse:
+                stored[model.unique_id] = reuse[model.unique_id]
+                continue
+            if self.cache is not None:
+                cache_keys[model.unique_id] = self._cache_key(model)
+                cached = self.cache.get_lineage(cache_keys[model.unique_id])
+                if cached is not None:
+                    stored[model.unique_id] = cached
+
+        pending = [model for model in models if self._is_traceable(model) and model.unique_id not in stored]
+        traced: Dict[str, TraceResult] = {}
+        parallel = self.jobs > 1 and len(pending) > 1
+        if parallel:
+            traced = self._trace_parallel(pending, schema, table_to_id, column_lookup, total, on_progress, stats)
+
         for i, model in enumerate(models):
-            if on_progress:
+            if on_progress and not parallel:
                 on_progress(i + 1, total)
-            if not model.raw_sql:
+            if not self._is_traceable(model):
+                self.parse_cache.discard(model.raw_sql)
                 continue
 
-            for column_name in model.columns:
-                try:
-                    # Try variations ordered by likelihood for the dialect to minimize failed attempts.
-                    # BigQuery uses backticks; Snowflake/Redshift default to uppercase; others use lowercase.
-                    node = None
-                    last_error = None
-                    search_variations = self._get_column_variations(column_name)
+            if model.unique_id in stored:
+                upstream, messages, unresolved = stored[model.unique_id]
+                # Not traced, so the AST left by complexity analysis is released here.
+                self.parse_cache.discard(model.raw_sql)
+            else:
+                if model.unique_id in traced:
+                    upstream, messages, unresolved = traced.pop(model.unique_id)
+                else:
+                    upstream, messages, unresolved = self._trace_model(
+                        model.model_name, model.raw_sql, list(model.columns), schema, table_to_id, column_lookup, stats
+                    )
+                if model.unique_id in cache_keys:
+                    self.cache.put_lineage(cache_keys[model.unique_id], upstream, messages, unresolved)
+            self._apply_upstream(model, upstream, project)
+
+            if unresolved is None or unresolved:
+                self.unresolved[model.unique_id] = None if unresolved is None else list(unresolved)
+
+            if messages:
+                self.model_warnings[model.unique_id] = list(messages)
+            for message in messages:
+                warnings.warn(message, UserWarning, stacklevel=2)
+
+    def _trace_parallel(
+        self,
+        pending: List[DbtModel],
+        schema: ProjectSchema,
+        table_to_id: Dict[str, str],
+        column_lookup: Dict[str, Dict[str, str]],
+        total: int,
+        on_progress: Optional[Callable[[int, int], None]],
+        stats: ResolutionStats,
+    ) -> Dict[str, TraceResult]:
+        """Traces ``pending`` models on a process pool, submitting the largest SQL first to cut makespan."""
+        traced = {}
+        completed = total - len(pending)
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_worker,
+            initargs=(self.dialect, schema, table_to_id, column_lookup),
+        ) as pool:
+            futures = [
+                pool.submit(_trace_in_worker, model.unique_id, model.model_name, model.raw_sql, list(model.columns))
+                for model in sorted(pending, key=lambda m: len(m.raw_sql), reverse=True)
+            ]
+            for future in as_completed(futures):
+                unique_id, upstream, messages, unresolved, worker_stats = future.result()
+                traced[unique_id] = (upstream, messages, unresolved)
+                stats.merge(worker_stats)
+                completed += 1
+                if on_progress:
+                    on_progress(completed, total)
+        # Worker processes parsed these models; the parent's ASTs are no longer needed.
+        for model in pending:
+            self.parse_cache.discard(model.raw_sql)
+        return traced
+
+    def _trace_model(
+        self,
+        model_name: str,
+        raw_sql: str,
+        column_names: List[str],
+        schema: ProjectSchema,
+        table_to_id: Dict[str, str],
+        column_lookup: Dict[str, Dict[str, str]],
+        stats: Optional[ResolutionStats] = None,
+    ) -> TraceResult:
+        """Resolves lineage for every column of one model.
+
+        Returns ``({column: [(source_model_id, source_column), ...]}, warning messages, unresolved
+        columns)``, with None for the unresolved columns when the model could not be traced at all.
+        Source references are sorted so results do not depend on hash ordering inside sqlglot.
+        """
+        upstream: Dict[str, List[Tuple[str, str]]] = {}
+        messages: List[str] = []
+        unresolved: List[str] = []
+
+        # Parse and qualify the model once; every column below traces against the same scope.
+        # A model-level failure trips the breaker: it is reported once and no column is attempted.
+        # Passthrough and rename-only models skip qualification and read edges off the projection list.
+        passthrough = None
+        resolver = None
+        try:
+            passthrough = passthrough_sources(self.parse_cache.get(raw_sql), schema, self.dialect)
+            if passthrough is None:
+                scope = self._build_scope(raw_sql, schema)
+                # Trace all columns through one memoized walk over the scope tree; columns that share CTEs
+                # resolve them once. Per-column lineage() remains the fallback for shapes the resolver rejects.
+                resolver = ModelColumnResolver(scope, self.dialect)
+        except Exception as e:
+            messages.append(
+                f"Lineage unavailable for model '{model_name}' ({len(column_names)} column(s) skipped): "
+                f"{type(e).__name__}: {e}"
+            )
+            return upstream, messages, None
+        finally:
+            self.parse_cache.discard(raw_sql)
+
+        if passthrough is not None:
+            namespace = OutputNamespace(passthrough, self.dialect)
+            if stats is not None:
+                stats.passthrough_models += 1
+        else:
+            namespace = resolver.namespace
+
+        for column_name in column_names:
+            try:
+                # Match against the model's normalized output names with the dialect's case folding,
+                # so each column resolves on the first try or fails with a clear reason.
+                projected, attempts = namespace.find(column_name)
+                if stats is not None:
+                    stats.record(attempts if projected is not None else None)
+                if projected is None:
+                    unresolved.append(column_name)
+                    messages.append(
+                        f"Lineage unavailable for column '{column_name}' in model '{model_name}': "
+                        f"Cannot find column '{column_name}' in query."
+                    )
+                    continue
 
-                    for variation in search_variations:
+                if passthrough is not None:
+                    pair = passthrough[projected]
+                    sources = self._map_source_pairs([pair] if pair else [], table_to_id, column_lookup)
+                else:
+                    try:
+                        sources = self._map_source_pairs(resolver.resolve(projected), table_to_id, column_lookup)
+                    except Exception:
+                        column = exp.column(exp.to_identifier(projected, quoted=True))
                         try:
-                            node = lineage(variation, sql=model.raw_sql, schema=schema, dialect=self.dialect)
-                            if node:
-                                break
+                            node = lineage(column, sql=resolver.root.expression, dialect=self.dialect, scope=resolver.root, copy=False)
                         except Exception as e:
-                            last_error = e
+                            unresolved.append(column_name)
+                            messages.append(f"Lineage unavailable for column '{column_name}' in model '{model_name}': {e}")
                             continue
+                        sources = self._extract_source_columns(node, table_to_id, column_lookup)
+                if sources:
+                    upstream[column_name] = sorted(sources)
+            except Exception as e:
+                unresolved.append(column_name)
+                messages.append(f"Lineage analysis failed for column '{column_name}' in model '{model_name}': {e}")
+        return upstream, messages, unresolved
 
-                    if node:
-                        self._extract_source_columns(model, column_name, node, table_to_id, project)
-                    elif last_error:
-                        warnings.warn(
-                            f"Lineage unavailable for column '{column_name}' in model '{model.model_name}': {last_error}",
-                            UserWarning,
-                            stacklevel=2,
-                        )
-                except Exception as e:
-                    warnings.warn(
-                        f"Lineage analysis failed for column '{column_name}' in model '{model.model_name}': {e}",
-                        UserWarning,
-                        stacklevel=2,
-                    )
-                    continue
+    @staticmethod
+    def _is_traceable(model: DbtModel) -> bool:
+        """Only SQL models with compiled SQL are traced; Python models are skipped before any parse."""
+        return bool(model.raw_sql) and model.language == "sql"
 
-    def _get_column_variations(self, column_name: str) -> List[str]:
-        """Returns column name variations ordered by likelihood for the current dialect."""
-        if self.dialect == "bigquery":
-            return [f'`{column_name}`', column_name, column_name.upper(), f'"{column_name}"']
-        elif self.dialect in ("snowflake", "redshift"):
-            return [column_name.upper(), column_name, f'"{column_name}"', f'`{column_name}`']
-        else:
-            return [column_name, column_name.upper(), f'"{column_name}"', f'`{column_name}`']
+    def _cache_key(self, model: DbtModel) -> str:
+        """Hashes the compiled SQL together with the columns to trace and the upstream schema they resolve against.
 
-    def _build_schema(self, project: DbtProject) -> Dict:
+        Parent columns are hashed as declared: cached references name them in that case, so a
+        case-only rename must miss the cache.
         """
-        Builds a sqlglot compatible schema from the dbt project.
+        upstream_schema = sorted(
+            [parent.unique_id, parent.model_name.lower(), sorted(parent.columns)]
+            for parent in model.parents.values()
+        )
+        return AnalysisCache.make_key(LINEAGE, self.dialect, model.raw_sql, list(model.columns), upstream_schema)
+
+    def _apply_upstream(self, model: DbtModel, upstream: Dict[str, List[Tuple[str, str]]], project: DbtProject):
+        """Merges traced or stored references into the project's column graph."""
+        graph = project.column_graph
+        for column_name, refs in upstream.items():
+            target_id = graph.column_id(model.unique_id, column_name)
+            if target_id is None:
+                continue
+            for source_model_id, source_column_name in refs:
+                source_id = graph.column_id(source_model_id, source_column_name)
+                if source_id is not None:
+                    graph.add_edge(source_id, target_id)
+
+    def _build_scope(self, sql: str, schema: ProjectSchema) -> Scope:
+        """Qualifies a copy of the cached AST against the model's view of ``schema`` and builds its root scope."""
+        parsed = self.parse_cache.get(sql)
+        expression = qualify(
+            parsed.copy(),
+            dialect=self.dialect,
+            schema=schema.view(parsed),
+            validate_qualify_columns=False,
+            identify=False,
+        )
+        scope = build_scope(expression)
+        if not scope:
+            raise sqlglot.errors.SqlglotError("Cannot build lineage, sql must be SELECT")
+        return scope
+
+    def _build_schema(self, project: DbtProject) -> ProjectSchema:
+        """
+        Builds a sqlglot compatible schema from the dbt project, normalized once for the dialect.
         """
-        schema = {}
-        for model in project.models.values():
-            # Use lowercase for table and column names in schema to allow flexible matching
-            model_name_lower = model.model_name.lower()
-            schema[model_name_lower] = {col.name.lower(): "UNKNOWN" for col in model.columns.values()}
-        return schema
-
-    def _extract_source_columns(self, target_model: DbtModel, target_column_name: str, node, table_to_id: Dict[str, str], project: DbtProject):
+        return ProjectSchema.from_project(project, self.dialect)
+
+    @staticmethod
+    def _build_column_lookup(project: DbtProject) -> Dict[str, Dict[str, str]]:
+        """Maps each model's lowercased column names back to the names declared in the project."""
+        lookup: Dict[str, Dict[str, str]] = {}
+        for model in project.all_models.values():
+            columns: Dict[str, str] = {}
+            for col_name in model.columns:
+                columns.setdefault(col_name.lower(), col_name)
+            lookup[model.unique_id] = columns
+        return lookup
+
+    @staticmethod
+    def _map_source_pairs(pairs, table_to_id: Dict[str, str], column_lookup: Dict[str, Dict[str, str]]) -> Set[Tuple[str, str]]:
+        """Maps lowercased ``(table, column)`` pairs to project columns ``(model_unique_id, column_name)``."""
+        sources: Set[Tuple[str, str]] = set()
+        for table_name, source_col_raw in pairs:
+            # If we found a candidate table name, check if it's in our dbt project
+            source_model_id = table_to_id.get(table_name)
+            if source_model_id:
+                # Map normalized source_col_raw back to the actual column name in the source model
+                actual_source_col = column_lookup.get(source_model_id, {}).get(source_col_raw)
+                if actual_source_col:
+                    sources.add((source_model_id, actual_source_col))
+        return sources
+
+    def _extract_source_columns(self, node, table_to_id: Dict[str, str], column_lookup: Dict[str, Dict[str, str]]) -> Set[Tuple[str, str]]:
         """
-        Recursively finds the source columns from the lineage node and populates the project model.
+        Recursively finds the project source columns ``(model_unique_id, column_name)`` behind a lineage node.
         """
         processed = set()
-        
-        def walk(current_node):
+        pairs: Set[SourcePair] = set()
+        stack = [node]
+        while stack:
+            current_node = stack.pop()
             if id(current_node) in processed:
-                return
+                continue
             processed.add(id(current_node))
-
             # Identify if this node represents a source table and column.
             # We prioritize Table expressions but fallback to parsing the node name (e.g., 'table.column').
-            table_name = None
-            source_col_raw = None
-
-            if isinstance(current_node.expression, exp.Table):
-                table_id_raw = current_node.expression.this
-                if hasattr(table_id_raw, 'name'):
-                    table_name = table_id_raw.name.lower().strip('"`')
-                else:
-                    table_name = str(table_id_raw).lower().strip('"`')
-                source_col_raw = current_node.name.split('.')[-1].lower().strip('"`')
-            
-            elif '.' in current_node.name:
-                parts = current_node.name.split('.')
-                table_name = parts[-2].lower().strip('"`')
-                source_col_raw = parts[-1].lower().strip('"`')
-            
-            # If we found a candidate table name, check if it's in our dbt project
-            if table_name and table_name in table_to_id:
-                source_model_id = table_to_id[table_name]
-                source_model = project.models.get(source_model_id)
-                
-                if source_model:
-                    # Map normalized source_col_raw back to the actual column name in the source model
-                    actual_source_col = None
-                    for col_name in source_model.columns:
-                        if col_name.lower() == source_col_raw:
-                            actual_source_col = col_name
-                            break
-                    
-                    if actual_source_col:
-                        # Add reference if not already present
-                        if not any(ref.model_unique_id == source_model_id and ref.column_name == actual_source_col 
-                                   for ref in target_model.columns[target_column_name].upstream_columns):
-                            
-                            target_model.columns[target_column_name].upstream_columns.append(
-                                ColumnReference(model_unique_id=source_model_id, column_name=actual_source_col)
-                            )
-                            source_model.columns[actual_source_col].downstream_columns.append(
-                                ColumnReference(model_unique_id=target_model.unique_id, column_name=target_column_name)
-                            )
-            
-            for downstream in current_node.downstream:
-                walk(downstream)
-
-        walk(node)
+            pair = node_source(current_node.name, current_node.expression)
+            if pair:
+                pairs.add(pair)
+            stack.extend(current_node.downstream)
+        return self._map_source_pairs(pairs, table_to_id, column_lookup)
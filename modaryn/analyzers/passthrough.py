@@ -0,0 +1,87 @@
+from typing import Dict, List, Optional, Set
+
+from sqlglot import exp
+from sqlglot.schema import normalize_name
+
+from modaryn.analyzers.column_resolver import SourcePair
+from modaryn.analyzers.project_schema import ProjectSchema
+
+# Clauses that introduce more sources or rewrite projections; any of them disqualifies the fast path.
+_DISQUALIFYING_ARGS = ("with", "with_", "joins", "laterals", "pivots", "kind")
+
+
+def passthrough_sources(expression: exp.Expression, schema: ProjectSchema, dialect: str) -> Optional[Dict[str, Optional[SourcePair]]]:
+    """Recognizes single-source projections of bare columns, aliases and stars.
+
+    Staging models such as ``select a, b as c from source`` or ``select * from model`` need no
+    qualification or scope walk: each output column maps straight to one source column. Returns
+    ``{normalized output name: (table, column) or None}`` for such models, or None when the query
+    has any real expression and must go through the full lineage resolver. The pairs match what
+    ``ModelColumnResolver`` yields after qualification: for a project table only columns in its
+    schema resolve, while columns of an external source all resolve to that source.
+    """
+    if not isinstance(expression, exp.Select):
+        return None
+    if any(expression.args.get(arg) for arg in _DISQUALIFYING_ARGS):
+        return None
+    # sqlglot renamed the FROM arg key across versions.
+    from_ = expression.args.get("from_") or expression.args.get("from")
+    table = from_.this if from_ else None
+    if not isinstance(table, exp.Table) or not isinstance(table.this, exp.Identifier):
+        return None
+    if any(table.args.get(arg) for arg in ("pivots", "joins", "laterals")):
+        return None
+
+    table_name = table.name.lower()
+    source_alias = table.alias_or_name.lower()
+    table_columns = None
+    if schema.has_table(table_name):
+        table_columns = schema.table_columns(table.this)
+        if table_columns is None:
+            # Only a case-insensitive match (e.g. a quoted name); leave the resolution to qualify().
+            return None
+    outputs: Dict[str, Optional[SourcePair]] = {}
+    source_names: List[str] = []
+    aliases: Set[str] = set()
+
+    for projection in expression.expressions:
+        if isinstance(projection, exp.Star) or (isinstance(projection, exp.Column) and isinstance(projection.this, exp.Star)):
+            if isinstance(projection, exp.Column) and not _is_source_column(projection, source_alias):
+                return None
+            # Stars expand to the schema's columns; outside the project there is nothing to expand.
+            if table_columns is None:
+                return None
+            for column in table_columns:
+                outputs.setdefault(column, (table_name, column.lower()))
+            continue
+
+        alias = None
+        column = projection
+        if isinstance(projection, exp.Alias):
+            alias = projection.args.get("alias")
+            column = projection.this
+        if not isinstance(column, exp.Column) or not isinstance(column.this, exp.Identifier):
+            return None
+        if not _is_source_column(column, source_alias):
+            return None
+
+        source_name = normalize_name(column.this.copy(), dialect=dialect).name
+        output_name = normalize_name(alias.copy(), dialect=dialect).name if alias else source_name
+        if output_name != source_name:
+            aliases.add(output_name)
+        source_names.append(source_name)
+        if table_columns is None or source_name in table_columns:
+            outputs.setdefault(output_name, (table_name, source_name.lower()))
+        else:
+            outputs.setdefault(output_name, None)
+
+    # A column named like an alias may be a lateral alias reference, which qualification rewrites.
+    if aliases.intersection(source_names):
+        return None
+    return outputs
+
+
+def _is_source_column(column: exp.Column, source_alias: str) -> bool:
+    if column.args.get("db") or column.args.get("catalog"):
+        return False
+    return not column.table or column.table.lower() == source_alias
@@ -0,0 +1,55 @@
+from typing import Dict, List, Optional
+
+from sqlglot import exp
+from sqlglot.schema import MappingSchema, normalize_name
+
+from modaryn.domain.model import DbtProject
+
+
+class ProjectSchema:
+    """Column schema of every project model, normalized once for a dialect.
+
+    sqlglot normalizes a plain dict schema on every ``qualify`` call, which made lineage setup
+    cost O(models × columns) per model. The project schema is normalized here once, and each
+    model is qualified against a small ``MappingSchema`` view holding only the tables its SQL
+    references (its parents, for ``ref``-based models).
+    """
+
+    def __init__(self, tables: Dict[str, Dict[str, str]], dialect: str):
+        self.dialect = dialect
+        self.mapping = MappingSchema(tables, dialect=dialect).mapping
+        # Lowercased model name -> table key in the normalized mapping.
+        self._keys: Dict[str, str] = {}
+        for name in tables:
+            key = normalize_name(name, dialect=dialect, is_table=True).name
+            if key in self.mapping:
+                self._keys[name] = key
+
+    @classmethod
+    def from_project(cls, project: DbtProject, dialect: str) -> "ProjectSchema":
+        tables = {}
+        for model in project.all_models.values():
+            # Use lowercase for table and column names in schema to allow flexible matching
+            tables[model.model_name.lower()] = {col.name.lower(): "UNKNOWN" for col in model.columns.values()}
+        return cls(tables, dialect)
+
+    def view(self, expression: exp.Expression) -> MappingSchema:
+        """Returns a schema limited to the project tables referenced by ``expression``."""
+        tables = {}
+        for table in expression.find_all(exp.Table):
+            key = self._keys.get(table.name.lower())
+            if key is not None:
+                tables[key] = self.mapping[key]
+        return MappingSchema(tables, dialect=self.dialect, normalize=False)
+
+    def has_table(self, table_name: str) -> bool:
+        return table_name.lower() in self._keys
+
+    def table_columns(self, identifier: exp.Identifier) -> Optional[List[str]]:
+        """Returns the normalized column names of the table ``identifier`` names, matched the way qualify() does."""
+        key = normalize_name(identifier.copy(), dialect=self.dialect, is_table=True).name
+        columns = self.mapping.get(key)
+        return list(columns) if columns is not None else None
+
+    def __len__(self) -> int:
+        return len(self.mapping)
@@ -0,0 +1,305 @@
+import json
+import os
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import sqlglot
+
+from modaryn.analyzers.impact import ColumnKey, ImpactResult, impact_result
+from modaryn.domain.model import DbtProject
+
+REACHABILITY_FILE_NAME = "modaryn_reachability.json"
+REACHABILITY_FORMAT_VERSION = 1
+
+
+def manifest_fingerprint(manifest_path: Path, dialect: str) -> str:
+    """Identifies the lineage an index was built from: manifest size and mtime, dialect and sqlglot version.
+
+    dbt rewrites manifest.json on every parse or compile, so its stat changes whenever the lineage
+    can; the manifest itself is not read.
+    """
+    st = manifest_path.stat()
+    return f"{REACHABILITY_FORMAT_VERSION}:{dialect}:{sqlglot.__version__}:{st.st_size}:{st.st_mtime_ns}"
+
+
+class ReachabilityIndex:
+    """Cached downstream column adjacency, with the blast radius of every column precomputed.
+
+    ``impact`` queries run their BFS over the stored adjacency, so they need no SQL parsing or
+    lineage analysis; the BFS visits only the affected columns. For ``impact --all``, columns are
+    condensed into strongly connected components (lineage is normally acyclic, so these are single
+    columns) and the condensed DAG is numbered in DFS post-order. Every component stores the
+    post-order intervals it reaches: its spanning-tree descendants form one contiguous interval,
+    and only non-tree edges add more. A column's blast radius size is then a few prefix-sum lookups.
+
+    The index is written to ``target/modaryn_reachability.json`` next to the manifest and is
+    only used while the manifest fingerprint still matches.
+    """
+
+    def __init__(
+        self,
+        fingerprint: str,
+        model_names: Dict[str, str],
+        columns: List[ColumnKey],
+        downstream_offsets: array,
+        downstream_ids: array,
+        component: array,
+        post: array,
+        interval_offsets: array,
+        intervals: array,
+    ):
+        self.fingerprint = fingerprint
+        self.model_names = model_names
+        self.columns = columns
+        self._ids = {key: column_id for column_id, key in enumerate(columns)}
+        self._downstream_offsets = downstream_offsets
+        self._downstream_ids = downstream_ids
+        # Column id -> component id; component id -> post-order number.
+        self._component = component
+        self._post = post
+        # Component id -> slice of (lo, hi) post-order number pairs, both ends inclusive.
+        self._interval_offsets = interval_offsets
+        self._intervals = intervals
+        self._prepare_lookups()
+
+    def _prepare_lookups(self):
+        # Post-order number -> component, and the component's columns.
+        self._by_post = array("i", bytes(4 * len(self._post)))
+        for component_id, number in enumerate(self._post):
+            self._by_post[number] = component_id
+        members: List[List[int]] = [[] for _ in self._post]
+        for column_id, component_id in enumerate(self._component):
+            members[component_id].append(column_id)
+        self._members = members
+        # Prefix sums of column counts in post order, for O(1) interval sizes.
+        self._column_prefix = array("q", [0])
+        for number in range(len(self._post)):
+            self._column_prefix.append(self._column_prefix[-1] + len(members[self._by_post[number]]))
+
+    # --- Building ----------------------------------------------------------
+
+    @classmethod
+    def build(cls, project: DbtProject, fingerprint: str) -> "ReachabilityIndex":
+        """Indexes the project's column graph; call after a full ``LineageAnalyzer.analyze()``."""
+        graph = project.column_graph
+        size = len(graph)
+        columns = [graph.column_ref(column_id) for column_id in range(size)]
+        downstream_offsets = array("i", [0])
+        downstream_ids = array("i")
+        for column_id in range(size):
+            # Column ids follow project model order, so this matches a full analysis' insertion order.
+            downstream_ids.extend(sorted(graph.downstream(column_id)))
+            downstream_offsets.append(len(downstream_ids))
+
+        component, component_edges = cls._condense(size, downstream_offsets, downstream_ids)
+        post, interval_offsets, intervals = cls._label(component_edges)
+        model_names = {unique_id: model.model_name for unique_id, model in project.models.items()}
+        return cls(fingerprint, model_names, columns, downstream_offsets, downstream_ids, component, post, interval_offsets, intervals)
+
+    @staticmethod
+    def _condense(size: int, offsets: array, targets: array) -> Tuple[array, List[List[int]]]:
+        """Tarjan's SCC algorithm (iterative); returns column -> component and the condensed edges."""
+        index = array("i", [-1]) * size
+        low = array("i", bytes(4 * size))
+        on_stack = bytearray(size)
+        component = array("i", [-1]) * size
+        stack: List[int] = []
+        counter = 0
+        components = 0
+        for root in range(size):
+            if index[root] != -1:
+                continue
+            work = [(root, offsets[root])]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            while work:
+                node, cursor = work[-1]
+                if cursor < offsets[node + 1]:
+                    work[-1] = (node, cursor + 1)
+                    target = targets[cursor]
+                    if index[target] == -1:
+                        index[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = 1
+                        work.append((target, offsets[target]))
+                    elif on_stack[target]:
+                        low[node] = min(low[node], index[target])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component[member] = components
+                        if member == node:
+                            break
+                    components += 1
+
+        component_edges: List[List[int]] = [[] for _ in range(components)]
+        seen = set()
+        for source in range(size):
+            for cursor in range(offsets[source], offsets[source + 1]):
+                edge = (component[source], component[targets[cursor]])
+                if edge[0] != edge[1] and edge not in seen:
+                    seen.add(edge)
+                    component_edges[edge[0]].append(edge[1])
+        return component, component_edges
+
+    @staticmethod
+    def _label(edges: List[List[int]]) -> Tuple[array, array, array]:
+        """Post-order numbers and merged reachability intervals for every node of a DAG."""
+        size = len(edges)
+        indegree = array("i", bytes(4 * size))
+        for successors in edges:
+            for successor in successors:
+                indegree[successor] += 1
+        post = array("i", [-1]) * size
+        # Smallest post-order number in each node's DFS subtree.
+        subtree_low = array("i", bytes(4 * size))
+        order: List[int] = []
+        roots = [node for node in range(size) if indegree[node] == 0]
+        # Every node of a DAG is reachable from some root; the fallback covers malformed input.
+        for root in roots + list(range(size)):
+            if post[root] != -1:
+                continue
+            post[root] = -2  # on the DFS path
+            subtree_low[root] = len(order)
+            work = [(root, 0)]
+            while work:
+                node, cursor = work[-1]
+                if cursor < len(edges[node]):
+                    work[-1] = (node, cursor + 1)
+                    successor = edges[node][cursor]
+                    if post[successor] == -1:
+                        post[successor] = -2
+                        subtree_low[successor] = len(order)
+                        work.append((successor, 0))
+                    continue
+                work.pop()
+                post[node] = len(order)
+                order.append(node)
+
+        # Reverse topological order (post order): successors are labelled before their predecessors.
+        labels: List[List[Tuple[int, int]]] = [[] for _ in range(size)]
+        for node in order:
+            merged = [(subtree_low[node], post[node])]
+            for successor in edges[node]:
+                merged.extend(labels[successor])
+            labels[node] = _merge_intervals(merged)
+
+        interval_offsets = array("i", [0])
+        intervals = array("i")
+        for node in range(size):
+            for lo, hi in labels[node]:
+                intervals.append(lo)
+                intervals.append(hi)
+            interval_offsets.append(len(intervals))
+        return post, interval_offsets, intervals
+
+    # --- Queries -----------------------------------------------------------
+
+    def column_id(self, model_id: str, column: str) -> Optional[int]:
+        return self._ids.get((model_id, column))
+
+    def _component_intervals(self, component_id: int) -> List[Tuple[int, int]]:
+        flat = self._intervals[self._interval_offsets[component_id]:self._interval_offsets[component_id + 1]]
+        return list(zip(flat[0::2], flat[1::2]))
+
+    def reachable(self, column_id: int) -> List[int]:
+        """Ids of every column affected by ``column_id``, excluding itself."""
+        result = []
+        for lo, hi in self._component_intervals(self._component[column_id]):
+            for number in range(lo, hi + 1):
+                result.extend(self._members[self._by_post[number]])
+        result.remove(column_id)
+        result.sort()
+        return result
+
+    def reachable_count(self, column_id: int) -> int:
+        total = sum(
+            self._column_prefix[hi + 1] - self._column_prefix[lo]
+            for lo, hi in self._component_intervals(self._component[column_id])
+        )
+        return total - 1
+
+    def downstream_many(self, sources: Sequence[ColumnKey]) -> ImpactResult:
+        """Like ``ImpactAnalyzer.downstream_many``, as a BFS over the stored adjacency."""
+        sources = [key for key in dict.fromkeys(sources) if key in self._ids]
+        return impact_result(sources, [self._ids[key] for key in sources], self._downstream, self.columns.__getitem__)
+
+    def _downstream(self, column_id: int):
+        return self._downstream_ids[self._downstream_offsets[column_id]:self._downstream_offsets[column_id + 1]]
+
+    def blast_radius(self) -> Iterator[Tuple[ColumnKey, int, int]]:
+        """``(column, affected columns, affected models)`` for every column that affects anything."""
+        for column_id, key in enumerate(self.columns):
+            if self.reachable_count(column_id) == 0:
+                continue
+            affected = self.reachable(column_id)
+            yield key, len(affected), len({self.columns[i][0] for i in affected})
+
+    # --- Persistence -------------------------------------------------------
+
+    def write(self, target_dir: Path):
+        """Atomically writes the index to ``<target_dir>/modaryn_reachability.json``."""
+        payload = {
+            "version": REACHABILITY_FORMAT_VERSION,
+            "fingerprint": self.fingerprint,
+            "models": self.model_names,
+            "columns": [list(key) for key in self.columns],
+            "downstream_offsets": self._downstream_offsets.tolist(),
+            "downstream_ids": self._downstream_ids.tolist(),
+            "component": self._component.tolist(),
+            "post": self._post.tolist(),
+            "interval_offsets": self._interval_offsets.tolist(),
+            "intervals": self._intervals.tolist(),
+        }
+        target_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, target_dir / REACHABILITY_FILE_NAME)
+
+    @classmethod
+    def read(cls, target_dir: Path, fingerprint: str) -> Optional["ReachabilityIndex"]:
+        """Loads the index, or returns None when it is missing or was built from other lineage."""
+        path = target_dir / REACHABILITY_FILE_NAME
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            payload = json.load(f)
+        if payload.get("version") != REACHABILITY_FORMAT_VERSION or payload.get("fingerprint") != fingerprint:
+            return None
+        return cls(
+            fingerprint,
+            payload["models"],
+            [tuple(key) for key in payload["columns"]],
+            array("i", payload["downstream_offsets"]),
+            array("i", payload["downstream_ids"]),
+            array("i", payload["component"]),
+            array("i", payload["post"]),
+            array("i", payload["interval_offsets"]),
+            array("i", payload["intervals"]),
+        )
+
+
+def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sorts and merges overlapping or adjacent inclusive intervals."""
+    intervals.sort()
+    merged = [intervals[0]]
+    for lo, hi in intervals[1:]:
+        last_lo, last_hi = merged[-1]
+        if lo <= last_hi + 1:
+            if hi > last_hi:
+                merged[-1] = (last_lo, hi)
+        else:
+            merged.append((lo, hi))
+    return merged
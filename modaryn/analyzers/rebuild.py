@@ -0,0 +1,136 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from modaryn.analyzers.column_diff import ADDED, MODIFIED, REMOVED, ProjectDiff
+from modaryn.analyzers.impact import ColumnKey, ImpactAnalyzer
+from modaryn.domain.model import DbtProject
+
+
+@dataclass
+class RebuildPlan:
+    """Models that have to be rebuilt after a change, narrowed by column lineage."""
+    # Selected models in project order.
+    models: List[str] = field(default_factory=list)
+    # Columns the walk started from: changed columns plus columns that may read a removed one.
+    sources: List[ColumnKey] = field(default_factory=list)
+    # Models whose lineage could not be followed column by column; they and their descendants are rebuilt.
+    opaque_models: List[str] = field(default_factory=list)
+    # What dbt's ``state:modified+`` would build: every changed model and all of its descendants.
+    modified_plus: List[str] = field(default_factory=list)
+
+
+def plan_rebuild(
+    project: DbtProject,
+    diff: ProjectDiff,
+    impact_analyzer: ImpactAnalyzer,
+    previous_upstream: Optional[Dict[str, Dict[str, List[Tuple[str, str]]]]] = None,
+) -> RebuildPlan:
+    """Selects the changed models plus the models holding a column that a changed column reaches.
+
+    A removed column affects the columns that read it in the previous run's lineage
+    (``previous_upstream``, ``{unique_id: {column: [(model, column), ...]}}`` from
+    ``modaryn_state.json``); without it, every column of its model's children is assumed to.
+    Column lineage is only as complete as the documented columns, so the walk stays
+    conservative where it cannot see: a child of an affected model is rebuilt with all of its
+    descendants when it has no column lineage at all (no documented columns, no compiled SQL, or
+    a model-level lineage failure), and its columns whose lineage failed become sources. So is
+    every child of a model with a changed column outside the column graph (e.g. undocumented).
+    """
+    order = {unique_id: i for i, unique_id in enumerate(project.models)}
+    sources = changed_sources(project, diff, previous_upstream)
+    changed_models = set(diff.new_models) | {change.model_id for change in diff.changes if change.model_id in project.models}
+    changed_models.update(model_id for model_id, _ in sources)
+
+    # A change the column graph cannot follow (an undocumented column, or a model that could not be
+    # compared) may reach any column of the model's children, so they are rebuilt with their descendants.
+    untracked = set(diff.uncompared_models) | {
+        model_id for model_id, column in diff.columns(ADDED, MODIFIED)
+        if model_id in project.models and project.column_graph.column_id(model_id, column) is None
+    }
+    opaque: Set[str] = {child_id for model_id in untracked for child_id in project.models[model_id].children}
+    checked: Set[str] = set()
+    while True:
+        result = impact_analyzer.downstream_many(sources)
+        affected_models = {model_id for model_id, _ in sources} | {model_id for model_id, _ in result.attribution}
+        affected_models |= changed_models
+        new_sources: List[ColumnKey] = []
+        for model_id in sorted(affected_models - checked, key=order.__getitem__):
+            checked.add(model_id)
+            for child_id in project.models[model_id].children:
+                if child_id in opaque:
+                    continue
+                unresolved = _unresolved_columns(project, impact_analyzer, child_id)
+                if unresolved is None:
+                    opaque.add(child_id)
+                else:
+                    new_sources.extend(key for key in unresolved if key not in sources and key not in new_sources)
+        if not new_sources:
+            break
+        sources.extend(new_sources)
+
+    selected = changed_models | affected_models | opaque
+    selected.update(impact_analyzer.descendants(*opaque))
+    modified_plus = set(changed_models) | set(impact_analyzer.descendants(*changed_models))
+    return RebuildPlan(
+        models=sorted(selected, key=order.__getitem__),
+        sources=sources,
+        opaque_models=sorted(opaque, key=order.__getitem__),
+        modified_plus=sorted(modified_plus, key=order.__getitem__),
+    )
+
+
+def changed_sources(
+    project: DbtProject,
+    diff: ProjectDiff,
+    previous_upstream: Optional[Dict[str, Dict[str, List[Tuple[str, str]]]]] = None,
+) -> List[ColumnKey]:
+    """Current columns a change starts from: added and modified columns, plus the readers of removed ones.
+
+    ``previous_upstream`` is as for ``plan_rebuild``.
+    """
+    graph = project.column_graph
+    sources: List[ColumnKey] = [key for key in diff.columns(ADDED, MODIFIED) if graph.column_id(*key) is not None]
+    removed = set(diff.columns(REMOVED))
+    if removed:
+        readers = _readers_of(project, removed, previous_upstream)
+        sources.extend(key for key in readers if key not in sources)
+    return sources
+
+
+def _readers_of(
+    project: DbtProject,
+    removed: Set[ColumnKey],
+    previous_upstream: Optional[Dict[str, Dict[str, List[Tuple[str, str]]]]],
+) -> List[ColumnKey]:
+    """Current columns that read a removed column."""
+    readers: List[ColumnKey] = []
+    if previous_upstream is not None:
+        for unique_id, upstream in previous_upstream.items():
+            if unique_id not in project.models:
+                continue
+            for column_name, refs in upstream.items():
+                if column_name in project.models[unique_id].columns and any(tuple(ref) in removed for ref in refs):
+                    readers.append((unique_id, column_name))
+        return readers
+    for model_id in dict.fromkeys(model_id for model_id, _ in removed):
+        children = project.models[model_id].children if model_id in project.models else []
+        for child_id in children:
+            readers.extend((child_id, column_name) for column_name in project.models[child_id].columns)
+    return readers
+
+
+def _unresolved_columns(project: DbtProject, impact_analyzer: ImpactAnalyzer, unique_id: str) -> Optional[List[ColumnKey]]:
+    """Columns of ``unique_id`` whose lineage failed, or None when the model has no usable lineage."""
+    model = project.models[unique_id]
+    if not model.columns or not model.compiled_sql or model.language != "sql":
+        return None
+    lineage_analyzer = impact_analyzer.lineage_analyzer
+    if lineage_analyzer is None:
+        return []  # A complete column graph was supplied.
+    if unique_id not in impact_analyzer.traced:
+        lineage_analyzer.trace_models(project, [unique_id])
+        impact_analyzer.traced.add(unique_id)
+    failed = lineage_analyzer.unresolved_columns(unique_id)
+    if failed is None:
+        return None
+    return [(unique_id, name) for name in model.columns if name in failed]
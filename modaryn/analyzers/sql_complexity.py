@@ -1,8 +1,12 @@
+import sys
 from dataclasses import dataclass
+from typing import Optional
 import sqlglot
 
+from modaryn.analyzers.sql_parse import SqlParseCache
 
-@dataclass
+
+@dataclass(**({"slots": True} if sys.version_info >= (3, 10) else {}))
 class SqlComplexityResult:
     join_count: int
     cte_count: int
@@ -12,8 +16,9 @@ class SqlComplexityResult:
 
 
 class SqlComplexityAnalyzer:
-    def __init__(self, dialect: str = "bigquery"):
+    def __init__(self, dialect: str = "bigquery", parse_cache: Optional[SqlParseCache] = None):
         self.dialect = dialect
+        self.parse_cache = parse_cache
 
     def analyze(self, sql: str) -> SqlComplexityResult:
         """
@@ -26,7 +31,10 @@ class SqlComplexityAnalyzer:
             A dictionary containing complexity metrics.
         """
         try:
-            expression = sqlglot.parse_one(sql, read=self.dialect)
+            if self.parse_cache is not None:
+                expression = self.parse_cache.get(sql)
+            else:
+                expression = sqlglot.parse_one(sql, read=self.dialect)
         except sqlglot.errors.ParseError as e:
             # If sqlglot can't parse, return zero for all metrics
             # We don't print warnings here to avoid polluting test output
@@ -0,0 +1,46 @@
+from typing import Dict, Union
+
+import sqlglot
+from sqlglot import exp
+
+
+class SqlParseCache:
+    """Parses each compiled SQL string once and shares the AST between analyzers.
+
+    SqlComplexityAnalyzer and LineageAnalyzer both read from the same cache, so a model's
+    SQL is parsed once per run instead of once per analyzer (and per lineage column).
+    Parse failures are cached too, so a broken model fails fast on every later lookup.
+    Callers must treat returned expressions as read-only (copy before qualifying).
+    """
+
+    def __init__(self, dialect: str = "bigquery"):
+        self.dialect = dialect
+        self.parse_count = 0
+        self._entries: Dict[str, Union[exp.Expression, sqlglot.errors.ParseError]] = {}
+
+    def get(self, sql: str) -> exp.Expression:
+        """Returns the parsed expression for ``sql``, raising the cached ParseError on failure."""
+        entry = self._entries.get(sql)
+        if entry is None:
+            self.parse_count += 1
+            try:
+                entry = sqlglot.parse_one(sql, read=self.dialect)
+            except sqlglot.errors.ParseError as e:
+                entry = e
+            self._entries[sql] = entry
+        if isinstance(entry, sqlglot.errors.ParseError):
+            raise entry.with_traceback(None)
+        return entry
+
+    def discard(self, sql: str):
+        """Drops the cached AST for ``sql`` once no analyzer needs it anymore."""
+        self._entries.pop(sql, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, sql: str) -> bool:
+        return sql in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
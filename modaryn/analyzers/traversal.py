@@ -0,0 +1,152 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from modaryn.analyzers.impact import ColumnKey
+from modaryn.analyzers.lineage import LineageAnalyzer
+from modaryn.domain.model import DbtProject
+
+UPSTREAM = "upstream"
+DOWNSTREAM = "downstream"
+
+
+@dataclass
+class TraversalResult:
+    """Columns found by a bounded walk from one column, grouped by hop distance (BFS)."""
+    direction: str
+    by_hop: Dict[int, List[ColumnKey]] = field(default_factory=dict)
+    # The walk stopped at max_results with more columns left to list.
+    truncated: bool = False
+    # The walk stopped at max_depth while the last hop still had columns to expand.
+    depth_limited: bool = False
+
+    @property
+    def count(self) -> int:
+        return sum(len(keys) for keys in self.by_hop.values())
+
+
+class ColumnTraversal:
+    """Upstream and downstream column lineage walks with depth and result limits.
+
+    Given a ``LineageAnalyzer``, lineage is traced only for the models a walk actually expands: a
+    column's upstream edges need its own model traced, and its downstream edges need every child
+    of its model traced. A model's lineage depends only on its own SQL and its parents' declared
+    columns, so models can be traced in any order. Without an analyzer, the project's column graph
+    is taken as already complete.
+    """
+
+    def __init__(self, project: DbtProject, lineage_analyzer: Optional[LineageAnalyzer] = None):
+        self.project = project
+        self.lineage_analyzer = lineage_analyzer
+        # Models whose lineage has been traced by this traversal.
+        self.traced: Set[str] = set()
+        self._positions = {unique_id: i for i, unique_id in enumerate(project.models)}
+
+    def upstream(self, model_id: str, column: str, max_depth: Optional[int] = None, max_results: Optional[int] = None) -> TraversalResult:
+        """Columns that ``model_id.column`` is derived from, nearest first."""
+        return self._walk(UPSTREAM, model_id, column, max_depth, max_results)
+
+    def downstream(self, model_id: str, column: str, max_depth: Optional[int] = None, max_results: Optional[int] = None) -> TraversalResult:
+        """Columns derived from ``model_id.column``, nearest first, in ``impact`` order."""
+        return self._walk(DOWNSTREAM, model_id, column, max_depth, max_results)
+
+    def root_sources(self, model_id: str, column: str) -> List[ColumnKey]:
+        """The columns at the ends of every upstream chain of ``model_id.column``, in project order.
+
+        A root has no upstream column in the project: it reads from a dbt source or a seed, or its
+        lineage could not be resolved. A column without upstream columns has no roots of its own.
+        """
+        graph = self.project.column_graph
+        source_id = graph.column_id(model_id, column)
+        if source_id is None:
+            return []
+        visited = {source_id}
+        frontier = [source_id]
+        roots = []
+        while frontier:
+            # One trace per level, as in _walk, before any adjacency of that level is read.
+            self._prepare_upstream(frontier)
+            next_frontier = []
+            for column_id in frontier:
+                upstream_ids = graph.upstream(column_id)
+                if not upstream_ids and column_id != source_id:
+                    roots.append(column_id)
+                for upstream_id in upstream_ids:
+                    if upstream_id not in visited:
+                        visited.add(upstream_id)
+                        next_frontier.append(upstream_id)
+            frontier = next_frontier
+        return [graph.column_ref(column_id) for column_id in sorted(roots)]
+
+    def _walk(self, direction: str, model_id: str, column: str, max_depth: Optional[int], max_results: Optional[int]) -> TraversalResult:
+        graph = self.project.column_graph
+        result = TraversalResult(direction=direction)
+        source_id = graph.column_id(model_id, column)
+        if source_id is None:
+            return result
+        if direction == UPSTREAM:
+            prepare, neighbours = self._prepare_upstream, self._ordered_upstream
+        else:
+            prepare, neighbours = self._prepare_downstream, self._ordered_downstream
+
+        visited = {source_id}
+        frontier = [source_id]
+        found = 0
+        hop = 0
+        while frontier:
+            if max_depth is not None and hop >= max_depth:
+                # Limited only if the last hop has a column the walk would still have reached.
+                prepare(frontier)
+                result.depth_limited = any(
+                    target_id not in visited for column_id in frontier for target_id in neighbours(column_id)
+                )
+                break
+            hop += 1
+            prepare(frontier)
+            next_frontier = []
+            for column_id in frontier:
+                for target_id in neighbours(column_id):
+                    if target_id in visited:
+                        continue
+                    if max_results is not None and found >= max_results:
+                        result.truncated = True
+                        break
+                    visited.add(target_id)
+                    next_frontier.append(target_id)
+                    found += 1
+                if result.truncated:
+                    break
+            if next_frontier:
+                result.by_hop[hop] = [graph.column_ref(column_id) for column_id in next_frontier]
+            if result.truncated:
+                break
+            frontier = next_frontier
+        return result
+
+    def _prepare_upstream(self, column_ids: Iterable[int]):
+        graph = self.project.column_graph
+        self._ensure_traced(graph.model_of(column_id) for column_id in column_ids)
+
+    def _prepare_downstream(self, column_ids: Iterable[int]):
+        graph = self.project.column_graph
+        model_ids = {graph.model_of(column_id) for column_id in column_ids}
+        self._ensure_traced(child_id for model_id in model_ids for child_id in self.project.models[model_id].children)
+
+    def _ensure_traced(self, model_ids: Iterable[str]):
+        if self.lineage_analyzer is None:
+            return
+        pending = sorted(
+            {unique_id for unique_id in model_ids if unique_id not in self.traced and unique_id in self.project.models},
+            key=self._positions.__getitem__,
+        )
+        if pending:
+            self.lineage_analyzer.trace_models(self.project, pending)
+            self.traced.update(pending)
+
+    def _ordered_upstream(self, column_id: int) -> List[int]:
+        # Column ids follow project model order, then column order within a model.
+        return sorted(self.project.column_graph.upstream(column_id))
+
+    def _ordered_downstream(self, column_id: int) -> List[int]:
+        """Downstream ids in project model order, as a full analysis would have inserted them."""
+        graph = self.project.column_graph
+        return sorted(graph.downstream(column_id), key=lambda target_id: self._positions[graph.model_of(target_id)])
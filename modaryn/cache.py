@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import sqlglot
+
+from modaryn.analyzers.sql_complexity import SqlComplexityResult
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+CACHE_DIR_NAME = ".modaryn_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Bump whenever the analyzers change in a way that alters cached results.
+CACHE_FORMAT_VERSION = 6
+
+COMPLEXITY = "complexity"
+LINEAGE = "lineage"
+_NAMESPACES = (COMPLEXITY, LINEAGE)
+# After eviction the cache is trimmed below the cap so the next run does not immediately evict again.
+_PRUNE_TARGET_RATIO = 0.9
+
+
+@dataclass
+class CacheStats:
+    entries: Dict[str, int]
+    total_bytes: int
+    max_bytes: int
+
+
+class AnalysisCache:
+    """Content-addressed on-disk cache for per-model analysis results.
+
+    Entries live under ``<root>/<namespace>/<ab>/<sha256>.json`` and are keyed by a hash of
+    everything the result depends on (compiled SQL, dialect, sqlglot version and, for lineage,
+    the upstream schema), so unchanged models are served without parsing. Writes are atomic
+    (temp file + rename) and serialized with an advisory file lock, so parallel runs can share
+    one cache directory. Reads refresh an entry's mtime, which drives LRU eviction in ``prune``.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_project(cls, project_path: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> "AnalysisCache":
+        return cls(project_path / CACHE_DIR_NAME, max_bytes=max_bytes)
+
+    @staticmethod
+    def make_key(namespace: str, dialect: str, sql: str, *extra: Any) -> str:
+        payload = json.dumps(
+            [CACHE_FORMAT_VERSION, namespace, sqlglot.__version__, dialect, sql, *extra],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, namespace: str, key: str) -> Path:
+        return self.root / namespace / key[:2] / f"{key}.json"
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        path = self._entry_path(namespace, key)
+        try:
+            with open(path, "r") as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, namespace: str, key: str, value: Any):
+        path = self._entry_path(namespace, key)
+        try:
+            with self._lock():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+                with os.fdopen(fd, "w") as f:
+                    json.dump(value, f, separators=(",", ":"))
+                os.replace(tmp_path, path)
+        except OSError:
+            # The cache is an optimization; a read-only or full disk must not fail the run.
+            pass
+
+    # --- Typed accessors -------------------------------------------------
+
+    def get_complexity(self, key: str) -> Optional[SqlComplexityResult]:
+        value = self.get(COMPLEXITY, key)
+        return SqlComplexityResult(**value) if value is not None else None
+
+    def put_complexity(self, key: str, result: SqlComplexityResult):
+        self.put(COMPLEXITY, key, asdict(result))
+
+    def get_lineage(self, key: str) -> Optional[Tuple[Dict[str, List[Tuple[str, str]]], List[str], Optional[List[str]]]]:
+        """Returns ``(upstream refs per column, warning messages, unresolved columns)`` for a cached model."""
+        value = self.get(LINEAGE, key)
+        if value is None:
+            return None
+        upstream = {col: [tuple(ref) for ref in refs] for col, refs in value["upstream"].items()}
+        return upstream, value["warnings"], value["unresolved"]
+
+    def put_lineage(
+        self,
+        key: str,
+        upstream: Dict[str, List[Tuple[str, str]]],
+        warning_messages: List[str],
+        unresolved: Optional[List[str]],
+    ):
+        self.put(LINEAGE, key, {"upstream": upstream, "warnings": warning_messages, "unresolved": unresolved})
+
+    # --- Maintenance -----------------------------------------------------
+
+    def _iter_entries(self) -> Iterator[Tuple[str, Path]]:
+        for namespace in _NAMESPACES:
+            namespace_dir = self.root / namespace
+            if namespace_dir.is_dir():
+                for path in namespace_dir.glob("*/*.json"):
+                    yield namespace, path
+
+    def stats(self) -> CacheStats:
+        entries = {namespace: 0 for namespace in _NAMESPACES}
+        total_bytes = 0
+        for namespace, path in self._iter_entries():
+            try:
+                total_bytes += path.stat().st_size
+            except OSError:
+                continue
+            entries[namespace] += 1
+        return CacheStats(entries=entries, total_bytes=total_bytes, max_bytes=self.max_bytes)
+
+    def prune(self) -> int:
+        """Evicts least recently used entries until the cache fits in ``max_bytes``.
+
+        Returns the number of evicted entries; 0 when the cache directory cannot be written.
+        """
+        if not self.root.is_dir():
+            return 0
+        try:
+            return self._evict()
+        except OSError:
+            # Like put(), a read-only cache must not fail a run whose analysis already finished.
+            return 0
+
+    def _evict(self) -> int:
+        with self._lock():
+            files = []
+            for _, path in self._iter_entries():
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+            total_bytes = sum(size for _, size, _ in files)
+            if total_bytes <= self.max_bytes:
+                return 0
+
+            target = int(self.max_bytes * _PRUNE_TARGET_RATIO)
+            evicted = 0
+            for _, size, path in sorted(files, key=lambda f: f[0]):
+                if total_bytes <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total_bytes -= size
+                evicted += 1
+            return evicted
+
+    def clear(self) -> int:
+        """Removes every cache entry. Returns the number of removed entries.
+
+        Raises OSError when the cache directory cannot be modified.
+        """
+        if not self.root.is_dir():
+            return 0
+        with self._lock():
+            removed = sum(1 for _ in self._iter_entries())
+            for namespace in _NAMESPACES:
+                if (self.root / namespace).is_dir():
+                    shutil.rmtree(self.root / namespace)
+        return removed
@@ -1,14 +1,27 @@
+import json
 import warnings
 import typer
+from contextlib import contextmanager
+import yaml
 from pathlib import Path
 from rich.console import Console # Keep Console for general messages
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn
-from typing import List, Optional
+from typing import Dict, List, Optional
 from enum import Enum
 
+from modaryn.cache import AnalysisCache
 from modaryn.loaders.manifest import ManifestLoader, apply_select
+from modaryn.loaders.selector import parse_selector
 from modaryn.analyzers.lineage import LineageAnalyzer
+from modaryn.analyzers.impact import ImpactAnalyzer, impacted_tests
+from modaryn.analyzers.traversal import ColumnTraversal
+from modaryn.analyzers.column_diff import ADDED, MODIFIED, REMOVED, diff_project, modified_models
+from modaryn.analyzers.rebuild import changed_sources, plan_rebuild
+from modaryn.loaders.state import AnalysisState, read_previous_models, read_previous_sql
+from modaryn.analyzers.reachability import REACHABILITY_FILE_NAME, ReachabilityIndex, manifest_fingerprint
 from modaryn.scorers.score import Scorer
+from modaryn.scorers.sweep import load_grid, run_sweep
+from modaryn.domain.features import FeatureMatrix
 from modaryn.outputs.terminal import TerminalOutput
 from modaryn.outputs.markdown import MarkdownOutput
 from modaryn.outputs.html import HtmlOutput
@@ -22,6 +35,17 @@ class OutputFormat(str, Enum):
     html = "html"
 
 
+class DiffFormat(str, Enum):
+    text = "text"
+    json = "json"
+
+
+class LineageDirection(str, Enum):
+    upstream = "upstream"
+    downstream = "downstream"
+    both = "both"
+
+
 from importlib.metadata import version as _pkg_version, PackageNotFoundError
 try:
     __version__ = _pkg_version("modaryn")
@@ -34,6 +58,61 @@ app = typer.Typer(
 app.info.version = __version__ # Set version directly on app.info
 console = Console() # Keep for general messages
 
+# Options shared by several commands.
+_PROJECT_PATH_OPTION = typer.Option(
+    ".",
+    "--project-path",
+    "-p",
+    help="Path to the dbt project directory.",
+    exists=True,
+    readable=True,
+    resolve_path=True,
+)
+_DIALECT_OPTION = typer.Option(
+    None,
+    "--dialect",
+    "-d",
+    help="The SQL dialect to use for parsing (e.g. bigquery, snowflake, duckdb). Auto-detected from manifest.json if not specified.",
+    case_sensitive=False,
+)
+_JOBS_OPTION = typer.Option(
+    "1",
+    "--jobs",
+    "-j",
+    help="Number of parallel workers for SQL parsing and column-level lineage, or 'auto' to use all available CPUs (respects container CPU limits).",
+)
+_NO_CACHE_OPTION = typer.Option(
+    False,
+    "--no-cache",
+    help="Disable the on-disk analysis cache (.modaryn_cache/ under the project).",
+)
+_COMPACT_OPTION = typer.Option(
+    False,
+    "--compact",
+    help="Reduce memory on large projects: re-parse SQL per model instead of holding every parsed AST, and release compiled SQL after analysis.",
+)
+_SELECT_OPTION = typer.Option(
+    None,
+    "--select",
+    "-s",
+    help="Filter models by selector. Supports: model name glob (fct_*), path:marts/finance, tag:daily, and the graph operators +model, model+2 and @model. Multiple flags = OR logic.",
+)
+_VERBOSE_OPTION = typer.Option(
+    False,
+    "--verbose",
+    "-v",
+    help="Show detailed warnings (e.g. columns skipped during lineage analysis).",
+)
+_PREVIOUS_STATE_OPTION = typer.Option(
+    ...,
+    "--state",
+    help="Directory with the previous (e.g. production) manifest.json to compare against. A modaryn_state.json and compiled/ SQL there are used when present.",
+    exists=True,
+    file_okay=False,
+    resolve_path=True,
+)
+
+
 @app.callback(invoke_without_command=True)
 def main(ctx: typer.Context):
     """
@@ -45,22 +124,11 @@ def main(ctx: typer.Context):
 
 @app.command()
 def score(
-    project_path: Path = typer.Option(
-        ".",
-        "--project-path",
-        "-p",
-        help="Path to the dbt project directory.",
-        exists=True,
-        readable=True,
-        resolve_path=True,
-    ),
-    dialect: Optional[str] = typer.Option(
-        None,
-        "--dialect",
-        "-d",
-        help="The SQL dialect to use for parsing (e.g. bigquery, snowflake, duckdb). Auto-detected from manifest.json if not specified.",
-        case_sensitive=False,
-    ),
+    project_path: Path = _PROJECT_PATH_OPTION,
+    dialect: Optional[str] = _DIALECT_OPTION,
+    jobs: str = _JOBS_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    compact: bool = _COMPACT_OPTION,
     config: Optional[Path] = typer.Option(
         None,
         "--config",
@@ -90,27 +158,35 @@ def score(
         help="Path to write the output file.",
         writable=True,
     ),
-    select: Optional[List[str]] = typer.Option(
+    select: Optional[List[str]] = _SELECT_OPTION,
+    state: Optional[Path] = typer.Option(
         None,
-        "--select",
-        "-s",
-        help="Filter models by selector. Supports: model name glob (fct_*), path:marts/finance, tag:daily. Multiple flags = OR logic.",
+        "--state",
+        help="Directory with a previous run's artifacts (manifest.json and modaryn_state.json). Only models that changed since then, plus their direct children, are re-analyzed.",
+        exists=True,
+        file_okay=False,
+        resolve_path=True,
     ),
-    verbose: bool = typer.Option(
+    no_column_lineage: bool = typer.Option(
         False,
-        "--verbose",
-        "-v",
-        help="Show detailed warnings (e.g. columns skipped during lineage analysis).",
+        "--no-column-lineage",
+        help="Skip column-level lineage; its weights (downstream_column_count, downstream_column_model_spread, untested_downstream_column_penalty) then see 0. Skipped automatically when all of them are 0.",
     ),
+    verbose: bool = _VERBOSE_OPTION,
 ):
     """
     Analyzes and scores dbt models based on complexity and importance, displaying combined scan and score information.
     """
+    scorer = Scorer(config)
+    skip_reason = _lineage_skip_reason(no_column_lineage, [scorer])
+    _check_selectors(select)
     console.print(f"🔍 Loading dbt project: [bold cyan]{project_path}[/bold cyan]")
     with warnings.catch_warnings(record=True) as caught_warnings:
         warnings.simplefilter("always")
         try:
-            loader = ManifestLoader(project_path, dialect=dialect)
+            cache = None if no_cache else AnalysisCache.for_project(project_path)
+            # Without lineage, the parsed ASTs have no second use.
+            loader = ManifestLoader(project_path, dialect=dialect, jobs=jobs, cache=cache, state_path=state, compact=compact or skip_reason is not None, select=select)
             project = loader.load()
         except Exception as e:
             console.print(f"[bold red]Error loading manifest file: {e}[/bold red]")
@@ -123,34 +199,21 @@ def score(
         console.print(f"🔍 Project loaded. [yellow]({len(load_warnings)} model(s) missing compiled SQL — use --verbose for details)[/yellow]")
 
     if select:
-        project = apply_select(project, select)
-        console.print(f"🔎 Selector applied: [bold cyan]{', '.join(select)}[/bold cyan] → {len(project.models)} model(s) selected")
+        console.print(f"🔎 Selector applied: [bold cyan]{', '.join(select)}[/bold cyan] → {len(project.models)} model(s) selected, {len(project.context_models)} neighbouring model(s) loaded for lineage")
         if not project.models:
             console.print("[bold red]No models matched the given selector(s).[/bold red]")
             raise typer.Exit(code=1)
 
+    if state:
+        console.print(f"♻️  State comparison against [bold cyan]{state}[/bold cyan]: reusing results for {len(loader.state_reuse)} of {len(project.models)} model(s)")
+
     resolved_dialect = loader.dialect
     if not dialect:
         console.print(f"🔎 Auto-detected SQL dialect: [bold cyan]{resolved_dialect}[/bold cyan] (use --dialect to override)")
 
-    lineage_analyzer = LineageAnalyzer(dialect=resolved_dialect)
-    total_models = len(project.models)
-    with warnings.catch_warnings(record=True) as caught_warnings:
-        warnings.simplefilter("always")
-        with Progress(SpinnerColumn(), TextColumn("{task.description}"), BarColumn(), MofNCompleteColumn(), console=console, transient=True) as progress:
-            task = progress.add_task(f"📊 Analyzing column-level lineage ({total_models} models)...", total=total_models)
-            lineage_analyzer.analyze(project, on_progress=lambda cur, _total: progress.update(task, completed=cur))
-    lineage_warnings = [w for w in caught_warnings if issubclass(w.category, UserWarning)]
-    if lineage_warnings and verbose:
-        for w in lineage_warnings:
-            console.print(f"  [yellow]⚠ {w.message}[/yellow]")
-    if lineage_warnings:
-        console.print(f"📊 Column-level lineage analysis complete. [yellow]({len(lineage_warnings)} column(s) skipped — use --verbose for details)[/yellow]")
-    else:
-        console.print(f"📊 Column-level lineage analysis complete.")
+    _run_column_lineage(project, loader, cache, jobs, compact, verbose, skip_reason, write_state=not select)
 
     console.print(f"⚖️  Scoring project...")
-    scorer = Scorer(config)
     with warnings.catch_warnings(record=True) as caught_warnings:
         warnings.simplefilter("always")
         scorer.score_project(project, apply_zscore=apply_zscore)
@@ -186,28 +249,17 @@ def score(
 
 @app.command()
 def ci_check(
-    project_path: Path = typer.Option(
-        ".",
-        "--project-path",
-        "-p",
-        help="Path to the dbt project directory.",
-        exists=True,
-        readable=True,
-        resolve_path=True,
-    ),
+    project_path: Path = _PROJECT_PATH_OPTION,
     threshold: float = typer.Option(
         ..., # ... means required
         "--threshold",
         "-t",
         help="The maximum allowed Z-score for models. CI will fail if any model exceeds this.",
     ),
-    dialect: Optional[str] = typer.Option(
-        None,
-        "--dialect",
-        "-d",
-        help="The SQL dialect to use for parsing (e.g. bigquery, snowflake, duckdb). Auto-detected from manifest.json if not specified.",
-        case_sensitive=False,
-    ),
+    dialect: Optional[str] = _DIALECT_OPTION,
+    jobs: str = _JOBS_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    compact: bool = _COMPACT_OPTION,
     config: Optional[Path] = typer.Option(
         None,
         "--config",
@@ -237,29 +289,37 @@ def ci_check(
         help="Path to write the output file.",
         writable=True,
     ),
-    select: Optional[List[str]] = typer.Option(
+    select: Optional[List[str]] = _SELECT_OPTION,
+    state: Optional[Path] = typer.Option(
         None,
-        "--select",
-        "-s",
-        help="Filter models by selector. Supports: model name glob (fct_*), path:marts/finance, tag:daily. Multiple flags = OR logic.",
+        "--state",
+        help="Directory with a previous run's artifacts (manifest.json and modaryn_state.json). Only models that changed since then, plus their direct children, are re-analyzed.",
+        exists=True,
+        file_okay=False,
+        resolve_path=True,
     ),
-    verbose: bool = typer.Option(
+    no_column_lineage: bool = typer.Option(
         False,
-        "--verbose",
-        "-v",
-        help="Show detailed warnings (e.g. columns skipped during lineage analysis).",
+        "--no-column-lineage",
+        help="Skip column-level lineage; its weights (downstream_column_count, downstream_column_model_spread, untested_downstream_column_penalty) then see 0. Skipped automatically when all of them are 0.",
     ),
+    verbose: bool = _VERBOSE_OPTION,
 ):
     """
     Checks dbt model complexity against a defined score threshold for CI pipelines.
     By default, uses raw scores. Use --apply-zscore to check against Z-scores.
     Exits with code 1 if any model's score exceeds the threshold, 0 otherwise.
     """
+    scorer = Scorer(config)
+    skip_reason = _lineage_skip_reason(no_column_lineage, [scorer])
+    _check_selectors(select)
     console.print(f"🔍 Loading dbt project: [bold cyan]{project_path}[/bold cyan]")
     with warnings.catch_warnings(record=True) as caught_warnings:
         warnings.simplefilter("always")
         try:
-            loader = ManifestLoader(project_path, dialect=dialect)
+            cache = None if no_cache else AnalysisCache.for_project(project_path)
+            # Without lineage, the parsed ASTs have no second use.
+            loader = ManifestLoader(project_path, dialect=dialect, jobs=jobs, cache=cache, state_path=state, compact=compact or skip_reason is not None, select=select)
             project = loader.load()
         except Exception as e:
             console.print(f"[bold red]Error loading manifest file: {e}[/bold red]")
@@ -272,34 +332,21 @@ def ci_check(
         console.print(f"🔍 Project loaded. [yellow]({len(load_warnings)} model(s) missing compiled SQL — use --verbose for details)[/yellow]")
 
     if select:
-        project = apply_select(project, select)
-        console.print(f"🔎 Selector applied: [bold cyan]{', '.join(select)}[/bold cyan] → {len(project.models)} model(s) selected")
+        console.print(f"🔎 Selector applied: [bold cyan]{', '.join(select)}[/bold cyan] → {len(project.models)} model(s) selected, {len(project.context_models)} neighbouring model(s) loaded for lineage")
         if not project.models:
             console.print("[bold red]No models matched the given selector(s).[/bold red]")
             raise typer.Exit(code=1)
 
+    if state:
+        console.print(f"♻️  State comparison against [bold cyan]{state}[/bold cyan]: reusing results for {len(loader.state_reuse)} of {len(project.models)} model(s)")
+
     resolved_dialect = loader.dialect
     if not dialect:
         console.print(f"🔎 Auto-detected SQL dialect: [bold cyan]{resolved_dialect}[/bold cyan] (use --dialect to override)")
 
-    lineage_analyzer = LineageAnalyzer(dialect=resolved_dialect)
-    total_models = len(project.models)
-    with warnings.catch_warnings(record=True) as caught_warnings:
-        warnings.simplefilter("always")
-        with Progress(SpinnerColumn(), TextColumn("{task.description}"), BarColumn(), MofNCompleteColumn(), console=console, transient=True) as progress:
-            task = progress.add_task(f"📊 Analyzing column-level lineage ({total_models} models)...", total=total_models)
-            lineage_analyzer.analyze(project, on_progress=lambda cur, _total: progress.update(task, completed=cur))
-    lineage_warnings = [w for w in caught_warnings if issubclass(w.category, UserWarning)]
-    if lineage_warnings and verbose:
-        for w in lineage_warnings:
-            console.print(f"  [yellow]⚠ {w.message}[/yellow]")
-    if lineage_warnings:
-        console.print(f"📊 Column-level lineage analysis complete. [yellow]({len(lineage_warnings)} column(s) skipped — use --verbose for details)[/yellow]")
-    else:
-        console.print(f"📊 Column-level lineage analysis complete.")
+    _run_column_lineage(project, loader, cache, jobs, compact, verbose, skip_reason, write_state=not select)
 
     console.print(f"⚖️  Scoring project and checking thresholds...")
-    scorer = Scorer(config)
     with warnings.catch_warnings(record=True) as caught_warnings:
         warnings.simplefilter("always")
         scorer.score_project(project, apply_zscore=apply_zscore)
@@ -354,58 +401,88 @@ def ci_check(
 
 
 @app.command()
-def impact(
-    project_path: Path = typer.Option(
-        ".",
-        "--project-path",
-        "-p",
-        help="Path to the dbt project directory.",
+def sweep(
+    project_path: Path = _PROJECT_PATH_OPTION,
+    config: Optional[List[Path]] = typer.Option(
+        None,
+        "--config",
+        "-c",
+        help="Weights configuration YAML file to compare against the default weights. Repeatable.",
         exists=True,
         readable=True,
         resolve_path=True,
     ),
-    model: str = typer.Option(
-        ...,
-        "--model",
-        "-m",
-        help="Model name to trace impact from.",
+    grid: Optional[Path] = typer.Option(
+        None,
+        "--grid",
+        "-g",
+        help="YAML grid spec (weights layout with a list of values per key); every combination is scored.",
+        exists=True,
+        readable=True,
+        resolve_path=True,
     ),
-    column: str = typer.Option(
-        ...,
-        "--column",
-        "-c",
-        help="Column name to trace impact from.",
+    top_n: int = typer.Option(
+        10,
+        "--top-n",
+        "-n",
+        min=1,
+        help="Size of the top-N ranking compared between configurations.",
     ),
-    dialect: Optional[str] = typer.Option(
-        None,
-        "--dialect",
-        "-d",
-        help="The SQL dialect to use for parsing (e.g. bigquery, snowflake, duckdb). Auto-detected from manifest.json if not specified.",
+    dialect: Optional[str] = _DIALECT_OPTION,
+    jobs: str = _JOBS_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    compact: bool = _COMPACT_OPTION,
+    format: OutputFormat = typer.Option(
+        OutputFormat.terminal,
+        "--format",
+        "-f",
+        help="Output format (terminal or markdown).",
         case_sensitive=False,
     ),
-    select: Optional[List[str]] = typer.Option(
+    output: Optional[Path] = typer.Option(
         None,
-        "--select",
-        "-s",
-        help="Filter models by selector. Supports: model name glob (fct_*), path:marts/finance, tag:daily. Multiple flags = OR logic.",
-    ),
-    verbose: bool = typer.Option(
-        False,
-        "--verbose",
-        "-v",
-        help="Show detailed warnings (e.g. columns skipped during lineage analysis).",
+        "--output",
+        "-o",
+        help="Path to write the output file.",
+        writable=True,
     ),
+    select: Optional[List[str]] = _SELECT_OPTION,
+    verbose: bool = _VERBOSE_OPTION,
 ):
     """
-    Shows all downstream columns affected by a change to a specific column (column-level impact analysis).
+    Scores the project under several weight configurations from a single analysis and compares the rankings.
+    The default weights are the reference; each configuration is reported with its Spearman rank
+    correlation and top-N overlap against it.
     """
-    from collections import deque
+    if not config and not grid:
+        console.print("[bold red]Pass at least one --config or a --grid spec to sweep.[/bold red]")
+        raise typer.Exit(code=1)
+    if format == OutputFormat.html:
+        console.print("[bold red]The sweep command supports terminal and markdown output only.[/bold red]")
+        raise typer.Exit(code=1)
 
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        try:
+            scorers = [("default", Scorer())]
+            scorers += [(path.name, Scorer(path)) for path in config or []]
+            if grid:
+                scorers += [(label, Scorer(overrides=overrides)) for label, overrides in load_grid(grid)]
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            console.print(f"[bold red]Error loading weights: {e}[/bold red]")
+            raise typer.Exit(code=1)
+    for w in caught_warnings:
+        if issubclass(w.category, UserWarning):
+            console.print(f"  [yellow]⚠ {w.message}[/yellow]")
+
+    skip_reason = _lineage_skip_reason(False, [scorer for _, scorer in scorers])
+    _check_selectors(select)
     console.print(f"🔍 Loading dbt project: [bold cyan]{project_path}[/bold cyan]")
     with warnings.catch_warnings(record=True) as caught_warnings:
         warnings.simplefilter("always")
         try:
-            loader = ManifestLoader(project_path, dialect=dialect)
+            cache = None if no_cache else AnalysisCache.for_project(project_path)
+            loader = ManifestLoader(project_path, dialect=dialect, jobs=jobs, cache=cache, compact=compact or skip_reason is not None, select=select)
             project = loader.load()
         except Exception as e:
             console.print(f"[bold red]Error loading manifest file: {e}[/bold red]")
@@ -418,8 +495,7 @@ def impact(
         console.print(f"🔍 Project loaded. [yellow]({len(load_warnings)} model(s) missing compiled SQL — use --verbose for details)[/yellow]")
 
     if select:
-        project = apply_select(project, select)
-        console.print(f"🔎 Selector applied: [bold cyan]{', '.join(select)}[/bold cyan] → {len(project.models)} model(s) selected")
+        console.print(f"🔎 Selector applied: [bold cyan]{', '.join(select)}[/bold cyan] → {len(project.models)} model(s) selected, {len(project.context_models)} neighbouring model(s) loaded for lineage")
         if not project.models:
             console.print("[bold red]No models matched the given selector(s).[/bold red]")
             raise typer.Exit(code=1)
@@ -428,63 +504,149 @@ def impact(
     if not dialect:
         console.print(f"🔎 Auto-detected SQL dialect: [bold cyan]{resolved_dialect}[/bold cyan] (use --dialect to override)")
 
-    lineage_analyzer = LineageAnalyzer(dialect=resolved_dialect)
-    total_models = len(project.models)
-    with warnings.catch_warnings(record=True) as caught_warnings:
-        warnings.simplefilter("always")
-        with Progress(SpinnerColumn(), TextColumn("{task.description}"), BarColumn(), MofNCompleteColumn(), console=console, transient=True) as progress:
-            task = progress.add_task(f"📊 Analyzing column-level lineage ({total_models} models)...", total=total_models)
-            lineage_analyzer.analyze(project, on_progress=lambda cur, _total: progress.update(task, completed=cur))
-    lineage_warnings = [w for w in caught_warnings if issubclass(w.category, UserWarning)]
-    if lineage_warnings and verbose:
-        for w in lineage_warnings:
-            console.print(f"  [yellow]⚠ {w.message}[/yellow]")
-    if lineage_warnings:
-        console.print(f"📊 Column-level lineage analysis complete. [yellow]({len(lineage_warnings)} column(s) skipped — use --verbose for details)[/yellow]")
+    _run_column_lineage(project, loader, cache, jobs, compact, verbose, skip_reason)
+
+    console.print(f"⚖️  Scoring {len(scorers)} weight configuration(s)...")
+    features = FeatureMatrix.from_project(project)
+    model_names = [project.models[unique_id].model_name for unique_id in features.unique_ids]
+    results = run_sweep(features, scorers, model_names, top_n=top_n)
+    top_n = min(top_n, len(model_names))
+
+    if format == OutputFormat.terminal:
+        # Same wide console as the score report, so configuration labels are not truncated.
+        TerminalOutput().generate_sweep_report(results, top_n)
+        if output:
+            console.print("[bold yellow]Warning: --output is ignored when using terminal format. Use -f markdown to save to a file.[/bold yellow]")
+        return
+
+    report_content = MarkdownOutput().generate_sweep_report(results, top_n)
+    if output:
+        with open(output, "w") as f:
+            f.write(report_content)
+        console.print(f"✅ Report saved to [bold cyan]{output}[/bold cyan]")
     else:
-        console.print(f"📊 Column-level lineage analysis complete.")
+        print(report_content)
 
-    # Find the target model
-    target_model_obj = next(
-        (m for m in project.models.values() if m.model_name == model), None
-    )
-    if not target_model_obj:
-        console.print(f"[bold red]Model '{model}' not found in project.[/bold red]")
-        raise typer.Exit(code=1)
 
-    if column not in target_model_obj.columns:
-        available = ", ".join(target_model_obj.columns.keys()) or "(none defined)"
-        console.print(f"[bold red]Column '{column}' not found in model '{model}'.[/bold red]")
-        console.print(f"Available columns: {available}")
+@app.command()
+def impact(
+    project_path: Path = _PROJECT_PATH_OPTION,
+    model: Optional[List[str]] = typer.Option(
+        None,
+        "--model",
+        "-m",
+        help="Model name to trace impact from. Without a bare --column, every column of the model is a source. Multiple flags allowed.",
+    ),
+    column: Optional[List[str]] = typer.Option(
+        None,
+        "--column",
+        "-c",
+        help="Column to trace impact from: 'model.column', or a bare column name of the single --model. Multiple flags allowed.",
+    ),
+    all_columns: bool = typer.Option(
+        False,
+        "--all",
+        help="List the blast radius of every column, largest first. Builds the reachability index (target/modaryn_reachability.json) that later impact queries are answered from.",
+    ),
+    top_n: int = typer.Option(
+        20,
+        "--top-n",
+        "-n",
+        min=1,
+        help="Number of columns listed by --all.",
+    ),
+    select_tests: bool = typer.Option(
+        False,
+        "--tests",
+        help="Also print a `dbt test --select` of the tests on the changed and affected columns, plus the model-level tests of their models.",
+    ),
+    dialect: Optional[str] = _DIALECT_OPTION,
+    jobs: str = _JOBS_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    compact: bool = _COMPACT_OPTION,
+    select: Optional[List[str]] = _SELECT_OPTION,
+    verbose: bool = _VERBOSE_OPTION,
+):
+    """
+    Shows all downstream columns affected by a change to one or more columns (column-level impact analysis).
+    Several sources are traced together; each affected column lists the sources that reach it.
+    With --all, lists the number of affected columns and models for every column instead.
+    """
+    if not all_columns and not model and not column:
+        console.print("[bold red]Pass --model and/or --column, or --all.[/bold red]")
         raise typer.Exit(code=1)
+    if all_columns and select_tests:
+        console.print("[bold yellow]Warning: --tests is ignored with --all. Pass --model/--column to select the tests of a change.[/bold yellow]")
 
-    # BFS traversal through downstream column references
-    console.print(f"\n[bold]Impact Analysis: [cyan]{model}[/cyan].[green]{column}[/green][/bold]\n")
+    loader = _lineage_loader(project_path, dialect, jobs, compact)
+    target_dir = project_path / "target"
+    fingerprint = None
+    if loader.manifest_path.exists():
+        fingerprint = manifest_fingerprint(loader.manifest_path, dialect or loader.detect_dialect())
+    # A reachability index built from the same manifest answers queries without any lineage analysis.
+    index = ReachabilityIndex.read(target_dir, fingerprint) if fingerprint and not select else None
 
-    visited = set()
-    queue = deque([(target_model_obj.unique_id, column, 0)])
-    results_by_hop: dict = {}
+    if index is not None:
+        console.print(f"🗂️  Using reachability index: [bold cyan]{target_dir / REACHABILITY_FILE_NAME}[/bold cyan]")
+        model_names = index.model_names
+        columns_by_model: Dict[str, List[str]] = {}
+        for model_id, col_name in index.columns:
+            columns_by_model.setdefault(model_id, []).append(col_name)
+    if index is None or (select_tests and not all_columns):
+        # Tests come from the manifest; with an index, lineage is still answered from the index.
+        project, lineage_analyzer = _load_for_impact(project_path, dialect, jobs, no_cache, compact, select, verbose, loader)
+        model_names = {unique_id: m.model_name for unique_id, m in project.models.items()}
+        columns_by_model = {unique_id: list(m.columns) for unique_id, m in project.models.items()}
 
-    while queue:
-        current_model_id, current_col, hop = queue.popleft()
-        key = (current_model_id, current_col)
-        if key in visited:
-            continue
-        visited.add(key)
+    if all_columns:
+        if index is None:
+            index = _build_reachability_index(project, loader, jobs, compact, fingerprint, None if select else target_dir, verbose)
+        rows = sorted(index.blast_radius(), key=lambda row: (-row[1], -row[2]))
+        if not rows:
+            console.print("[yellow]No downstream column references found.[/yellow]")
+            raise typer.Exit(code=0)
+        TerminalOutput().generate_blast_radius_report(rows, model_names, top_n)
+        return
 
-        if hop > 0:
-            results_by_hop.setdefault(hop, []).append((current_model_id, current_col))
+    sources = _resolve_impact_sources(model or [], column or [], model_names, columns_by_model)
+    if not sources:
+        console.print("[yellow]The selected model(s) have no columns to trace.[/yellow]")
+        raise typer.Exit(code=0)
 
-        current_model_obj = project.models.get(current_model_id)
-        if current_model_obj and current_col in current_model_obj.columns:
-            for ref in current_model_obj.columns[current_col].downstream_columns:
-                if (ref.model_unique_id, ref.column_name) not in visited:
-                    queue.append((ref.model_unique_id, ref.column_name, hop + 1))
+    if index is not None:
+        result = index.downstream_many(sources)
+    else:
+        # Lineage is traced once for all sources, and only where the changed columns can reach.
+        impact_analyzer = ImpactAnalyzer(project, lineage_analyzer)
+        status_label = _column_label(sources[0], model_names) if len(sources) == 1 else f"{len(sources)} column(s)"
+        with _tracing_lineage(lineage_analyzer, f"📊 Tracing downstream column-level lineage from {status_label}...") as caught_warnings:
+            result = impact_analyzer.downstream_many(sources)
+        if compact:
+            project.release_sql()
+        _report_lineage_warnings(caught_warnings, len(impact_analyzer.traced), len(project.models), lineage_analyzer, verbose)
+
+    _print_impact(result, model_names)
+    if select_tests:
+        _print_test_selector(project, result)
+
+
+def _print_impact(result, model_names):
+    """Prints an ``ImpactResult`` hop by hop, with the sources reaching each column when there are several."""
+    sources = result.sources
+    multi_source = len(sources) > 1
+    if multi_source:
+        console.print(f"\n[bold]Impact Analysis: {len(sources)} changed column(s)[/bold]")
+        for model_id, col_name in sources:
+            console.print(f"  [cyan]•[/cyan] [cyan]{model_names[model_id]}[/cyan].[green]{col_name}[/green]")
+        console.print()
+    else:
+        console.print(f"\n[bold]Impact Analysis: [cyan]{model_names[sources[0][0]]}[/cyan].[green]{sources[0][1]}[/green][/bold]\n")
 
+    results_by_hop = result.by_hop
     if not results_by_hop:
         console.print("[yellow]No downstream column references found.[/yellow]")
         console.print("[dim]This may be because lineage could not be resolved for this column.[/dim]")
-        raise typer.Exit(code=0)
+        return
 
     total_cols = sum(len(v) for v in results_by_hop.values())
     total_models_affected = len({mid for refs in results_by_hop.values() for mid, _ in refs})
@@ -493,12 +655,534 @@ def impact(
         label = "Direct downstream" if hop == 1 else f"Indirect downstream ({hop} hops)"
         console.print(f"[bold]{label}:[/bold]")
         for model_id, col_name in results_by_hop[hop]:
-            model_name_str = project.models[model_id].model_name
-            console.print(f"  [cyan]→[/cyan] [white]{model_name_str}[/white].[green]{col_name}[/green]")
+            model_name_str = model_names[model_id]
+            line = f"  [cyan]→[/cyan] [white]{model_name_str}[/white].[green]{col_name}[/green]"
+            if multi_source:
+                reached_from = result.attribution[(model_id, col_name)]
+                shown = ", ".join(_column_label(key, model_names) for key in reached_from[:3])
+                more = f" +{len(reached_from) - 3} more" if len(reached_from) > 3 else ""
+                line += f" [dim]← {shown}{more}[/dim]"
+            console.print(line)
+        console.print()
+
+    if multi_source:
+        per_source = {key: 0 for key in sources}
+        for reached_from in result.attribution.values():
+            for key in reached_from:
+                per_source[key] += 1
+        console.print("[bold]By source:[/bold]")
+        for key, count in per_source.items():
+            console.print(f"  [cyan]{_column_label(key, model_names)}[/cyan]: {count} column(s)")
         console.print()
 
     console.print(f"[bold]Total impact:[/bold] {total_cols} column(s) across {total_models_affected} model(s)")
 
 
+def _column_label(key, model_names):
+    return f"{model_names[key[0]]}.{key[1]}"
+
+
+def _print_test_selector(project, result):
+    """Prints the impacted tests as a ``dbt test --select`` line (plain, so it can be piped)."""
+    tests = impacted_tests(project, result)
+    if not tests:
+        console.print("🧪 No tests cover the changed or affected columns.")
+        return
+    console.print(f"🧪 {len(tests)} of {len(project.tests)} test(s) cover the changed or affected columns.")
+    typer.echo("dbt test --select " + " ".join(test.name for test in tests))
+
+
+def _resolve_impact_sources(models, columns, model_names, columns_by_model):
+    """Turns ``impact``'s --model/--column flags into (unique_id, column) sources, in flag order.
+
+    A ``model.column`` value names its model; a bare column belongs to the single --model. A
+    --model that no --column names contributes all of its columns.
+    """
+    ids_by_name = {}
+    for unique_id, name in model_names.items():
+        ids_by_name.setdefault(name, unique_id)
+
+    def model_id_of(name):
+        unique_id = ids_by_name.get(name)
+        if unique_id is None:
+            console.print(f"[bold red]Model '{name}' not found in project.[/bold red]")
+            raise typer.Exit(code=1)
+        return unique_id
+
+    def check_column(model_id, col_name):
+        if col_name not in columns_by_model.get(model_id, []):
+            available = ", ".join(columns_by_model.get(model_id, [])) or "(none defined)"
+            console.print(f"[bold red]Column '{col_name}' not found in model '{model_names[model_id]}'.[/bold red]")
+            console.print(f"Available columns: {available}")
+            raise typer.Exit(code=1)
+        return model_id, col_name
+
+    model_ids = [model_id_of(name) for name in models]
+    sources = []
+    whole_models = list(model_ids)
+    for value in columns:
+        if len(model_ids) == 1 and value in columns_by_model.get(model_ids[0], []):
+            source = (model_ids[0], value)
+        elif "." in value:
+            model_name, col_name = value.split(".", 1)
+            source = check_column(model_id_of(model_name), col_name)
+        elif len(model_ids) == 1:
+            source = check_column(model_ids[0], value)
+        else:
+            console.print(f"[bold red]Column '{value}' needs a model: pass --column model.column or a single --model.[/bold red]")
+            raise typer.Exit(code=1)
+        sources.append(source)
+        if source[0] in whole_models:
+            whole_models.remove(source[0])
+    for model_id in whole_models:
+        sources.extend((model_id, col_name) for col_name in columns_by_model.get(model_id, []))
+    return list(dict.fromkeys(sources))
+
+
+def _lineage_skip_reason(no_column_lineage, scorers):
+    """Why full column lineage can be skipped, or None when a weight of any of ``scorers`` reads it."""
+    if no_column_lineage:
+        return "--no-column-lineage"
+    if not any(scorer.needs_column_lineage for scorer in scorers):
+        return "all lineage-dependent weights are 0"
+    return None
+
+
+def _run_column_lineage(project, loader, cache, jobs, compact, verbose, skip_reason=None, write_state=False):
+    """Runs full column lineage on a loaded project, or skips it for ``skip_reason``.
+
+    Either way the per-model metrics end up materialized, and --compact releases the compiled SQL.
+    With ``write_state``, the results are recorded in target/ for a later --state run.
+    """
+    if skip_reason is not None:
+        # Complexity and the model DAG decide every score. No state is written either, since it
+        # would record empty lineage for a later --state run.
+        project.materialize_metrics()
+        if compact:
+            project.release_sql()
+        console.print(f"📊 Column-level lineage skipped ({skip_reason}).")
+        return
+
+    lineage_analyzer = LineageAnalyzer(dialect=loader.dialect, parse_cache=loader.parse_cache, cache=cache, jobs=jobs)
+    total_models = len(project.all_models)
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        with Progress(SpinnerColumn(), TextColumn("{task.description}"), BarColumn(), MofNCompleteColumn(), console=console, transient=True) as progress:
+            task = progress.add_task(f"📊 Analyzing column-level lineage ({total_models} models)...", total=total_models)
+            lineage_analyzer.analyze(project, on_progress=lambda cur, _total: progress.update(task, completed=cur), reuse=loader.lineage_reuse)
+    if cache:
+        cache.prune()
+    if write_state:
+        # Snapshot this run so a later run can pass this target/ directory to --state.
+        try:
+            loader.write_state(project, lineage_analyzer.model_warnings, lineage_analyzer.unresolved)
+        except OSError as e:
+            console.print(f"[yellow]⚠ Could not write analysis state: {e}[/yellow]")
+    if compact:
+        project.release_sql()
+    _report_lineage_warnings(caught_warnings, None, total_models, lineage_analyzer, verbose)
+
+
+@contextmanager
+def _tracing_lineage(lineage_analyzer, status):
+    """Shows ``status`` while lineage is traced on demand, recording the warnings raised meanwhile.
+
+    The analysis cache is pruned afterwards, as after a full analysis.
+    """
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        with console.status(status):
+            yield caught_warnings
+    if lineage_analyzer.cache:
+        lineage_analyzer.cache.prune()
+
+
+def _report_lineage_warnings(caught, traced, total, analyzer, verbose):
+    """Prints the lineage summary line; with --verbose, each warning in ``caught`` and the name resolution stats.
+
+    ``traced`` is the number of the ``total`` models traced on demand, or None after a full analysis.
+    """
+    lineage_warnings = [w for w in caught if issubclass(w.category, UserWarning)]
+    if verbose:
+        for w in lineage_warnings:
+            console.print(f"  [yellow]⚠ {w.message}[/yellow]")
+        for stats_dialect, stats in analyzer.resolution_stats.items():
+            console.print(f"  🔤 Column name resolution ({stats_dialect}): {stats.resolved - stats.retried} on first try, {stats.retried} retried, {stats.unresolved} unresolved, {stats.passthrough_models} passthrough model(s)")
+    summary = "📊 Column-level lineage analysis complete." if traced is None else f"📊 Column-level lineage traced for {traced} of {total} model(s)."
+    if lineage_warnings:
+        summary += f" [yellow]({len(lineage_warnings)} lineage warning(s) — use --verbose for details)[/yellow]"
+    console.print(summary)
+
+
+def _check_selectors(select):
+    """Exits with an error for a malformed --select value, before any loading work."""
+    for selector in select or []:
+        try:
+            parse_selector(selector)
+        except ValueError as e:
+            console.print(f"[bold red]{e}[/bold red]")
+            raise typer.Exit(code=1)
+
+
+def _lineage_loader(project_path, dialect, jobs, compact):
+    """A ManifestLoader for the commands that trace lineage on demand; complexity is not analyzed."""
+    return ManifestLoader(project_path, dialect=dialect, jobs=jobs, compact=compact, analyze_complexity=False)
+
+
+def _load_for_impact(project_path, dialect, jobs, no_cache, compact, select, verbose, loader=None):
+    """Loads the project for ``impact``/``lineage``/``diff``/``slim-ci`` and prepares a LineageAnalyzer.
+
+    Pass ``loader`` (from ``_lineage_loader``) when the command needs it before loading.
+    """
+    _check_selectors(select)
+    if loader is None:
+        loader = _lineage_loader(project_path, dialect, jobs, compact)
+    console.print(f"🔍 Loading dbt project: [bold cyan]{project_path}[/bold cyan]")
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        try:
+            loader.cache = None if no_cache else AnalysisCache.for_project(project_path)
+            project = loader.load()
+        except Exception as e:
+            console.print(f"[bold red]Error loading manifest file: {e}[/bold red]")
+            raise typer.Exit(code=1)
+    load_warnings = [w for w in caught_warnings if issubclass(w.category, UserWarning)]
+    if load_warnings and verbose:
+        for w in load_warnings:
+            console.print(f"  [yellow]⚠ {w.message}[/yellow]")
+    if load_warnings:
+        console.print(f"🔍 Project loaded. [yellow]({len(load_warnings)} model(s) missing compiled SQL — use --verbose for details)[/yellow]")
+
+    if select:
+        project = apply_select(project, select)
+        console.print(f"🔎 Selector applied: [bold cyan]{', '.join(select)}[/bold cyan] → {len(project.models)} model(s) selected")
+        if not project.models:
+            console.print("[bold red]No models matched the given selector(s).[/bold red]")
+            raise typer.Exit(code=1)
+
+    resolved_dialect = loader.dialect
+    if not dialect:
+        console.print(f"🔎 Auto-detected SQL dialect: [bold cyan]{resolved_dialect}[/bold cyan] (use --dialect to override)")
+
+    return project, LineageAnalyzer(dialect=resolved_dialect, parse_cache=loader.parse_cache, cache=loader.cache, jobs=jobs)
+
+
+def _build_reachability_index(project, loader, jobs, compact, fingerprint, target_dir, verbose):
+    """Runs full column lineage and indexes it; writes the index to ``target_dir`` unless it is None."""
+    _run_column_lineage(project, loader, loader.cache, jobs, compact, verbose)
+    index = ReachabilityIndex.build(project, fingerprint or "")
+    if target_dir is not None and fingerprint:
+        try:
+            index.write(target_dir)
+            console.print(f"🗂️  Reachability index written to [bold cyan]{target_dir / REACHABILITY_FILE_NAME}[/bold cyan]")
+        except OSError as e:
+            console.print(f"[yellow]⚠ Could not write reachability index: {e}[/yellow]")
+    return index
+
+
+@app.command()
+def lineage(
+    project_path: Path = _PROJECT_PATH_OPTION,
+    model: str = typer.Option(
+        ...,
+        "--model",
+        "-m",
+        help="Model name of the column to explore.",
+    ),
+    column: str = typer.Option(
+        ...,
+        "--column",
+        "-c",
+        help="Column name to explore.",
+    ),
+    direction: LineageDirection = typer.Option(
+        LineageDirection.both,
+        "--direction",
+        help="Which way to follow column lineage.",
+        case_sensitive=False,
+    ),
+    max_depth: Optional[int] = typer.Option(
+        None,
+        "--max-depth",
+        min=1,
+        help="Stop after this many hops in each direction.",
+    ),
+    max_results: Optional[int] = typer.Option(
+        None,
+        "--max-results",
+        min=1,
+        help="List at most this many columns in each direction.",
+    ),
+    dialect: Optional[str] = _DIALECT_OPTION,
+    jobs: str = _JOBS_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    compact: bool = _COMPACT_OPTION,
+    select: Optional[List[str]] = _SELECT_OPTION,
+    verbose: bool = _VERBOSE_OPTION,
+):
+    """
+    Shows where a column comes from (upstream, down to its root source columns) and what it feeds (downstream).
+    """
+    project, lineage_analyzer = _load_for_impact(project_path, dialect, jobs, no_cache, compact, select, verbose)
+
+    target_model_id = next((unique_id for unique_id, m in project.models.items() if m.model_name == model), None)
+    if not target_model_id:
+        console.print(f"[bold red]Model '{model}' not found in project.[/bold red]")
+        raise typer.Exit(code=1)
+    if column not in project.models[target_model_id].columns:
+        available = ", ".join(project.models[target_model_id].columns) or "(none defined)"
+        console.print(f"[bold red]Column '{column}' not found in model '{model}'.[/bold red]")
+        console.print(f"Available columns: {available}")
+        raise typer.Exit(code=1)
+
+    # Only the models each walk expands are traced; the walks stop at --max-depth / --max-results.
+    traversal = ColumnTraversal(project, lineage_analyzer)
+    results = []
+    roots = []
+    with _tracing_lineage(lineage_analyzer, f"📊 Tracing column-level lineage of {model}.{column}...") as caught_warnings:
+        if direction in (LineageDirection.upstream, LineageDirection.both):
+            results.append(traversal.upstream(target_model_id, column, max_depth, max_results))
+            roots = traversal.root_sources(target_model_id, column)
+        if direction in (LineageDirection.downstream, LineageDirection.both):
+            results.append(traversal.downstream(target_model_id, column, max_depth, max_results))
+    if compact:
+        project.release_sql()
+    _report_lineage_warnings(caught_warnings, len(traversal.traced), len(project.models), lineage_analyzer, verbose)
+
+    console.print(f"\n[bold]Column Lineage: [cyan]{model}[/cyan].[green]{column}[/green][/bold]\n")
+
+    for result in results:
+        arrow = "←" if result.direction == "upstream" else "→"
+        if not result.by_hop:
+            console.print(f"[yellow]No {result.direction} column references found.[/yellow]\n")
+            continue
+        for hop in sorted(result.by_hop):
+            label = f"Direct {result.direction}" if hop == 1 else f"Indirect {result.direction} ({hop} hops)"
+            console.print(f"[bold]{label}:[/bold]")
+            for model_id, col_name in result.by_hop[hop]:
+                console.print(f"  [cyan]{arrow}[/cyan] [white]{project.models[model_id].model_name}[/white].[green]{col_name}[/green]")
+            console.print()
+        if result.truncated:
+            console.print(f"[dim]Stopped after {result.count} {result.direction} column(s) (--max-results).[/dim]\n")
+        elif result.depth_limited:
+            console.print(f"[dim]Stopped at {max_depth} hop(s) (--max-depth); more {result.direction} columns may exist.[/dim]\n")
+        if result.direction == "upstream":
+            if roots:
+                console.print("[bold]Root source columns:[/bold]")
+                for model_id, col_name in roots:
+                    console.print(f"  [cyan]◆[/cyan] [white]{project.models[model_id].model_name}[/white].[green]{col_name}[/green]")
+                console.print()
+
+
+@app.command()
+def diff(
+    project_path: Path = _PROJECT_PATH_OPTION,
+    state: Path = _PREVIOUS_STATE_OPTION,
+    trace_impact: bool = typer.Option(
+        False,
+        "--impact",
+        help="Also trace the downstream columns reached by the changed columns (and by the readers of removed ones).",
+    ),
+    format: DiffFormat = typer.Option(
+        DiffFormat.text,
+        "--format",
+        "-f",
+        help="Output format. json writes only the JSON document to stdout; progress goes to stderr.",
+        case_sensitive=False,
+    ),
+    output: Optional[Path] = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Path to write the JSON output file.",
+        writable=True,
+    ),
+    dialect: Optional[str] = _DIALECT_OPTION,
+    jobs: str = _JOBS_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    verbose: bool = _VERBOSE_OPTION,
+):
+    """
+    Lists the columns added, removed or modified since a previous manifest, optionally with their downstream impact.
+    """
+    if output and format != DiffFormat.json:
+        console.print("[bold yellow]Warning: --output is ignored when using text format. Use -f json to save to a file.[/bold yellow]")
+    # Keeps stdout a plain JSON document that a bot can parse.
+    console.stderr = format == DiffFormat.json and output is None
+    try:
+        project, lineage_analyzer, diff, previous_upstream = _load_against_state(project_path, state, dialect, jobs, no_cache, verbose)
+
+        result = None
+        if trace_impact:
+            sources = changed_sources(project, diff, previous_upstream)
+            impact_analyzer = ImpactAnalyzer(project, lineage_analyzer)
+            with _tracing_lineage(lineage_analyzer, "📊 Tracing downstream column-level lineage of the changed columns...") as caught_warnings:
+                result = impact_analyzer.downstream_many(sources)
+            _report_lineage_warnings(caught_warnings, len(impact_analyzer.traced), len(project.models), lineage_analyzer, verbose)
+    finally:
+        console.stderr = False
+
+    if format == DiffFormat.json:
+        content = json.dumps(_diff_payload(project, diff, result), indent=2)
+        if output:
+            with open(output, "w") as f:
+                f.write(content)
+            console.print(f"✅ Diff saved to [bold cyan]{output}[/bold cyan]")
+        else:
+            typer.echo(content)
+        return
+
+    if not diff.changes:
+        console.print("[green]✅ No column changes.[/green]")
+        return
+    console.print("\n[bold]Changed columns:[/bold]")
+    _print_column_changes(project, diff)
+    if result is not None:
+        if result.sources:
+            model_names = {unique_id: m.model_name for unique_id, m in project.models.items()}
+            _print_impact(result, model_names)
+        else:
+            console.print("\n[yellow]No current columns to trace: only removed columns without readers.[/yellow]")
+
+
+@app.command("slim-ci")
+def slim_ci(
+    project_path: Path = _PROJECT_PATH_OPTION,
+    state: Path = _PREVIOUS_STATE_OPTION,
+    dialect: Optional[str] = _DIALECT_OPTION,
+    jobs: str = _JOBS_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    verbose: bool = typer.Option(
+        False,
+        "--verbose",
+        "-v",
+        help="List every changed column and show detailed warnings.",
+    ),
+):
+    """
+    Prints a minimal `dbt build --select` for a change: the changed models plus the models whose columns the changed columns actually reach.
+    """
+    project, lineage_analyzer, diff, previous_upstream = _load_against_state(project_path, state, dialect, jobs, no_cache, verbose)
+    if verbose:
+        _print_column_changes(project, diff)
+
+    impact_analyzer = ImpactAnalyzer(project, lineage_analyzer)
+    with _tracing_lineage(lineage_analyzer, "📊 Tracing downstream column-level lineage of the changed columns...") as caught_warnings:
+        plan = plan_rebuild(project, diff, impact_analyzer, previous_upstream)
+    _report_lineage_warnings(caught_warnings, len(impact_analyzer.traced), len(project.models), lineage_analyzer, verbose)
+    if plan.opaque_models:
+        names = ", ".join(project.models[unique_id].model_name for unique_id in plan.opaque_models)
+        console.print(f"[yellow]⚠ No column lineage for {names}; rebuilt with all descendants.[/yellow]")
+
+    if not plan.models:
+        console.print("[green]✅ No models need rebuilding.[/green]")
+        raise typer.Exit(code=0)
+    console.print(f"📦 Rebuilding {len(plan.models)} of {len(project.models)} model(s); state:modified+ would build {len(plan.modified_plus)}.")
+    # Plain output so the command is not wrapped and can be piped.
+    typer.echo("dbt build --select " + " ".join(project.models[unique_id].model_name for unique_id in plan.models))
+
+
+def _load_against_state(project_path, state, dialect, jobs, no_cache, verbose):
+    """Loads the project for ``diff``/``slim-ci`` and compares it with the manifest in ``state``."""
+    project, lineage_analyzer = _load_for_impact(project_path, dialect, jobs, no_cache, False, None, verbose)
+    diff, previous_upstream = _diff_against_state(project, state, lineage_analyzer.dialect)
+    return project, lineage_analyzer, diff, previous_upstream
+
+
+def _diff_against_state(project, state, dialect):
+    """Compares ``project`` column by column with the manifest in ``state``; returns the diff and the previous upstream lineage."""
+    try:
+        previous_models = read_previous_models(state)
+    except Exception as e:
+        console.print(f"[bold red]Error reading state manifest: {e}[/bold red]")
+        raise typer.Exit(code=1)
+    # The previous run's modaryn_state.json (if any) adds compiled SQL hashes and the lineage of removed columns.
+    previous_state = AnalysisState.read(state)
+    previous_sql_hashes = previous_upstream = None
+    if previous_state is not None:
+        previous_sql_hashes = {unique_id: stored.sql_hash for unique_id, stored in previous_state.models.items()}
+        previous_upstream = {unique_id: stored.upstream for unique_id, stored in previous_state.models.items()}
+
+    # Only models whose checksum or compiled SQL changed are parsed and compared column by column.
+    previous_sql = read_previous_sql(state, set(modified_models(project, previous_models, previous_sql_hashes)))
+    diff = diff_project(project, previous_models, previous_sql, dialect, previous_sql_hashes)
+    counts = {kind: len(diff.columns(kind)) for kind in (ADDED, REMOVED, MODIFIED)}
+    console.print(
+        f"🧮 Column changes: {counts[ADDED]} added, {counts[REMOVED]} removed, {counts[MODIFIED]} modified "
+        f"({len(diff.modified_models)} modified, {len(diff.new_models)} new, {len(diff.removed_models)} removed model(s))"
+    )
+    if diff.uncompared_models:
+        console.print(f"[yellow]⚠ {len(diff.uncompared_models)} model(s) could not be compared column by column; all of their columns count as modified.[/yellow]")
+    return diff, previous_upstream
+
+
+def _print_column_changes(project, diff):
+    for change in diff.changes:
+        name = project.models[change.model_id].model_name if change.model_id in project.models else change.model_id
+        console.print(f"  [dim]{change.kind:>8}[/dim] [cyan]{name}[/cyan].[green]{change.column}[/green]")
+
+
+def _diff_payload(project, diff, result=None):
+    """The JSON document of ``modaryn diff``: the column changes and, with ``result``, their downstream impact."""
+    def model_name(unique_id):
+        return project.models[unique_id].model_name if unique_id in project.models else None
+
+    def column_ref(key):
+        return {"unique_id": key[0], "model": model_name(key[0]), "column": key[1]}
+
+    payload = {
+        "changes": [{**column_ref((change.model_id, change.column)), "change": change.kind} for change in diff.changes],
+        "new_models": diff.new_models,
+        "removed_models": diff.removed_models,
+        "modified_models": diff.modified_models,
+        "uncompared_models": diff.uncompared_models,
+    }
+    if result is not None:
+        payload["impact"] = {
+            "sources": [column_ref(key) for key in result.sources],
+            "affected": [
+                {**column_ref(key), "hop": hop, "sources": [column_ref(source) for source in result.attribution[key]]}
+                for hop in sorted(result.by_hop)
+                for key in result.by_hop[hop]
+            ],
+        }
+    return payload
+
+
+cache_app = typer.Typer(help="Inspect or clear the on-disk analysis cache.")
+app.add_typer(cache_app, name="cache")
+
+
+@cache_app.command("stats")
+def cache_stats(
+    project_path: Path = _PROJECT_PATH_OPTION,
+):
+    """
+    Shows the number of cached entries and the cache size.
+    """
+    cache = AnalysisCache.for_project(project_path)
+    stats = cache.stats()
+    console.print(f"🗄️  Analysis cache: [bold cyan]{cache.root}[/bold cyan]")
+    for namespace, count in stats.entries.items():
+        console.print(f"  {namespace}: {count} entr{'y' if count == 1 else 'ies'}")
+    console.print(f"  Size: {stats.total_bytes / (1024 * 1024):.2f} MiB / {stats.max_bytes / (1024 * 1024):.0f} MiB")
+
+
+@cache_app.command("clear")
+def cache_clear(
+    project_path: Path = _PROJECT_PATH_OPTION,
+):
+    """
+    Removes every entry from the analysis cache.
+    """
+    cache = AnalysisCache.for_project(project_path)
+    try:
+        removed = cache.clear()
+    except OSError as e:
+        console.print(f"[bold red]Could not clear the analysis cache at {cache.root}: {e}[/bold red]")
+        raise typer.Exit(code=1)
+    console.print(f"🧹 Removed {removed} cache entr{'y' if removed == 1 else 'ies'} from [bold cyan]{cache.root}[/bold cyan]")
+
+
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -0,0 +1,167 @@
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ColumnGraph:
+    """Project-level column lineage graph over interned integer column ids.
+
+    Every model column gets a dense id when it is registered; model ids and column names are
+    interned once. Edges are appended to two flat ``array('i')`` buffers and compressed into CSR
+    adjacency (offsets + targets) in both directions when they are read. Edges added after that
+    are kept in small per-column ``array('i')`` deltas that reads append to the CSR slice; the CSR
+    is rebuilt only once the deltas hold more edges than it does, so lazy callers that interleave
+    inserts and reads pay amortized O(1) per edge instead of a rebuild per read. A duplicate edge
+    is found by scanning the target's upstream ids, so insertion is O(in-degree), neighbour access
+    is O(degree), and no per-edge Python object is kept. ``DbtColumn.upstream_columns`` and
+    ``downstream_columns`` are views over this graph.
+    """
+
+    def __init__(self):
+        self._model_ids: List[str] = []
+        self._model_index: Dict[str, int] = {}
+        # Column id -> owning model index / column name.
+        self._column_model = array("i")
+        self._column_names: List[str] = []
+        # (model index, column name) -> column id, exact and case-folded (first declared wins).
+        self._ids: Dict[Tuple[int, str], int] = {}
+        self._casefolded: Dict[Tuple[int, str], int] = {}
+
+        self._edge_sources = array("i")
+        self._edge_targets = array("i")
+        # (upstream offsets, upstream ids, downstream offsets, downstream ids) over the first
+        # ``_csr_edges`` edges; columns registered after the build have no entry.
+        self._csr: Optional[Tuple[array, array, array, array]] = None
+        self._csr_edges = 0
+        # Edges added since the CSR was built, per column id.
+        self._pending_upstream: Dict[int, array] = {}
+        self._pending_downstream: Dict[int, array] = {}
+        # Bumped on every structural change so derived data (e.g. materialized model metrics) can detect staleness.
+        self.version = 0
+
+    # --- Columns ---------------------------------------------------------
+
+    def add_column(self, model_unique_id: str, column_name: str) -> int:
+        """Registers a column and returns its id (the existing id if already registered)."""
+        model_index = self._model_index.get(model_unique_id)
+        if model_index is None:
+            model_index = len(self._model_ids)
+            self._model_ids.append(sys.intern(model_unique_id))
+            self._model_index[model_unique_id] = model_index
+        key = (model_index, column_name)
+        column_id = self._ids.get(key)
+        if column_id is None:
+            column_id = len(self._column_names)
+            self._column_names.append(sys.intern(column_name))
+            self._column_model.append(model_index)
+            self._ids[key] = column_id
+            self._casefolded.setdefault((model_index, column_name.lower()), column_id)
+            self.version += 1
+        return column_id
+
+    def column_id(self, model_unique_id: str, column_name: str, casefold: bool = False) -> Optional[int]:
+        """Looks a column up by exact name, or case-insensitively with ``casefold=True``."""
+        model_index = self._model_index.get(model_unique_id)
+        if model_index is None:
+            return None
+        if casefold:
+            return self._casefolded.get((model_index, column_name.lower()))
+        return self._ids.get((model_index, column_name))
+
+    def column_ref(self, column_id: int) -> Tuple[str, str]:
+        """Returns ``(model_unique_id, column_name)`` for a column id."""
+        return self._model_ids[self._column_model[column_id]], self._column_names[column_id]
+
+    def model_of(self, column_id: int) -> str:
+        return self._model_ids[self._column_model[column_id]]
+
+    def __len__(self) -> int:
+        return len(self._column_names)
+
+    # --- Edges -----------------------------------------------------------
+
+    def add_edge(self, source_id: int, target_id: int) -> bool:
+        """Adds ``source -> target`` (target derives from source). Returns False for a duplicate."""
+        if source_id in self._pending_upstream.get(target_id, ()) or source_id in self._built(0, target_id):
+            return False
+        self._edge_sources.append(source_id)
+        self._edge_targets.append(target_id)
+        self._pending_upstream.setdefault(target_id, array("i")).append(source_id)
+        self._pending_downstream.setdefault(source_id, array("i")).append(target_id)
+        self.version += 1
+        return True
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edge_sources)
+
+    def upstream(self, column_id: int) -> array:
+        """Ids of the columns ``column_id`` derives from, in insertion order."""
+        self._adjacency()
+        return self._neighbours(0, self._pending_upstream, column_id)
+
+    def downstream(self, column_id: int) -> array:
+        """Ids of the columns derived from ``column_id``, in insertion order."""
+        self._adjacency()
+        return self._neighbours(2, self._pending_downstream, column_id)
+
+    def upstream_degree(self, column_id: int) -> int:
+        self._adjacency()
+        return self._degree(0, self._pending_upstream, column_id)
+
+    def downstream_degree(self, column_id: int) -> int:
+        self._adjacency()
+        return self._degree(2, self._pending_downstream, column_id)
+
+    def _built(self, direction: int, column_id: int) -> array:
+        """The CSR slice of ``column_id`` (``direction`` 0 = upstream, 2 = downstream), without rebuilding."""
+        if self._csr is None:
+            return array("i")
+        offsets, ids = self._csr[direction], self._csr[direction + 1]
+        if column_id + 1 >= len(offsets):
+            return array("i")
+        return ids[offsets[column_id]:offsets[column_id + 1]]
+
+    def _neighbours(self, direction: int, pending: Dict[int, array], column_id: int) -> array:
+        built = self._built(direction, column_id)
+        delta = pending.get(column_id)
+        return built + delta if delta else built
+
+    def _degree(self, direction: int, pending: Dict[int, array], column_id: int) -> int:
+        offsets = self._csr[direction]
+        built = offsets[column_id + 1] - offsets[column_id] if column_id + 1 < len(offsets) else 0
+        return built + len(pending.get(column_id, ()))
+
+    def _adjacency(self) -> Tuple[array, array, array, array]:
+        # Rebuilding once the deltas outgrow the CSR keeps the total rebuild cost linear in the edges.
+        pending_edges = len(self._edge_sources) - self._csr_edges
+        if self._csr is None or pending_edges > self._csr_edges:
+            upstream_offsets, upstream_ids = self._compress(self._edge_targets, self._edge_sources)
+            downstream_offsets, downstream_ids = self._compress(self._edge_sources, self._edge_targets)
+            self._csr = (upstream_offsets, upstream_ids, downstream_offsets, downstream_ids)
+            self._csr_edges = len(self._edge_sources)
+            self._pending_upstream = {}
+            self._pending_downstream = {}
+        return self._csr
+
+    def _compress(self, keys: array, values: array) -> Tuple[array, array]:
+        """Stable counting sort of edges by ``keys`` into CSR offsets and neighbour ids."""
+        size = len(self._column_names)
+        offsets = array("i", bytes(4 * (size + 1)))
+        for key in keys:
+            offsets[key + 1] += 1
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+        cursor = array("i", offsets[:size])
+        neighbours = array("i", bytes(4 * len(values)))
+        for key, value in zip(keys, values):
+            neighbours[cursor[key]] = value
+            cursor[key] += 1
+        return offsets, neighbours
+
+    @classmethod
+    def from_columns(cls, columns: Iterable[Tuple[str, str]]) -> "ColumnGraph":
+        graph = cls()
+        for model_unique_id, column_name in columns:
+            graph.add_column(model_unique_id, column_name)
+        return graph
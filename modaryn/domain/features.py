@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from modaryn.domain.model import DbtProject
+
+# (feature, config section, weight key) in scoring order. Within a section the weighted features are
+# accumulated in this order, so the vectorized scores match a per-model sum bit for bit.
+FEATURES: Tuple[Tuple[str, str, str], ...] = (
+    ("join_count", "sql_complexity", "join_count"),
+    ("cte_count", "sql_complexity", "cte_count"),
+    ("conditional_count", "sql_complexity", "conditional_count"),
+    ("where_count", "sql_complexity", "where_count"),
+    ("sql_char_count", "sql_complexity", "sql_char_count"),
+    ("downstream_model_count", "importance", "downstream_model_count"),
+    ("downstream_column_count", "importance", "downstream_column_count"),
+    ("downstream_column_model_spread", "importance", "downstream_column_model_spread"),
+    ("test_count", "quality", "test_count"),
+    ("column_test_coverage", "quality", "column_coverage"),
+    ("untested_downstream_column_count", "quality", "untested_downstream_column_penalty"),
+)
+FEATURE_NAMES: Tuple[str, ...] = tuple(feature for feature, _, _ in FEATURES)
+_COMPLEXITY_FEATURES = FEATURE_NAMES[:5]
+
+
+@dataclass
+class FeatureMatrix:
+    """Scoring inputs of every model as one ``models × FEATURE_NAMES`` float64 matrix.
+
+    Rows follow ``unique_ids`` (the project's model order). Models without compiled SQL have zeros in
+    the complexity columns and ``has_complexity`` False.
+    """
+    unique_ids: List[str]
+    values: np.ndarray
+    has_complexity: np.ndarray
+
+    @classmethod
+    def from_project(cls, project: "DbtProject") -> "FeatureMatrix":
+        if not project.metrics_current:
+            project.materialize_metrics()
+        rows = []
+        has_complexity = []
+        for model in project.models.values():
+            complexity = model.complexity
+            if complexity:
+                row = [getattr(complexity, name) for name in _COMPLEXITY_FEATURES]
+            else:
+                row = [0] * len(_COMPLEXITY_FEATURES)
+            metrics = model.metrics if model.metrics is not None else model.compute_metrics()
+            row += [
+                model.downstream_model_count,
+                metrics.downstream_column_count,
+                metrics.downstream_column_model_spread,
+                model.test_count,
+                metrics.column_test_coverage,
+                metrics.untested_downstream_column_count,
+            ]
+            rows.append(row)
+            has_complexity.append(bool(complexity))
+        values = np.array(rows, dtype=np.float64).reshape(len(rows), len(FEATURE_NAMES))
+        return cls(list(project.models), values, np.array(has_complexity, dtype=bool))
+
+    def __len__(self) -> int:
+        return len(self.unique_ids)
+
+    def column(self, feature: str) -> np.ndarray:
+        return self.values[:, FEATURE_NAMES.index(feature)]
+
+
+@dataclass
+class ScoreTable:
+    """Columnar scoring results over a FeatureMatrix; row ``i`` belongs to ``features.unique_ids[i]``."""
+    features: FeatureMatrix
+    raw_scores: np.ndarray
+    quality_scores: np.ndarray
+    # Z-scores of raw_scores; None unless scored with apply_zscore.
+    scores: Optional[np.ndarray] = None
+
+    def ranking(self, apply_zscore: bool = False) -> np.ndarray:
+        """Row indices by descending score, ties kept in model order (like a stable reverse sort)."""
+        values = self.scores if apply_zscore and self.scores is not None else self.raw_scores
+        return np.argsort(-values, kind="stable")
@@ -1,9 +1,17 @@
+import sys
+import zlib
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
 
 
 from modaryn.analyzers.sql_complexity import SqlComplexityResult
+from modaryn.domain.column_graph import ColumnGraph
+from modaryn.domain.features import ScoreTable
+
+# Projects with 10k+ models hold hundreds of thousands of these objects; drop the per-instance
+# __dict__ where dataclasses support it (Python 3.10+).
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
 @dataclass
@@ -13,22 +21,74 @@ class ScoreStatistics:
     std_dev: float = 0.0
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ColumnReference:
     model_unique_id: str
     column_name: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DbtColumn:
     name: str
     description: str
     test_count: int = 0
-    upstream_columns: List[ColumnReference] = field(default_factory=list)
-    downstream_columns: List[ColumnReference] = field(default_factory=list)
+    # Bound by DbtProject to the project's ColumnGraph; lineage edges live there.
+    _graph: Optional[ColumnGraph] = field(default=None, init=False, repr=False, compare=False)
+    _column_id: int = field(default=-1, init=False, repr=False, compare=False)
 
+    @property
+    def column_id(self) -> int:
+        return self._column_id
 
-@dataclass
+    @property
+    def upstream_columns(self) -> Tuple[ColumnReference, ...]:
+        """Columns this column derives from (a read-only view over the project's ColumnGraph).
+
+        Add lineage with ``ColumnGraph.add_edge``; the returned tuple is rebuilt on every access.
+        """
+        if self._graph is None:
+            return ()
+        return tuple(ColumnReference(*self._graph.column_ref(i)) for i in self._graph.upstream(self._column_id))
+
+    @property
+    def downstream_columns(self) -> Tuple[ColumnReference, ...]:
+        """Columns derived from this column (a read-only view over the project's ColumnGraph)."""
+        if self._graph is None:
+            return ()
+        return tuple(ColumnReference(*self._graph.column_ref(i)) for i in self._graph.downstream(self._column_id))
+
+    @property
+    def downstream_count(self) -> int:
+        return self._graph.downstream_degree(self._column_id) if self._graph is not None else 0
+
+    @property
+    def downstream_model_ids(self) -> Set[str]:
+        if self._graph is None:
+            return set()
+        return {self._graph.model_of(i) for i in self._graph.downstream(self._column_id)}
+
+
+@dataclass(**_SLOTS)
+class DbtTest:
+    unique_id: str
+    name: str
+    # (model unique_id, column name) per model the test depends on; the column is None for
+    # model-level tests and for columns the model does not document.
+    attachments: List[Tuple[str, Optional[str]]] = field(default_factory=list)
+
+
+@dataclass(frozen=True, **_SLOTS)
+class ModelMetrics:
+    """Column-derived metrics of one model, computed in a single pass over its columns."""
+    column_count: int = 0
+    tested_column_count: int = 0
+    downstream_column_count: int = 0
+    downstream_column_model_spread: int = 0
+    untested_downstream_column_count: int = 0
+    column_test_coverage: float = 0.0
+
+
+@dataclass(**_SLOTS)
 class DbtModel:
     unique_id: str
     model_name: str
@@ -44,23 +104,64 @@ class DbtModel:
     test_count: int = 0
     quality_score: float = 0.0
     tags: List[str] = field(default_factory=list)
+    checksum: str = ""
+    language: str = "sql"
+    # zlib-compressed compiled SQL kept by release_sql(compress=True).
+    compressed_sql: Optional[bytes] = field(default=None, repr=False, compare=False)
+    # Set by DbtProject.materialize_metrics(); the metric properties recompute while it is None.
+    metrics: Optional[ModelMetrics] = field(default=None, repr=False, compare=False)
+
+    @property
+    def compiled_sql(self) -> str:
+        """The compiled SQL, also after release_sql(compress=True) moved it out of raw_sql."""
+        if not self.raw_sql and self.compressed_sql is not None:
+            return zlib.decompress(self.compressed_sql).decode("utf-8")
+        return self.raw_sql
+
+    def release_sql(self, compress: bool = False):
+        """Frees the compiled SQL once analysis is finished, optionally keeping a compressed copy."""
+        if self.raw_sql:
+            self.compressed_sql = zlib.compress(self.raw_sql.encode("utf-8")) if compress else None
+            self.raw_sql = ""
 
     @property
     def downstream_model_count(self) -> int:
         return len(self.children)
 
+    def compute_metrics(self) -> ModelMetrics:
+        """Computes the column-derived metrics from the current columns and column graph."""
+        tested = downstream = untested_downstream = 0
+        downstream_model_ids: Set[str] = set()
+        for col in self.columns.values():
+            count = col.downstream_count
+            downstream += count
+            if col.test_count > 0:
+                tested += 1
+            else:
+                untested_downstream += count
+            if count:
+                downstream_model_ids.update(col.downstream_model_ids)
+        column_count = len(self.columns)
+        return ModelMetrics(
+            column_count=column_count,
+            tested_column_count=tested,
+            downstream_column_count=downstream,
+            downstream_column_model_spread=len(downstream_model_ids),
+            untested_downstream_column_count=untested_downstream,
+            column_test_coverage=(tested / column_count) * 100 if column_count else 0.0,
+        )
+
+    def _metrics(self) -> ModelMetrics:
+        return self.metrics if self.metrics is not None else self.compute_metrics()
+
     @property
     def downstream_column_count(self) -> int:
-        return sum(len(col.downstream_columns) for col in self.columns.values())
+        return self._metrics().downstream_column_count
 
     @property
     def downstream_column_model_spread(self) -> int:
         """Number of distinct downstream models that reference any column from this model."""
-        downstream_model_ids = set()
-        for col in self.columns.values():
-            for ref in col.downstream_columns:
-                downstream_model_ids.add(ref.model_unique_id)
-        return len(downstream_model_ids)
+        return self._metrics().downstream_column_model_spread
 
     @property
     def column_count(self) -> int:
@@ -68,39 +169,80 @@ class DbtModel:
 
     @property
     def tested_column_count(self) -> int:
-        return len([col for col in self.columns.values() if col.test_count > 0])
+        return self._metrics().tested_column_count
 
     @property
     def untested_downstream_column_count(self) -> int:
         """Number of downstream column references originating from untested columns."""
-        return sum(
-            len(col.downstream_columns)
-            for col in self.columns.values()
-            if col.test_count == 0 and col.downstream_columns
-        )
-    
+        return self._metrics().untested_downstream_column_count
+
     @property
     def column_test_coverage(self) -> float:
-        if self.column_count == 0:
-            return 0.0
-        return (self.tested_column_count / self.column_count) * 100
+        return self._metrics().column_test_coverage
 
 
 @dataclass
 class DbtProject:
     models: Dict[str, DbtModel] = field(default_factory=dict)
     statistics: Optional[ScoreStatistics] = None
+    # Test unique_id -> DbtTest, for tests that depend on at least one of the models.
+    tests: Dict[str, DbtTest] = field(default_factory=dict)
+    # Unselected neighbours of a selection (see ManifestLoader's ``select``). Their columns and
+    # lineage edges count toward the selected models' metrics; they are not scored or reported.
+    context_models: Dict[str, DbtModel] = field(default_factory=dict)
+    column_graph: ColumnGraph = field(default_factory=ColumnGraph, init=False, repr=False, compare=False)
+    # Column graph version the models' materialized metrics were computed at; None when not materialized.
+    metrics_version: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    # Columnar scores of the last Scorer.score_project() run, rows in model order.
+    score_table: Optional[ScoreTable] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         self._build_dag()
+        self._bind_columns()
+
+    @property
+    def all_models(self) -> Dict[str, DbtModel]:
+        """The models followed by the context models; lineage is traced over these."""
+        if not self.context_models:
+            return self.models
+        return {**self.models, **self.context_models}
+
+    def _bind_columns(self):
+        """Registers every model column in the column graph and binds the column's accessors to it."""
+        for model in self.all_models.values():
+            for column_name, column in model.columns.items():
+                column._graph = self.column_graph
+                column._column_id = self.column_graph.add_column(model.unique_id, column_name)
 
     def _build_dag(self):
-        for model in self.models.values():
+        all_models = self.all_models
+        for model in all_models.values():
             for dep_id in model.dependencies:
-                if dep_id in self.models:
-                    parent_model = self.models[dep_id]
+                if dep_id in all_models:
+                    parent_model = all_models[dep_id]
                     model.parents[dep_id] = parent_model
                     parent_model.children[model.unique_id] = model
 
+    @property
+    def metrics_current(self) -> bool:
+        return self.metrics_version is not None and self.metrics_version == self.column_graph.version
+
+    def materialize_metrics(self):
+        """Computes every model's metrics once; call again (or invalidate) after the column graph changes."""
+        for model in self.models.values():
+            model.metrics = model.compute_metrics()
+        self.metrics_version = self.column_graph.version
+
+    def invalidate_metrics(self):
+        """Drops the materialized metrics so the metric properties reflect the live column graph."""
+        for model in self.models.values():
+            model.metrics = None
+        self.metrics_version = None
+
+    def release_sql(self, compress: bool = False):
+        """Frees every model's compiled SQL; scores, metrics and lineage do not need it anymore."""
+        for model in self.all_models.values():
+            model.release_sql(compress=compress)
+
     def get_model(self, unique_id: str) -> DbtModel | None:
         return self.models.get(unique_id)
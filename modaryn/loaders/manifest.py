@@ -1,46 +1,93 @@
-import fnmatch
-import json
+import sys
 import warnings
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 import yaml
 
-from modaryn.analyzers.sql_complexity import SqlComplexityAnalyzer
-from modaryn.domain.model import DbtModel, DbtProject, DbtColumn
+from modaryn.analyzers.sql_complexity import SqlComplexityAnalyzer, SqlComplexityResult
+from modaryn.analyzers.sql_parse import SqlParseCache
+from modaryn.cache import COMPLEXITY, AnalysisCache
+from modaryn.domain.model import DbtModel, DbtProject, DbtColumn, DbtTest
+from modaryn.loaders.selector import SelectorIndex, parse_selector
+from modaryn.loaders.state import AnalysisState, ModelState, plan_state_reuse, read_previous_models
+from modaryn.loaders.stream import iter_manifest, resolve_artifact_path
+from modaryn.parallel import resolve_jobs
+
+_ADAPTER_TO_DIALECT = {
+    "bigquery": "bigquery",
+    "snowflake": "snowflake",
+    "redshift": "redshift",
+    "spark": "spark",
+    "databricks": "databricks",
+    "trino": "trino",
+    "postgres": "postgres",
+    "duckdb": "duckdb",
+}
 
 
 def apply_select(project: DbtProject, selectors: List[str]) -> DbtProject:
-    """Filters a DbtProject to models matching any of the given selectors.
+    """Narrows a loaded DbtProject to the models matching any of the given selectors.
 
-    Selector syntax:
+    Selector syntax (see ``modaryn.loaders.selector``):
       - ``fct_*``         — model name glob (fnmatch)
       - ``path:marts/``   — path prefix match
       - ``tag:finance``   — dbt tag match
-    Multiple selectors are combined with OR logic.
+      - ``+fct_orders``, ``stg_orders+2``, ``@stg_orders`` — dbt graph operators
+    Multiple selectors are combined with OR logic. The result is a closed sub-DAG: parents and
+    children outside the selection are unlinked, so lineage stays within the selection. To keep
+    the neighbours' edges in the selected models' metrics, select in ``ManifestLoader`` instead.
     """
-    def matches(model: DbtModel) -> bool:
-        for selector in selectors:
-            if selector.startswith("path:"):
-                prefix = selector[5:].rstrip("/")
-                if str(model.file_path).startswith(prefix):
-                    return True
-            elif selector.startswith("tag:"):
-                if selector[4:] in model.tags:
-                    return True
-            else:
-                if fnmatch.fnmatch(model.model_name, selector):
-                    return True
-        return False
+    selected = SelectorIndex(project.models.values()).select(selectors)
+    filtered = {unique_id: project.models[unique_id] for unique_id in selected}
+    for model in filtered.values():
+        model.parents = {unique_id: parent for unique_id, parent in model.parents.items() if unique_id in filtered}
+        model.children = {unique_id: child for unique_id, child in model.children.items() if unique_id in filtered}
+    return DbtProject(models=filtered, tests=_tests_of(project.tests, filtered))
+
+
+def _tests_of(tests: Dict[str, DbtTest], models: Dict[str, DbtModel]) -> Dict[str, DbtTest]:
+    return {unique_id: test for unique_id, test in tests.items() if any(model_id in models for model_id, _ in test.attachments)}
+
 
-    filtered = {uid: m for uid, m in project.models.items() if matches(m)}
-    return DbtProject(models=filtered)
+def _read_text(path: Path) -> str:
+    with open(path, "r") as f:
+        return f.read()
+
+
+def _analyze_complexity(dialect: str, sql: str) -> SqlComplexityResult:
+    """Process-pool entry point; must stay at module level so it can be pickled."""
+    return SqlComplexityAnalyzer(dialect=dialect).analyze(sql)
 
 
 class ManifestLoader:
-    def __init__(self, project_path: Path, dialect: Optional[str] = None):
+    def __init__(
+        self,
+        project_path: Path,
+        dialect: Optional[str] = None,
+        jobs: Union[int, str] = 1,
+        cache: Optional[AnalysisCache] = None,
+        state_path: Optional[Path] = None,
+        compact: bool = False,
+        analyze_complexity: bool = True,
+        select: Optional[List[str]] = None,
+    ):
         self.project_path = project_path
         self._dialect_override = dialect
-        self.manifest_path = self.project_path / "target" / "manifest.json"
+        self.jobs = resolve_jobs(jobs)
+        self.cache = cache
+        self.state_path = state_path
+        # Compact mode does not keep parsed ASTs between complexity and lineage analysis.
+        self.compact = compact
+        # Commands that only need lineage (e.g. impact) skip parsing every model for complexity.
+        self.analyze_complexity = analyze_complexity
+        # Selectors are parsed up front so a malformed one fails before the manifest is read.
+        for selector in select or []:
+            parse_selector(selector)
+        self.select = select
+        self.state_reuse: Dict[str, ModelState] = {}
+        self.manifest_path = resolve_artifact_path(self.project_path / "target" / "manifest.json")
         self.dbt_project_yml_path = self.project_path / "dbt_project.yml"
 
     def _get_project_name_from_dbt_project_yml(self) -> str:
@@ -59,98 +106,240 @@ class ManifestLoader:
 
     def detect_dialect(self) -> str:
         """Reads adapter_type from manifest.json and maps it to a sqlglot dialect."""
-        _ADAPTER_TO_DIALECT = {
-            "bigquery": "bigquery",
-            "snowflake": "snowflake",
-            "redshift": "redshift",
-            "spark": "spark",
-            "databricks": "databricks",
-            "trino": "trino",
-            "postgres": "postgres",
-            "duckdb": "duckdb",
-        }
         try:
-            with open(self.manifest_path, "r") as f:
-                metadata = json.load(f).get("metadata", {})
-            adapter_type = metadata.get("adapter_type", "").lower()
-            return _ADAPTER_TO_DIALECT.get(adapter_type, "ansi")
+            for _, _, metadata in iter_manifest(self.manifest_path, sections=("metadata",), streamed_sections=()):
+                return self._dialect_from_metadata(metadata)
         except Exception:
-            return "ansi"
+            pass
+        return "ansi"
+
+    @staticmethod
+    def _dialect_from_metadata(metadata: Dict) -> str:
+        adapter_type = (metadata or {}).get("adapter_type", "").lower()
+        return _ADAPTER_TO_DIALECT.get(adapter_type, "ansi")
 
     def load(self) -> DbtProject:
         if not self.manifest_path.exists():
             raise FileNotFoundError(f"Manifest file not found at {self.manifest_path}. Please ensure 'dbt compile' has been run in the dbt project at {self.project_path}.")
 
-        dialect = self._dialect_override or self.detect_dialect()
-        self.dialect = dialect
-        self.sql_analyzer = SqlComplexityAnalyzer(dialect=dialect)
-
         project_name = self._get_project_name_from_dbt_project_yml()
-
-        with open(self.manifest_path, "r") as f:
-            manifest_data = json.load(f)
-
         compiled_code_dir = self.project_path / "target" / "compiled" / project_name / "models"
-        nodes = manifest_data.get("nodes", {})
-        
-        # Pass 1: Load models and their columns
+
+        # Single streaming pass over the manifest: metadata is read once, and each node is
+        # reduced to the fields modaryn uses before the next one is decoded.
+        dialect = self._dialect_override
         models: Dict[str, DbtModel] = {}
-        for unique_id, node_data in nodes.items():
-            if node_data.get("resource_type") == "model":
-                model_relative_path = Path(node_data.get("path", ""))
-                compiled_sql_path = compiled_code_dir / model_relative_path
-
-                compiled_sql = ""
-                complexity = None
-                if compiled_sql_path.exists():
-                    with open(compiled_sql_path, "r") as sql_f:
-                        compiled_sql = sql_f.read()
-                    complexity = self.sql_analyzer.analyze(compiled_sql)
-                else:
-                    warnings.warn(
-                        f"Compiled SQL not found for model {node_data.get('name')} at {compiled_sql_path}. "
-                        f"Complexity metrics will be unavailable for this model.",
-                        UserWarning,
-                        stacklevel=2,
-                    )
-
-                # Create DbtColumn objects
-                model_columns = {
-                    col_name: DbtColumn(name=col_name, description=col_data.get("description", ""))
-                    for col_name, col_data in node_data.get("columns", {}).items()
-                }
-
-                model = DbtModel(
-                    unique_id=unique_id,
-                    model_name=node_data.get("name", ""),
-                    file_path=Path(node_data.get("path", "")),
-                    raw_sql=compiled_sql,
-                    columns=model_columns,
-                    dependencies=self._get_node_dependencies(node_data),
-                    complexity=complexity,
-                    tags=node_data.get("tags", []),
-                )
-                models[unique_id] = model
-
-        # Pass 2: Associate tests with models and columns
-        for unique_id, node_data in nodes.items():
-            if node_data.get("resource_type") == "test":
-                test_dependencies = node_data.get("depends_on", {}).get("nodes", [])
-                
-                column_name = node_data.get("column_name")
-                for dep_id in test_dependencies:
-                    if dep_id in models:
-                        target_model = models[dep_id]
-                        target_model.test_count += 1
-
-                        if column_name and column_name in target_model.columns:
-                            target_model.columns[column_name].test_count += 1
-
-        return DbtProject(models=models)
+        tests: Dict[str, DbtTest] = {}
+        # Tests may precede the model they reference; those links are resolved after the pass.
+        pending_tests: List[Tuple[str, Optional[str], DbtTest]] = []
+        # With --jobs > 1, compiled SQL files are read on a thread pool while the manifest is still streaming.
+        pending_reads: Dict[str, Future] = {}
+
+        io_pool = ThreadPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+        with io_pool or nullcontext():
+            for section, unique_id, node_data in iter_manifest(self.manifest_path):
+                if section == "metadata":
+                    if not dialect:
+                        dialect = self._dialect_from_metadata(node_data)
+                    continue
+
+                resource_type = node_data.get("resource_type")
+                if resource_type == "model":
+                    models[unique_id] = self._build_model(unique_id, node_data)
+                    # With a selection, SQL is read once the models that need it are known.
+                    if not self.select:
+                        self._read_sql(models[unique_id], compiled_code_dir, io_pool, pending_reads)
+                elif resource_type == "test":
+                    column_name = node_data.get("column_name")
+                    test = DbtTest(unique_id=sys.intern(unique_id), name=node_data.get("name", ""))
+                    tests[test.unique_id] = test
+                    for dep_id in node_data.get("depends_on", {}).get("nodes", []):
+                        if dep_id in models:
+                            self._attach_test(models[dep_id], column_name, test)
+                        else:
+                            pending_tests.append((dep_id, column_name, test))
+
+            for dep_id, column_name, test in pending_tests:
+                if dep_id in models:
+                    self._attach_test(models[dep_id], column_name, test)
+            tests = {unique_id: test for unique_id, test in tests.items() if test.attachments}
+            context: Dict[str, DbtModel] = {}
+            if self.select:
+                models, context, traced_context = self._select(models)
+                tests = _tests_of(tests, models)
+                for model in [*models.values(), *(context[unique_id] for unique_id in traced_context)]:
+                    self._read_sql(model, compiled_code_dir, io_pool, pending_reads)
+                # Context models only need their SQL for lineage.
+                for unique_id in traced_context:
+                    if unique_id in pending_reads:
+                        context[unique_id].raw_sql = pending_reads.pop(unique_id).result()
+
+            self.dialect = dialect or "ansi"
+            # Serial runs keep each parsed AST so LineageAnalyzer can reuse it instead of re-parsing,
+            # unless compact mode trades that second parse for not holding every AST at once. With
+            # jobs > 1 both analyses parse inside worker processes, so the shared cache is bypassed.
+            self.parse_cache = SqlParseCache(dialect=self.dialect)
+            self.sql_analyzer = SqlComplexityAnalyzer(
+                dialect=self.dialect, parse_cache=None if self.compact or self.jobs > 1 else self.parse_cache
+            )
+            project = DbtProject(models=models, tests=tests, context_models=context)
+            if self.state_path is not None:
+                self._plan_state_reuse(project, pending_reads)
+                pending_reads = {}
+            if self.analyze_complexity:
+                self._analyze_complexity(models, pending_reads)
+            else:
+                for unique_id, future in pending_reads.items():
+                    models[unique_id].raw_sql = future.result()
+
+        return project
+
+    def _select(self, models: Dict[str, DbtModel]) -> Tuple[Dict[str, DbtModel], Dict[str, DbtModel], List[str]]:
+        """Splits the manifest's models into the selection and the context its lineage needs.
+
+        The context is the selection's parents (for their declared columns), its children (traced,
+        so their edges into selected columns count downstream) and the children's other parents
+        (so the children's SQL resolves). Everything else is dropped before any SQL is read.
+        Returns the selected models, the context models and the context models to trace.
+        """
+        index = SelectorIndex(models.values())
+        selected = index.select(self.select)
+        selected_set = set(selected)
+        children = [
+            unique_id for unique_id in models
+            if unique_id not in selected_set and any(parent_id in selected_set for parent_id in index.parents[unique_id])
+        ]
+        needed = set(children)
+        for unique_id in [*selected, *children]:
+            needed.update(index.parents[unique_id])
+        needed -= selected_set
+        return (
+            {unique_id: models[unique_id] for unique_id in selected},
+            {unique_id: model for unique_id, model in models.items() if unique_id in needed},
+            children,
+        )
+
+    def _read_sql(self, model: DbtModel, compiled_code_dir: Path, io_pool: Optional[ThreadPoolExecutor], pending_reads: Dict[str, Future]):
+        # Non-SQL models (e.g. dbt Python models) have no SQL to read or parse.
+        if model.language != "sql":
+            return
+        compiled_sql_path = self._locate_compiled_sql(model, compiled_code_dir)
+        if compiled_sql_path is None:
+            return
+        if io_pool:
+            pending_reads[model.unique_id] = io_pool.submit(_read_text, compiled_sql_path)
+        else:
+            model.raw_sql = _read_text(compiled_sql_path)
+
+    def _plan_state_reuse(self, project: DbtProject, pending_reads: Dict[str, Future]):
+        """Compares against the --state artifacts and adopts stored results for unchanged models."""
+        # The plan compares compiled SQL hashes, so every read has to land first.
+        for unique_id, future in pending_reads.items():
+            project.models[unique_id].raw_sql = future.result()
+        self.state_reuse = plan_state_reuse(
+            project,
+            read_previous_models(self.state_path),
+            AnalysisState.read(self.state_path),
+            self.dialect,
+        )
+        for unique_id, stored in self.state_reuse.items():
+            project.models[unique_id].complexity = stored.complexity
+
+    @property
+    def lineage_reuse(self) -> Dict[str, Tuple[Dict[str, List[Tuple[str, str]]], List[str], Optional[List[str]]]]:
+        """Stored ``(upstream refs per column, warnings, unresolved columns)`` for models LineageAnalyzer can skip."""
+        return {unique_id: (stored.upstream, stored.warnings, stored.unresolved) for unique_id, stored in self.state_reuse.items()}
+
+    def write_state(self, project: DbtProject, lineage_warnings: Dict[str, List[str]], unresolved_columns: Dict[str, Optional[List[str]]]):
+        """Records this run's results in target/ so a later run can use it via --state."""
+        AnalysisState.from_project(project, self.dialect, lineage_warnings, unresolved_columns).write(self.project_path / "target")
+
+    def _analyze_complexity(self, models: Dict[str, DbtModel], pending_reads: Dict[str, Future]):
+        """Runs SqlComplexityAnalyzer over every model with compiled SQL.
+
+        Serially when jobs == 1; otherwise each file is handed to a process pool as soon as its
+        read completes. Results are assigned per unique_id, so they match the serial run exactly.
+        Models whose result is already in the analysis cache are not parsed at all.
+        """
+        if self.jobs == 1:
+            for unique_id, model in models.items():
+                if unique_id in self.state_reuse:
+                    continue
+                if model.raw_sql and not self._load_cached_complexity(model):
+                    model.complexity = self.sql_analyzer.analyze(model.raw_sql)
+                    self._store_cached_complexity(model)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            futures: Dict[str, Future] = {}
+            for unique_id, model in models.items():
+                if unique_id in pending_reads:
+                    model.raw_sql = pending_reads[unique_id].result()
+                if unique_id in self.state_reuse:
+                    continue
+                if model.raw_sql and not self._load_cached_complexity(model):
+                    futures[unique_id] = pool.submit(_analyze_complexity, self.dialect, model.raw_sql)
+            for unique_id, future in futures.items():
+                models[unique_id].complexity = future.result()
+                self._store_cached_complexity(models[unique_id])
+
+    def _load_cached_complexity(self, model: DbtModel) -> bool:
+        if self.cache is None:
+            return False
+        model.complexity = self.cache.get_complexity(AnalysisCache.make_key(COMPLEXITY, self.dialect, model.raw_sql))
+        return model.complexity is not None
+
+    def _store_cached_complexity(self, model: DbtModel):
+        if self.cache is not None:
+            self.cache.put_complexity(AnalysisCache.make_key(COMPLEXITY, self.dialect, model.raw_sql), model.complexity)
+
+    def _locate_compiled_sql(self, model: DbtModel, compiled_code_dir: Path) -> Optional[Path]:
+        compiled_sql_path = compiled_code_dir / model.file_path
+        if compiled_sql_path.exists():
+            return compiled_sql_path
+        warnings.warn(
+            f"Compiled SQL not found for model {model.model_name} at {compiled_sql_path}. "
+            f"Complexity metrics will be unavailable for this model.",
+            UserWarning,
+            stacklevel=4,
+        )
+        return None
+
+    def _build_model(self, unique_id: str, node_data: Dict) -> DbtModel:
+        # Ids, names, tags and paths recur across thousands of nodes (every child repeats its
+        # parents' ids); interning them keeps one copy of each string per run.
+        model_relative_path = Path(sys.intern(node_data.get("path", "")))
+
+        # Create DbtColumn objects
+        model_columns = {}
+        for col_name, col_data in node_data.get("columns", {}).items():
+            col_name = sys.intern(col_name)
+            model_columns[col_name] = DbtColumn(name=col_name, description=col_data.get("description", ""))
+
+        return DbtModel(
+            unique_id=sys.intern(unique_id),
+            model_name=sys.intern(node_data.get("name", "")),
+            file_path=model_relative_path,
+            raw_sql="",
+            columns=model_columns,
+            dependencies=self._get_node_dependencies(node_data),
+            tags=[sys.intern(tag) for tag in node_data.get("tags", [])],
+            checksum=node_data.get("checksum", {}).get("checksum", ""),
+            language=sys.intern(node_data.get("language") or "sql"),
+        )
+
+    @staticmethod
+    def _attach_test(target_model: DbtModel, column_name: Optional[str], test: DbtTest):
+        target_model.test_count += 1
+        if column_name and column_name in target_model.columns:
+            target_model.columns[column_name].test_count += 1
+            test.attachments.append((target_model.unique_id, column_name))
+        else:
+            test.attachments.append((target_model.unique_id, None))
 
     def _get_node_dependencies(self, node_data: Dict) -> list[str]:
         return [
-            dep
+            sys.intern(dep)
             for dep in node_data.get("depends_on", {}).get("nodes", [])
             if dep.startswith("model.")
         ]
@@ -0,0 +1,145 @@
+import bisect
+import fnmatch
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from modaryn.domain.model import DbtModel
+
+# [@][N]+method:value[+N], as in dbt's node selection syntax.
+_SELECTOR = re.compile(r"^(?P<at>@)?(?:(?P<parents>\d*)\+)?(?P<body>.+?)(?:\+(?P<children>\d*))?$")
+_GLOB_CHARS = set("*?[")
+
+
+@dataclass
+class Selector:
+    """One parsed ``--select`` value.
+
+    ``parents`` / ``children`` are the graph operator depths: None without the operator, -1 for
+    an unbounded ``+``. ``at`` is the ``@`` operator (the selection, its descendants and all
+    of their ancestors).
+    """
+    text: str
+    method: str  # "name", "path" or "tag"
+    value: str
+    parents: Optional[int] = None
+    children: Optional[int] = None
+    at: bool = False
+    # Compiled name glob; None for exact names and the other methods.
+    pattern: Optional[re.Pattern] = None
+
+
+def parse_selector(text: str) -> Selector:
+    """Parses ``fct_*``, ``path:marts/finance``, ``tag:daily`` with optional ``+``, ``N+``, ``+N`` and ``@`` operators."""
+    match = _SELECTOR.match(text.strip())
+    if match is None:
+        raise ValueError(f"Invalid selector '{text}'.")
+    if match.group("at") and match.group("parents") is not None:
+        raise ValueError(f"Invalid selector '{text}': '@' cannot be combined with a parent '+'.")
+    body = match.group("body")
+    if body.startswith("path:"):
+        method, value = "path", body[5:].rstrip("/")
+    elif body.startswith("tag:"):
+        method, value = "tag", body[4:]
+    else:
+        method, value = "name", body
+    if not value and method != "path":
+        raise ValueError(f"Invalid selector '{text}': nothing to match.")
+
+    def depth(group: str) -> Optional[int]:
+        digits = match.group(group)
+        if digits is None:
+            return None
+        return int(digits) if digits else -1
+
+    return Selector(
+        text=text,
+        method=method,
+        value=value,
+        parents=depth("parents"),
+        children=depth("children"),
+        at=bool(match.group("at")),
+        pattern=re.compile(fnmatch.translate(value)) if method == "name" and _GLOB_CHARS & set(value) else None,
+    )
+
+
+class SelectorIndex:
+    """Evaluates selectors over a model DAG with name, tag and path indexes built once.
+
+    The DAG is given as ``dependencies`` per model, so selection can run on the models read from
+    a manifest before any SQL is read; dependencies on models that are not indexed are ignored.
+    """
+
+    def __init__(self, models: Iterable[DbtModel]):
+        self.order: Dict[str, int] = {}
+        self.parents: Dict[str, List[str]] = {}
+        self.children: Dict[str, List[str]] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        self._names: List[Tuple[str, str]] = []
+        self._by_tag: Dict[str, List[str]] = {}
+        models = list(models)
+        for i, model in enumerate(models):
+            self.order[model.unique_id] = i
+            self.children[model.unique_id] = []
+            self._by_name.setdefault(model.model_name, []).append(model.unique_id)
+            self._names.append((model.model_name, model.unique_id))
+            for tag in model.tags:
+                self._by_tag.setdefault(tag, []).append(model.unique_id)
+        for model in models:
+            self.parents[model.unique_id] = [dep_id for dep_id in model.dependencies if dep_id in self.order]
+            for dep_id in self.parents[model.unique_id]:
+                self.children[dep_id].append(model.unique_id)
+        # Sorted paths: a prefix match is a bisect plus a scan over the matching range.
+        self._paths: List[Tuple[str, str]] = sorted((str(model.file_path), model.unique_id) for model in models)
+
+    def select(self, selectors: List[str]) -> List[str]:
+        """Unique ids matching any of ``selectors`` (OR), in model order."""
+        selected: Set[str] = set()
+        for selector in selectors:
+            selected |= self.evaluate(parse_selector(selector))
+        return sorted(selected, key=self.order.__getitem__)
+
+    def evaluate(self, selector: Selector) -> Set[str]:
+        matched = self._match(selector)
+        selected = set(matched)
+        if selector.at:
+            descendants = self.walk(matched, self.children, -1)
+            selected |= descendants | self.walk(matched | descendants, self.parents, -1)
+            return selected
+        if selector.parents is not None:
+            selected |= self.walk(matched, self.parents, selector.parents)
+        if selector.children is not None:
+            selected |= self.walk(matched, self.children, selector.children)
+        return selected
+
+    @staticmethod
+    def walk(start: Set[str], edges: Dict[str, List[str]], depth: int) -> Set[str]:
+        """Models reachable from ``start`` over ``edges`` within ``depth`` hops (-1 = unbounded), excluding ``start``."""
+        reached: Set[str] = set()
+        frontier = list(start)
+        hop = 0
+        while frontier and (depth < 0 or hop < depth):
+            hop += 1
+            next_frontier = []
+            for unique_id in frontier:
+                for neighbour_id in edges[unique_id]:
+                    if neighbour_id not in reached and neighbour_id not in start:
+                        reached.add(neighbour_id)
+                        next_frontier.append(neighbour_id)
+            frontier = next_frontier
+        return reached
+
+    def _match(self, selector: Selector) -> Set[str]:
+        if selector.method == "tag":
+            return set(self._by_tag.get(selector.value, []))
+        if selector.method == "path":
+            start = bisect.bisect_left(self._paths, (selector.value, ""))
+            matched = set()
+            for path, unique_id in self._paths[start:]:
+                if not path.startswith(selector.value):
+                    break
+                matched.add(unique_id)
+            return matched
+        if selector.pattern is None:
+            return set(self._by_name.get(selector.value, []))
+        return {unique_id for name, unique_id in self._names if selector.pattern.match(name)}
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import sqlglot
+
+from modaryn.analyzers.sql_complexity import SqlComplexityResult
+from modaryn.domain.model import DbtModel, DbtProject
+from modaryn.loaders.stream import iter_manifest, resolve_artifact_path
+
+STATE_FILE_NAME = "modaryn_state.json"
+STATE_FORMAT_VERSION = 2
+
+
+def sql_hash(sql: str) -> str:
+    return hashlib.sha256(sql.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ModelState:
+    """Analysis results of one model as recorded by a previous run."""
+    checksum: str
+    sql_hash: str
+    complexity: Optional[SqlComplexityResult] = None
+    upstream: Dict[str, List[Tuple[str, str]]] = field(default_factory=dict)
+    warnings: List[str] = field(default_factory=list)
+    # Columns whose lineage failed; None when the whole model failed.
+    unresolved: Optional[List[str]] = field(default_factory=list)
+
+
+@dataclass
+class AnalysisState:
+    """Snapshot of a run's per-model analysis results, written next to its manifest.json.
+
+    A later run pointed at the same directory with ``--state`` re-analyzes only the models that
+    changed since that snapshot and reuses these results for everything else.
+    """
+    dialect: str
+    sqlglot_version: str
+    models: Dict[str, ModelState] = field(default_factory=dict)
+
+    @classmethod
+    def from_project(
+        cls,
+        project: DbtProject,
+        dialect: str,
+        lineage_warnings: Dict[str, List[str]],
+        unresolved_columns: Dict[str, Optional[List[str]]],
+    ) -> "AnalysisState":
+        models = {}
+        for unique_id, model in project.models.items():
+            upstream = {}
+            for column_name, column in model.columns.items():
+                refs = column.upstream_columns
+                if refs:
+                    upstream[column_name] = [(ref.model_unique_id, ref.column_name) for ref in refs]
+            models[unique_id] = ModelState(
+                checksum=model.checksum,
+                sql_hash=sql_hash(model.compiled_sql),
+                complexity=model.complexity,
+                upstream=upstream,
+                warnings=list(lineage_warnings.get(unique_id, [])),
+                unresolved=unresolved_columns.get(unique_id, []),
+            )
+        return cls(dialect=dialect, sqlglot_version=sqlglot.__version__, models=models)
+
+    def write(self, target_dir: Path):
+        """Atomically writes the snapshot to ``<target_dir>/modaryn_state.json``."""
+        payload = {
+            "version": STATE_FORMAT_VERSION,
+            "dialect": self.dialect,
+            "sqlglot_version": self.sqlglot_version,
+            "models": {
+                unique_id: {**asdict(state), "complexity": asdict(state.complexity) if state.complexity else None}
+                for unique_id, state in self.models.items()
+            },
+        }
+        target_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, target_dir / STATE_FILE_NAME)
+
+    @classmethod
+    def read(cls, state_dir: Path) -> Optional["AnalysisState"]:
+        path = state_dir / STATE_FILE_NAME
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            payload = json.load(f)
+        if payload.get("version") != STATE_FORMAT_VERSION:
+            return None
+        models = {}
+        for unique_id, data in payload.get("models", {}).items():
+            complexity = data.get("complexity")
+            models[unique_id] = ModelState(
+                checksum=data.get("checksum", ""),
+                sql_hash=data.get("sql_hash", ""),
+                complexity=SqlComplexityResult(**complexity) if complexity else None,
+                upstream={col: [tuple(ref) for ref in refs] for col, refs in data.get("upstream", {}).items()},
+                warnings=data.get("warnings", []),
+                unresolved=data.get("unresolved", []),
+            )
+        return cls(dialect=payload.get("dialect", ""), sqlglot_version=payload.get("sqlglot_version", ""), models=models)
+
+
+def read_previous_models(state_dir: Path) -> Dict[str, Tuple[str, Tuple[str, ...]]]:
+    """Streams ``<state_dir>/manifest.json`` and returns ``{unique_id: (checksum, column names)}`` per model."""
+    manifest_path = resolve_artifact_path(state_dir / "manifest.json")
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"State manifest not found at {manifest_path}. --state must point at a previous run's target/ directory.")
+    previous = {}
+    for section, unique_id, node_data in iter_manifest(manifest_path, sections=()):
+        if node_data.get("resource_type") == "model":
+            previous[unique_id] = (
+                node_data.get("checksum", {}).get("checksum", ""),
+                tuple(node_data.get("columns", {})),
+            )
+    return previous
+
+
+def read_previous_sql(state_dir: Path, unique_ids: Set[str]) -> Dict[str, str]:
+    """Previous compiled SQL of ``unique_ids``: the manifest's ``compiled_code``, or the file under ``<state_dir>/compiled/``.
+
+    Models whose compiled SQL is in neither place are left out.
+    """
+    manifest_path = resolve_artifact_path(state_dir / "manifest.json")
+    previous = {}
+    for section, unique_id, node_data in iter_manifest(manifest_path, sections=()):
+        if unique_id not in unique_ids or node_data.get("resource_type") != "model":
+            continue
+        compiled_sql = node_data.get("compiled_code")
+        if compiled_sql is None:
+            compiled_path = state_dir / "compiled" / node_data.get("package_name", "") / node_data.get("original_file_path", "")
+            if compiled_path.is_file():
+                compiled_sql = compiled_path.read_text(encoding="utf-8")
+        if compiled_sql is not None:
+            previous[unique_id] = compiled_sql
+    return previous
+
+
+def plan_state_reuse(
+    project: DbtProject,
+    previous_models: Dict[str, Tuple[str, Tuple[str, ...]]],
+    state: Optional[AnalysisState],
+    dialect: str,
+) -> Dict[str, ModelState]:
+    """Returns the stored results that can be reused as-is, keyed by unique_id.
+
+    A model is re-analyzed when it is new, when its checksum, compiled SQL or column set
+    differs from the previous manifest/snapshot, or when it is a direct child of such a model
+    (its upstream columns may have changed). Everything else reuses the snapshot.
+    """
+    if state is None or state.dialect != dialect or state.sqlglot_version != sqlglot.__version__:
+        return {}
+
+    changed: Set[str] = set()
+    for unique_id, model in project.models.items():
+        previous = previous_models.get(unique_id)
+        stored = state.models.get(unique_id)
+        if (
+            previous is None
+            or stored is None
+            or previous[0] != model.checksum
+            or stored.checksum != model.checksum
+            or previous[1] != tuple(model.columns)
+            or stored.sql_hash != sql_hash(model.compiled_sql)
+        ):
+            changed.add(unique_id)
+
+    affected = set(changed)
+    for unique_id in changed:
+        affected.update(project.models[unique_id].children)
+
+    return {unique_id: state.models[unique_id] for unique_id in project.models if unique_id not in affected}
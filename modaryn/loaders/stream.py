@@ -0,0 +1,165 @@
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+_CHUNK_SIZE = 1 << 20
+_WHITESPACE = " \t\n\r"
+
+# Candidate suffixes for (optionally compressed) dbt artifacts, in lookup order.
+_ARTIFACT_SUFFIXES = ("", ".gz", ".zst")
+
+
+def resolve_artifact_path(path: Path) -> Path:
+    """Returns the first existing variant of ``path`` (plain, ``.gz`` or ``.zst``).
+
+    Falls back to ``path`` itself so callers can report a meaningful "not found" error.
+    """
+    for suffix in _ARTIFACT_SUFFIXES:
+        candidate = path.with_name(path.name + suffix) if suffix else path
+        if candidate.exists():
+            return candidate
+    return path
+
+
+def open_artifact(path: Path) -> io.TextIOBase:
+    """Opens a dbt artifact as text, transparently decompressing gzip or zstd files."""
+    with open(path, "rb") as f:
+        magic = f.read(4)
+
+    if magic[:2] == b"\x1f\x8b":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if magic == b"\x28\xb5\x2f\xfd":
+        return io.TextIOWrapper(_open_zstd(path), encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _open_zstd(path: Path):
+    try:
+        from compression import zstd  # Python 3.14+
+
+        return zstd.open(path, "rb")
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            f"{path} is zstd-compressed. Install 'zstandard' (pip install modaryn[zstd]) to read it."
+        ) from e
+    return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+
+
+class _JsonStream:
+    """Incremental reader over a JSON document.
+
+    Only the structure of the enclosing objects is walked by hand; every member value is
+    decoded with ``json.JSONDecoder.raw_decode`` so memory stays bounded by the largest
+    single member rather than the whole document.
+    """
+
+    def __init__(self, f: io.TextIOBase):
+        self._f = f
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size: int = _CHUNK_SIZE) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos > _CHUNK_SIZE:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        self._buf += chunk
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def _expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self._pos}, found '{self._buf[self._pos]}'")
+        self._pos += 1
+
+    def decode_value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Most likely the value straddles the buffer boundary; read more and retry.
+                # Grow geometrically so huge values do not cause quadratic re-decoding.
+                if not self._fill(max(_CHUNK_SIZE, len(self._buf) - self._pos)):
+                    raise
+                continue
+            if end == len(self._buf) and self._fill():
+                # A scalar ending exactly at the buffer edge may have been truncated.
+                continue
+            self._pos = end
+            return value
+
+    def iter_object(self) -> Iterator[str]:
+        """Walks the members of the object at the current position, yielding each key.
+
+        The caller must consume the member value (``decode_value``, ``skip_value`` or a
+        nested ``iter_object``) before advancing the iterator.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.decode_value()
+            self._expect(":")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}' at offset {self._pos - 1}, found '{char}'")
+
+    def skip_value(self):
+        """Consumes the value at the current position without materializing it as a whole."""
+        if self.peek() == "{":
+            for _ in self.iter_object():
+                self.skip_value()
+        else:
+            self.decode_value()
+
+
+def iter_manifest(
+    path: Path,
+    sections: Iterable[str] = ("metadata",),
+    streamed_sections: Iterable[str] = ("nodes",),
+) -> Iterator[Tuple[str, Optional[str], Any]]:
+    """Streams the top-level sections of a (possibly compressed) dbt artifact.
+
+    Yields ``(section, None, value)`` for each section in ``sections`` (decoded whole) and
+    ``(section, key, value)`` for every member of each section in ``streamed_sections``.
+    All other sections are skipped member by member.
+    """
+    sections = set(sections)
+    streamed_sections = set(streamed_sections)
+    with open_artifact(path) as f:
+        stream = _JsonStream(f)
+        for section in stream.iter_object():
+            if section in sections:
+                yield section, None, stream.decode_value()
+            elif section in streamed_sections and stream.peek() == "{":
+                for key in stream.iter_object():
+                    yield section, key, stream.decode_value()
+            else:
+                stream.skip_value()
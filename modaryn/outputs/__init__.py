@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Optional, List, Tuple
 from modaryn.domain.model import DbtProject, DbtModel, ScoreStatistics
+from modaryn.scorers.sweep import SweepResult
 
 
 def _extract_complexity_fields(model: DbtModel) -> Tuple[str, str, str, str, str]:
@@ -16,6 +17,32 @@ def _extract_complexity_fields(model: DbtModel) -> Tuple[str, str, str, str, str
     return "N/A", "N/A", "N/A", "N/A", "N/A"
 
 
+def _format_correlation(result: SweepResult) -> str:
+    return f"{result.rank_correlation:.3f}" if result.rank_correlation is not None else "N/A"
+
+
+def _rank_models(project: DbtProject, apply_zscore: bool = False) -> List[DbtModel]:
+    """Models by descending score (Z-score or raw), ties in project order.
+
+    Reads the ranking off the project's columnar ScoreTable when it covers the current models, and
+    falls back to sorting the model objects otherwise (e.g. for a project that was not scored).
+    """
+    models = list(project.models.values())
+    table = project.score_table
+    if (
+        table is not None
+        and (table.scores is not None or not apply_zscore)
+        and table.features.unique_ids == list(project.models)
+    ):
+        return [models[i] for i in table.ranking(apply_zscore).tolist()]
+    score_attr = "score" if apply_zscore else "raw_score"
+    return sorted(
+        models,
+        key=lambda m: getattr(m, score_attr) if getattr(m, score_attr) is not None else -1,
+        reverse=True,
+    )
+
+
 class OutputGenerator(ABC):
     @abstractmethod
     def generate_report(self, project: DbtProject, problematic_models: Optional[List[DbtModel]] = None, threshold: Optional[float] = None, apply_zscore: bool = False, statistics: Optional[ScoreStatistics] = None) -> Optional[str]:
@@ -4,7 +4,7 @@ import json # jsonモジュールをインポート
 import html # htmlモジュールをインポート
 
 from modaryn.domain.model import DbtProject, DbtModel, ScoreStatistics
-from . import OutputGenerator
+from . import OutputGenerator, _rank_models
 from .graph import generate_visjs_graph_data # 新しく作成したモジュールをインポート
 
 HTML_SCORE_TEMPLATE = """
@@ -360,13 +360,7 @@ class HtmlOutput(OutputGenerator):
         self.env.filters['tojson'] = lambda obj: json.dumps(obj, separators=(',', ':')) # Jinja2環境にtojsonフィルターを追加。コンパクトなJSONを生成するように設定。
 
     def generate_report(self, project: DbtProject, problematic_models: Optional[List[DbtModel]] = None, threshold: Optional[float] = None, apply_zscore: bool = False, statistics: Optional[ScoreStatistics] = None) -> Optional[str]:
-        sort_key = (lambda m: m.score) if apply_zscore else (lambda m: m.raw_score)
-        
-        sorted_models = sorted(
-            project.models.values(), 
-            key=lambda m: sort_key(m) if sort_key(m) is not None else -1,
-            reverse=True
-        )
+        sorted_models = _rank_models(project, apply_zscore)
 
         # vis.jsのグラフデータを生成
         visjs_nodes_data = generate_visjs_graph_data(project, apply_zscore=apply_zscore)
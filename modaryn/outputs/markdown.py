@@ -1,13 +1,13 @@
 from typing import Optional, List
 
 from modaryn.domain.model import DbtProject, DbtModel, ScoreStatistics
-from . import OutputGenerator, _extract_complexity_fields
+from modaryn.scorers.sweep import SweepResult
+from . import OutputGenerator, _extract_complexity_fields, _format_correlation, _rank_models
 
 
 class MarkdownOutput(OutputGenerator):
     def generate_report(self, project: DbtProject, problematic_models: Optional[List[DbtModel]] = None, threshold: Optional[float] = None, apply_zscore: bool = False, statistics: Optional[ScoreStatistics] = None) -> Optional[str]:
         score_header = "Score (Z-Score)" if apply_zscore else "Score (Raw)"
-        sort_key = (lambda m: m.score) if apply_zscore else (lambda m: m.raw_score)
         score_attr = "score" if apply_zscore else "raw_score"
 
         lines = [
@@ -16,11 +16,7 @@ class MarkdownOutput(OutputGenerator):
             f"| Rank | Model Name | {score_header} | Quality Score | JOINs | CTEs | Conditionals | WHEREs | SQL Chars | Downstream Children | Col. Down | Tests | Coverage (%) |",
             "|------|------------|-----------------|---------------|-------|------|--------------|--------|-----------|---------------------|-----------|-------|--------------|",
         ]
-        sorted_models = sorted(
-            project.models.values(),
-            key=lambda m: sort_key(m) if sort_key(m) is not None else -1,
-            reverse=True,
-        )
+        sorted_models = _rank_models(project, apply_zscore)
         for i, model in enumerate(sorted_models):
             join_count, cte_count, conditional_count, where_count, sql_char_count = _extract_complexity_fields(model)
 
@@ -52,3 +48,19 @@ class MarkdownOutput(OutputGenerator):
             lines.append(f"Threshold: {threshold:.3f}")
         
         return "\n".join(lines)
+
+    def generate_sweep_report(self, results: List[SweepResult], top_n: int) -> Optional[str]:
+        lines = [
+            "# Modaryn Weight Sweep",
+            "",
+            f"Reference: default weights. Top-N: {top_n}.",
+            "",
+            f"| Configuration | Spearman ρ | Top-{top_n} overlap | Top 3 | New in top {top_n} |",
+            "|---------------|------------|-----------------|-------|-----------------|",
+        ]
+        for result in results:
+            lines.append(
+                f"| {result.label} | {_format_correlation(result)} | {result.top_n_overlap}/{top_n} | "
+                f"{', '.join(result.top_models[:3])} | {', '.join(result.entered_top_n) or '-'} |"
+            )
+        return "\n".join(lines)
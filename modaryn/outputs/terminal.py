@@ -1,10 +1,11 @@
 import shutil
 from rich.console import Console
 from rich.table import Table
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 
 from ..domain.model import DbtProject, DbtModel, ScoreStatistics
-from . import OutputGenerator, _extract_complexity_fields
+from ..scorers.sweep import SweepResult
+from . import OutputGenerator, _extract_complexity_fields, _format_correlation, _rank_models
 
 _MIN_TABLE_WIDTH = 160
 
@@ -21,11 +22,9 @@ class TerminalOutput(OutputGenerator):
 
         if apply_zscore:
             table.add_column("Score(Z)", justify="right", style="green", no_wrap=True)
-            sort_key = lambda m: m.score if m.score is not None else -1
             score_attr = "score"
         else:
             table.add_column("Score(Raw)", justify="right", style="green", no_wrap=True)
-            sort_key = lambda m: m.raw_score if m.raw_score is not None else -1
             score_attr = "raw_score"
         
         table.add_column("Qual.", justify="right", style="magenta", no_wrap=True)
@@ -39,11 +38,7 @@ class TerminalOutput(OutputGenerator):
         table.add_column("Tests", justify="right", style="yellow", no_wrap=True)
         table.add_column("Cov.%", justify="right", style="yellow", no_wrap=True)
 
-        sorted_models = sorted(
-            project.models.values(),
-            key=sort_key,
-            reverse=True,
-        )
+        sorted_models = _rank_models(project, apply_zscore)
 
         problematic_model_names = {model.model_name for model in problematic_models} if problematic_models else set()
 
@@ -96,3 +91,40 @@ class TerminalOutput(OutputGenerator):
 
             self.console.print(f"Threshold: {threshold:.3f}")
         return None
+
+    def generate_sweep_report(self, results: List[SweepResult], top_n: int) -> Optional[str]:
+        """Prints each weight configuration's ranking compared against the default weights."""
+        table = Table(title=f"Weight Sweep (reference: default weights, top {top_n})", expand=True)
+        table.add_column("Configuration", style="white", ratio=1)
+        table.add_column("Spearman ρ", justify="right", style="green", no_wrap=True)
+        table.add_column(f"Top-{top_n} overlap", justify="right", style="yellow", no_wrap=True)
+        table.add_column("Top 3", style="cyan", ratio=1)
+        table.add_column(f"New in top {top_n}", style="magenta", ratio=1)
+        for result in results:
+            table.add_row(
+                result.label,
+                _format_correlation(result),
+                f"{result.top_n_overlap}/{top_n}",
+                ", ".join(result.top_models[:3]),
+                ", ".join(result.entered_top_n) or "-",
+            )
+        self.console.print(table)
+        return None
+
+    def generate_blast_radius_report(
+        self,
+        rows: List[Tuple[Tuple[str, str], int, int]],
+        model_names: Dict[str, str],
+        top_n: int,
+    ) -> Optional[str]:
+        """Prints the first ``top_n`` of ``rows``: ``((model_id, column), affected columns, affected models)``, already ranked."""
+        table = Table(title=f"Column Blast Radius (top {min(top_n, len(rows))} of {len(rows)} column(s) with downstream impact)", expand=True)
+        table.add_column("Rank", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Model", style="white", ratio=1)
+        table.add_column("Column", style="green", ratio=1)
+        table.add_column("Affected columns", justify="right", style="yellow", no_wrap=True)
+        table.add_column("Affected models", justify="right", style="yellow", no_wrap=True)
+        for rank, ((model_id, col_name), column_count, model_count) in enumerate(rows[:top_n], start=1):
+            table.add_row(str(rank), model_names[model_id], col_name, str(column_count), str(model_count))
+        self.console.print(table)
+        return None
@@ -0,0 +1,54 @@
+import math
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+_CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+_CGROUP_V1_QUOTA = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+_CGROUP_V1_PERIOD = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """Returns the container CPU quota (in CPUs) from cgroup v2 or v1, or None if unlimited."""
+    try:
+        quota, period = _CGROUP_V2_CPU_MAX.read_text().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        quota_us = int(_CGROUP_V1_QUOTA.read_text())
+        period_us = int(_CGROUP_V1_PERIOD.read_text())
+        if quota_us > 0 and period_us > 0:
+            return quota_us / period_us
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may actually use (affinity mask and cgroup quota aware)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+
+def resolve_jobs(jobs: Union[str, int, None]) -> int:
+    """Resolves a ``--jobs`` value (a positive integer or ``auto``) to a worker count."""
+    if jobs is None:
+        return 1
+    if isinstance(jobs, str) and jobs.strip().lower() == "auto":
+        return available_cpus()
+    try:
+        value = int(jobs)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid jobs value '{jobs}'. Use a positive integer or 'auto'.")
+    if value < 1:
+        raise ValueError(f"Invalid jobs value '{jobs}'. Use a positive integer or 'auto'.")
+    return value
@@ -1,17 +1,30 @@
 import warnings
 import yaml
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Tuple
 import numpy as np
 
-from modaryn.domain.model import DbtProject, DbtModel, ScoreStatistics
+from modaryn.domain.features import FEATURE_NAMES, FEATURES, FeatureMatrix, ScoreTable
+from modaryn.domain.model import DbtProject, ScoreStatistics
 
 DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / "config" / "default.yml"
 
+# Quality features that lower the quality score instead of raising it.
+_PENALTY_FEATURES = (FEATURE_NAMES.index("untested_downstream_column_count"),)
+
+# (section, key) of the weights whose features come from column-level lineage.
+LINEAGE_WEIGHTS = (
+    ("importance", "downstream_column_count"),
+    ("importance", "downstream_column_model_spread"),
+    ("quality", "untested_downstream_column_penalty"),
+)
+
 
 class Scorer:
-    def __init__(self, config_path: Path | None = None):
+    def __init__(self, config_path: Path | None = None, overrides: Dict | None = None):
         self.weights = self._load_weights(config_path)
+        if overrides:
+            self._merge_weights(self.weights, overrides, "overrides")
 
     def _load_weights(self, config_path: Path | None) -> Dict:
         with open(DEFAULT_CONFIG_PATH, "r") as f:
@@ -20,100 +33,99 @@ class Scorer:
         if config_path:
             with open(config_path, "r") as f:
                 user_weights = yaml.safe_load(f) or {}
-
-            known_sections = {"sql_complexity", "importance", "quality"}
-            unknown_sections = set(user_weights.keys()) - known_sections
-            if unknown_sections:
-                warnings.warn(
-                    f"Unknown sections in config '{config_path}': {sorted(unknown_sections)}. "
-                    f"Valid sections are: {sorted(known_sections)}.",
-                    UserWarning,
-                    stacklevel=2,
-                )
-
-            for section in known_sections:
-                if section in user_weights:
-                    known_keys = set(weights[section].keys())
-                    user_keys = set(user_weights[section].keys())
-                    unknown_keys = user_keys - known_keys
-                    if unknown_keys:
-                        warnings.warn(
-                            f"Unknown keys in config section '{section}': {sorted(unknown_keys)}. "
-                            f"Valid keys are: {sorted(known_keys)}.",
-                            UserWarning,
-                            stacklevel=2,
-                        )
-                    weights[section].update(user_weights[section])
+            self._merge_weights(weights, user_weights, f"config '{config_path}'")
         return weights
 
+    @staticmethod
+    def _merge_weights(weights: Dict, user_weights: Dict, source: str):
+        known_sections = {"sql_complexity", "importance", "quality"}
+        unknown_sections = set(user_weights.keys()) - known_sections
+        if unknown_sections:
+            warnings.warn(
+                f"Unknown sections in {source}: {sorted(unknown_sections)}. "
+                f"Valid sections are: {sorted(known_sections)}.",
+                UserWarning,
+                stacklevel=3,
+            )
+
+        for section in known_sections:
+            if section in user_weights:
+                known_keys = set(weights[section].keys())
+                user_keys = set(user_weights[section].keys())
+                unknown_keys = user_keys - known_keys
+                if unknown_keys:
+                    warnings.warn(
+                        f"Unknown keys in config section '{section}': {sorted(unknown_keys)}. "
+                        f"Valid keys are: {sorted(known_keys)}.",
+                        UserWarning,
+                        stacklevel=3,
+                    )
+                weights[section].update(user_weights[section])
+
+    @property
+    def needs_column_lineage(self) -> bool:
+        """False when every lineage-dependent weight is 0, so column lineage cannot change a score."""
+        return any(self.weights.get(section, {}).get(key, 0) != 0 for section, key in LINEAGE_WEIGHTS)
+
     def score_project(self, project: DbtProject, apply_zscore: bool = False):
         """Scores all models in a project. Optionally applies Z-scores and calculates score statistics."""
         if not project.models:
             return
 
-        raw_scores_map: Dict[str, float] = {}
-        for model in project.models.values():
-            model_raw_score = self._calculate_raw_score(model)
-            model.raw_score = model_raw_score
-            raw_scores_map[model.unique_id] = model_raw_score
-
-        # Calculate statistics for raw scores
-        if raw_scores_map:
-            raw_score_values: List[float] = list(raw_scores_map.values())
-            project.statistics = ScoreStatistics(
-                mean=np.mean(raw_score_values),
-                median=np.median(raw_score_values),
-                std_dev=np.std(raw_score_values)
-            )
-
+        table = self.score_features(FeatureMatrix.from_project(project), apply_zscore=apply_zscore)
+        project.statistics = self.statistics(table.raw_scores)
+        project.score_table = table
+
+        raw_scores = table.raw_scores.tolist()
+        quality_scores = table.quality_scores.tolist()
+        scores = table.scores.tolist() if table.scores is not None else None
+        for i, model in enumerate(project.models.values()):
+            model.raw_score = raw_scores[i]
+            model.quality_score = quality_scores[i]
+            if scores is not None:
+                model.score = scores[i]
+
+    def weight_vectors(self) -> Dict[str, np.ndarray]:
+        """Per config section, the weight of every feature (0 for features outside the section)."""
+        vectors = {section: np.zeros(len(FEATURES)) for section in ("sql_complexity", "importance", "quality")}
+        for i, (_, section, key) in enumerate(FEATURES):
+            vectors[section][i] = self.weights.get(section, {}).get(key, 0)
+        return vectors
+
+    def score_features(self, features: FeatureMatrix, apply_zscore: bool = False) -> ScoreTable:
+        """Computes raw, quality and (optionally) Z-scores for every row of ``features`` at once."""
+        vectors = self.weight_vectors()
+        complexity = self._weighted_sum(features.values, vectors["sql_complexity"])
+        importance = self._weighted_sum(features.values, vectors["importance"])
+        quality = self._weighted_sum(features.values, vectors["quality"], negative=_PENALTY_FEATURES)
+        raw_scores = np.maximum(complexity + importance - quality, 0.0)
+
+        scores = None
         if apply_zscore:
-            score_values: List[float] = list(raw_scores_map.values()) # Use raw scores for Z-score calculation
-            mean_score = np.mean(score_values)
-            std_dev = np.std(score_values)
-
-            for model in project.models.values():
-                raw_score = raw_scores_map[model.unique_id]
-                if std_dev > 0:
-                    model.score = (raw_score - mean_score) / std_dev
-                else:
-                    model.score = 0.0  # All models have the same raw score
-
-    def _calculate_raw_score(self, model: DbtModel) -> float:
-        """Calculates a raw, un-normalized score for a single model."""
-        sql_complexity_weights = self.weights.get("sql_complexity", {})
-        importance_weights = self.weights.get("importance", {})
-        quality_weights = self.weights.get("quality", {})
-
-        complexity_score = 0
-        if model.complexity:
-            complexity_score += model.complexity.join_count * sql_complexity_weights.get("join_count", 0)
-            complexity_score += model.complexity.cte_count * sql_complexity_weights.get("cte_count", 0)
-            complexity_score += model.complexity.conditional_count * sql_complexity_weights.get("conditional_count", 0)
-            complexity_score += model.complexity.where_count * sql_complexity_weights.get("where_count", 0)
-            complexity_score += model.complexity.sql_char_count * sql_complexity_weights.get("sql_char_count", 0)
-
-        importance_score = (
-            model.downstream_model_count
-            * importance_weights.get("downstream_model_count", 0)
-        )
-        importance_score += (
-            model.downstream_column_count
-            * importance_weights.get("downstream_column_count", 0)
-        )
-        importance_score += (
-            model.downstream_column_model_spread
-            * importance_weights.get("downstream_column_model_spread", 0)
-        )
-        
-        quality_score = 0
-        quality_score += model.test_count * quality_weights.get("test_count", 0)
-        quality_score += model.column_test_coverage * quality_weights.get("column_coverage", 0)
-        quality_score -= (
-            model.untested_downstream_column_count
-            * quality_weights.get("untested_downstream_column_penalty", 0)
+            std_dev = np.std(raw_scores)
+            if std_dev > 0:
+                scores = (raw_scores - np.mean(raw_scores)) / std_dev
+            else:
+                scores = np.zeros_like(raw_scores)  # All models have the same raw score
+        return ScoreTable(features, raw_scores, quality, scores)
+
+    @staticmethod
+    def statistics(raw_scores: np.ndarray) -> ScoreStatistics:
+        return ScoreStatistics(
+            mean=np.mean(raw_scores),
+            median=np.median(raw_scores),
+            std_dev=np.std(raw_scores),
         )
-        model.quality_score = quality_score
-        
-        raw_score = complexity_score + importance_score - quality_score
 
-        return max(0, raw_score)
+    @staticmethod
+    def _weighted_sum(values: np.ndarray, weights: np.ndarray, negative: Tuple[int, ...] = ()) -> np.ndarray:
+        """Sums ``values[:, i] * weights[i]`` column by column in FEATURES order.
+
+        Accumulating column-wise (rather than a BLAS matrix product) keeps the floating-point
+        summation order of a per-model sum, so scores do not drift between versions.
+        """
+        total = np.zeros(values.shape[0])
+        for i in np.flatnonzero(weights):
+            term = values[:, i] * weights[i]
+            total = total - term if i in negative else total + term
+        return total
@@ -0,0 +1,105 @@
+import itertools
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+from modaryn.domain.features import FeatureMatrix
+from modaryn.scorers.score import Scorer
+
+
+@dataclass
+class SweepResult:
+    """How one weights configuration ranks the models compared with the reference configuration."""
+    label: str
+    # Spearman rank correlation of raw scores with the reference; None when either side is constant.
+    rank_correlation: Optional[float]
+    top_n_overlap: int
+    top_models: List[str] = field(default_factory=list)
+    # Models in this configuration's top N that are not in the reference's top N.
+    entered_top_n: List[str] = field(default_factory=list)
+
+
+def load_grid(grid_path: Path) -> List[Tuple[str, Dict[str, Dict[str, float]]]]:
+    """Expands a grid spec into ``(label, weight overrides)`` pairs, one per combination.
+
+    The spec uses the weights file layout with a list of values per key, e.g.
+    ``importance: {downstream_column_count: [0.05, 0.1, 0.2]}``; a scalar counts as a one-value list.
+    """
+    with open(grid_path, "r") as f:
+        spec = yaml.safe_load(f) or {}
+    if not isinstance(spec, dict):
+        raise ValueError(f"Grid spec '{grid_path}' must map sections to weight keys.")
+
+    axes: List[Tuple[str, str, list]] = []
+    for section, keys in spec.items():
+        if not isinstance(keys, dict):
+            raise ValueError(f"Grid section '{section}' in '{grid_path}' must map weight keys to lists of values.")
+        for key, values in keys.items():
+            values = values if isinstance(values, list) else [values]
+            if not values:
+                raise ValueError(f"Grid key '{section}.{key}' in '{grid_path}' has no values.")
+            axes.append((section, key, values))
+
+    combinations = []
+    for values in itertools.product(*(axis_values for _, _, axis_values in axes)):
+        overrides: Dict[str, Dict[str, float]] = {}
+        for (section, key, _), value in zip(axes, values):
+            overrides.setdefault(section, {})[key] = value
+        label = ", ".join(f"{key}={value}" for (_, key, _), value in zip(axes, values))
+        combinations.append((label, overrides))
+    return combinations
+
+
+def rank_correlation(a: np.ndarray, b: np.ndarray) -> Optional[float]:
+    """Spearman's rho with average ranks for ties."""
+    if len(a) < 2:
+        return None
+    rank_a, rank_b = _average_ranks(a), _average_ranks(b)
+    if np.std(rank_a) == 0 or np.std(rank_b) == 0:
+        return None
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def _average_ranks(values: np.ndarray) -> np.ndarray:
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+    # Runs of equal values share the mean of the 1-based positions they span.
+    run_start = np.r_[True, sorted_values[1:] != sorted_values[:-1]]
+    starts = np.flatnonzero(run_start)
+    ends = np.r_[starts[1:], len(values)]
+    run = np.cumsum(run_start) - 1
+    ranks = np.empty(len(values))
+    ranks[order] = ((starts + ends - 1) / 2.0 + 1)[run]
+    return ranks
+
+
+def run_sweep(
+    features: FeatureMatrix,
+    scorers: Sequence[Tuple[str, Scorer]],
+    model_names: Sequence[str],
+    top_n: int = 10,
+) -> List[SweepResult]:
+    """Scores ``features`` under every configuration; the first one is the reference.
+
+    The feature matrix is built once, so each configuration costs a few vector operations.
+    ``model_names`` follows the matrix rows.
+    """
+    results: List[SweepResult] = []
+    reference_scores = None
+    reference_top: set = set()
+    for label, scorer in scorers:
+        table = scorer.score_features(features)
+        top = [model_names[i] for i in table.ranking()[:top_n].tolist()]
+        if reference_scores is None:
+            reference_scores, reference_top = table.raw_scores, set(top)
+        results.append(SweepResult(
+            label=label,
+            rank_correlation=rank_correlation(reference_scores, table.raw_scores),
+            top_n_overlap=len(reference_top.intersection(top)),
+            top_models=top,
+            entered_top_n=[name for name in top if name not in reference_top],
+        ))
+    return results
@@ -0,0 +1,71 @@
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+from modaryn.domain.model import DbtColumn, DbtModel, DbtProject
+
+
+def model_node(name, columns=(), depends_on=(), tags=()):
+    return {
+        "resource_type": "model",
+        "name": name,
+        "path": f"{name}.sql",
+        "tags": list(tags),
+        "columns": {c: {"name": c, "description": f"{c} column"} for c in columns},
+        "depends_on": {"nodes": list(depends_on)},
+    }
+
+
+def dbt_test_node(model_id, column_name=None):
+    return {
+        "resource_type": "test",
+        "column_name": column_name,
+        "depends_on": {"nodes": [model_id]},
+    }
+
+
+def sql_model(name, sql, columns, parents=()):
+    """An in-memory ``model.<name>`` with compiled SQL; its checksum is the SQL itself."""
+    return DbtModel(
+        unique_id=f"model.{name}",
+        model_name=name,
+        file_path=Path(f"models/{name}.sql"),
+        raw_sql=sql,
+        columns={c: DbtColumn(name=c, description="") for c in columns},
+        dependencies=[f"model.{p}" for p in parents],
+        checksum=sql,
+    )
+
+
+def sql_project(models) -> DbtProject:
+    """A DbtProject of ``(name, sql, columns[, parents])`` specs, in order."""
+    built = [sql_model(*spec) for spec in models]
+    return DbtProject(models={m.unique_id: m for m in built})
+
+
+def write_project(root: Path, nodes: dict, sql: dict, adapter_type="duckdb", compress=None) -> Path:
+    """Writes a minimal compiled dbt project (dbt_project.yml, manifest, compiled SQL)."""
+    (root / "dbt_project.yml").write_text("name: demo\n")
+    target = root / "target"
+    compiled = target / "compiled" / "demo" / "models"
+    compiled.mkdir(parents=True, exist_ok=True)
+    for name, body in sql.items():
+        (compiled / f"{name}.sql").write_text(body)
+    for node in nodes.values():
+        if node["resource_type"] == "model" and node["name"] in sql:
+            # dbt checksums the raw code; the compiled SQL is a close enough stand-in here.
+            node["checksum"] = {"name": "sha256", "checksum": hashlib.sha256(sql[node["name"]].encode()).hexdigest()}
+    manifest = {
+        "metadata": {"adapter_type": adapter_type},
+        "nodes": nodes,
+        "macros": {f"macro.demo.m{i}": {"name": f"m{i}", "macro_sql": "x" * 100} for i in range(50)},
+        "parent_map": {uid: [] for uid in nodes},
+    }
+    payload = json.dumps(manifest, indent=2)
+    if compress == "gzip":
+        with gzip.open(target / "manifest.json.gz", "wt") as f:
+            f.write(payload)
+    else:
+        (target / "manifest.json").write_text(payload)
+    return root
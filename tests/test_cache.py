@@ -0,0 +1,139 @@
+import os
+import warnings
+
+from typer.testing import CliRunner
+
+from modaryn.analyzers.lineage import LineageAnalyzer
+from modaryn.analyzers.sql_complexity import SqlComplexityResult
+from modaryn.cache import COMPLEXITY, AnalysisCache
+from modaryn.cli import app
+from modaryn.domain.model import ColumnReference
+from modaryn.loaders.manifest import ManifestLoader
+from tests.helpers import model_node, write_project
+
+runner = CliRunner()
+
+NODES = {
+    "model.demo.a": model_node("a", columns=["id", "name"]),
+    "model.demo.b": model_node("b", columns=["id", "missing"], depends_on=["model.demo.a"]),
+}
+SQL = {
+    "a": "select 1 as id, 'x' as name",
+    "b": "select id from a",
+}
+
+
+def _load_with_lineage(project_path, cache):
+    loader = ManifestLoader(project_path, cache=cache)
+    project = loader.load()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        analyzer = LineageAnalyzer(dialect=loader.dialect, parse_cache=loader.parse_cache, cache=cache)
+        analyzer.analyze(project)
+    return loader, project, [str(w.message) for w in caught], analyzer
+
+
+def test_cache_round_trips_complexity(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache")
+    key = AnalysisCache.make_key(COMPLEXITY, "duckdb", "select 1")
+    result = SqlComplexityResult(join_count=1, cte_count=2, conditional_count=3, where_count=4, sql_char_count=5)
+
+    assert cache.get_complexity(key) is None
+    cache.put_complexity(key, result)
+    assert cache.get_complexity(key) == result
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert key != AnalysisCache.make_key(COMPLEXITY, "snowflake", "select 1")
+
+
+def test_warm_run_skips_parsing_and_matches_cold_run(tmp_path):
+    write_project(tmp_path, NODES, SQL)
+    cache = AnalysisCache.for_project(tmp_path)
+
+    _, cold, cold_warnings, _ = _load_with_lineage(tmp_path, cache)
+    loader, warm, warm_warnings, analyzer = _load_with_lineage(tmp_path, AnalysisCache.for_project(tmp_path))
+
+    assert loader.parse_cache.parse_count == 0
+    assert warm_warnings == cold_warnings
+    assert len(warm_warnings) == 1
+    assert analyzer.unresolved_columns("model.demo.b") == {"missing"}
+    assert analyzer.unresolved_columns("model.demo.a") == set()
+    for unique_id, model in cold.models.items():
+        assert warm.models[unique_id].complexity == model.complexity
+        for name, column in model.columns.items():
+            assert warm.models[unique_id].columns[name].upstream_columns == column.upstream_columns
+            assert warm.models[unique_id].columns[name].downstream_columns == column.downstream_columns
+    assert [ref.column_name for ref in warm.models["model.demo.a"].columns["id"].downstream_columns] == ["id"]
+
+
+def test_lineage_cache_is_invalidated_by_upstream_schema_change(tmp_path):
+    write_project(tmp_path, NODES, SQL)
+    cache = AnalysisCache.for_project(tmp_path)
+    _load_with_lineage(tmp_path, cache)
+
+    loader = ManifestLoader(tmp_path, cache=cache)
+    project = loader.load()
+    project.models["model.demo.a"].columns.pop("name")
+    analyzer = LineageAnalyzer(dialect=loader.dialect, cache=cache)
+    assert cache.get_lineage(analyzer._cache_key(project.models["model.demo.b"])) is None
+
+
+def test_lineage_cache_misses_after_case_only_parent_column_rename(tmp_path):
+    write_project(tmp_path, NODES, SQL)
+    _load_with_lineage(tmp_path, AnalysisCache.for_project(tmp_path))
+
+    renamed = dict(NODES, **{"model.demo.a": model_node("a", columns=["ID", "name"])})
+    write_project(tmp_path, renamed, SQL)
+    _, project, _, _ = _load_with_lineage(tmp_path, AnalysisCache.for_project(tmp_path))
+
+    assert project.models["model.demo.b"].columns["id"].upstream_columns == (ColumnReference("model.demo.a", "ID"),)
+
+
+def test_prune_evicts_least_recently_used_entries(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache", max_bytes=1000)
+    keys = [AnalysisCache.make_key(COMPLEXITY, "duckdb", f"select {i}") for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.put(COMPLEXITY, key, {"padding": "x" * 200})
+        path = cache._entry_path(COMPLEXITY, key)
+        os.utime(path, (1000 + i, 1000 + i))
+    # Touch the oldest entry so it becomes the most recently used.
+    cache.get(COMPLEXITY, keys[0])
+
+    evicted = cache.prune()
+
+    assert evicted > 0
+    assert cache.stats().total_bytes <= 1000
+    assert cache.get(COMPLEXITY, keys[0]) is not None
+    assert cache.get(COMPLEXITY, keys[1]) is None
+
+
+def test_cache_cli_stats_and_clear(tmp_path):
+    write_project(tmp_path, NODES, SQL)
+    _load_with_lineage(tmp_path, AnalysisCache.for_project(tmp_path))
+
+    result = runner.invoke(app, ["cache", "stats", "--project-path", str(tmp_path)])
+    assert result.exit_code == 0
+    assert "complexity: 2 entries" in result.stdout
+    assert "lineage: 2 entries" in result.stdout
+
+    result = runner.invoke(app, ["cache", "clear", "--project-path", str(tmp_path)])
+    assert result.exit_code == 0
+    assert "Removed 4 cache entries" in result.stdout
+    assert sum(AnalysisCache.for_project(tmp_path).stats().entries.values()) == 0
+
+
+def test_unwritable_cache_is_not_fatal_to_prune_and_clear_reports_it(tmp_path, monkeypatch):
+    write_project(tmp_path, NODES, SQL)
+    cache = AnalysisCache.for_project(tmp_path)
+    _load_with_lineage(tmp_path, cache)
+
+    def read_only(self):
+        raise PermissionError(13, "Permission denied", str(self.root / ".lock"))
+
+    monkeypatch.setattr(AnalysisCache, "_lock", read_only)
+    cache.max_bytes = 1
+    assert cache.prune() == 0
+
+    result = runner.invoke(app, ["cache", "clear", "--project-path", str(tmp_path)])
+    assert result.exit_code == 1
+    assert "Could not clear the analysis cache" in result.output
+    assert result.exception is None or isinstance(result.exception, SystemExit)
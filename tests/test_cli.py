@@ -3,9 +3,10 @@ from modaryn.cli import app
 import pytest
 from pathlib import Path
 import json
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, ANY
 
 from modaryn.loaders.manifest import ManifestLoader
+from modaryn.analyzers.lineage import LineageAnalyzer
 from modaryn.scorers.score import Scorer
 from modaryn.outputs.terminal import TerminalOutput
 from modaryn.domain.model import DbtProject, DbtModel, ScoreStatistics # Added ScoreStatistics
@@ -279,7 +280,7 @@ def test_score_command_with_apply_zscore_option_calls_scorer_correctly(
 
     # Assert
     assert result.exit_code == 0
-    mock_manifest_loader.assert_called_once_with(dbt_project_with_compiled_sql, dialect=None)
+    mock_manifest_loader.assert_called_once_with(dbt_project_with_compiled_sql, dialect=None, jobs="1", cache=ANY, state_path=None, compact=False, select=None)
     mock_loader_instance.load.assert_called_once()
     mock_scorer.assert_called_once_with(None) # No config passed
     mock_scorer_instance.score_project.assert_called_once_with(mock_project_instance, apply_zscore=True)
@@ -411,3 +412,208 @@ def test_score_command_to_html_file_outputs_statistics(dbt_project_with_compiled
     assert "<li>Mean:" in content
     assert "<li>Median:" in content
     assert "<li>Standard Deviation:" in content
+
+
+def test_score_command_compact_mode_produces_the_same_report(dbt_project_with_compiled_sql, tmp_path):
+    reports = []
+    for extra in ([], ["--compact"]):
+        output_file = tmp_path / f"report{len(reports)}.md"
+        result = runner.invoke(app, ["score", "--project-path", str(dbt_project_with_compiled_sql), "-f", "markdown", "-o", str(output_file), "--no-cache", *extra])
+        assert result.exit_code == 0
+        reports.append(output_file.read_text())
+    assert reports[0] == reports[1]
+
+
+def test_sweep_command_compares_weight_configs_from_one_analysis(dbt_project_with_compiled_sql, tmp_path):
+    same = tmp_path / "same.yml"
+    same.write_text("importance:\n  downstream_model_count: 1.0\n")
+    grid = tmp_path / "grid.yml"
+    grid.write_text("sql_complexity:\n  join_count: [0, 2.0]\n")
+    output_file = tmp_path / "sweep.md"
+
+    with patch("modaryn.cli.LineageAnalyzer.analyze", autospec=True, side_effect=LineageAnalyzer.analyze) as analyze:
+        result = runner.invoke(app, [
+            "sweep", "--project-path", str(dbt_project_with_compiled_sql), "--config", str(same), "--grid", str(grid),
+            "--top-n", "3", "-f", "markdown", "-o", str(output_file), "--no-cache",
+        ])
+
+    assert result.exit_code == 0, result.output
+    assert analyze.call_count == 1
+    rows = [line for line in output_file.read_text().splitlines() if line.startswith("| ") and "---" not in line][1:]
+    assert [row.split(" | ")[0] for row in rows] == ["| default", "| same.yml", "| join_count=0", "| join_count=2.0"]
+    # same.yml only restates a default weight, so it ranks exactly like the reference.
+    assert rows[1].split(" | ")[1:3] == ["1.000", "3/3"]
+
+
+def test_score_skips_column_lineage_when_no_weight_needs_it(dbt_project_with_compiled_sql, tmp_path):
+    config = tmp_path / "no_lineage.yml"
+    config.write_text(
+        "importance:\n  downstream_column_count: 0\n  downstream_column_model_spread: 0\n"
+        "quality:\n  untested_downstream_column_penalty: 0\n"
+    )
+
+    with patch("modaryn.cli.LineageAnalyzer.analyze") as analyze:
+        result = runner.invoke(app, ["score", "--project-path", str(dbt_project_with_compiled_sql), "--config", str(config), "--no-cache"])
+        assert result.exit_code == 0, result.output
+        assert "lineage skipped (all lineage-dependent weights are 0)" in result.output
+
+        result = runner.invoke(app, ["ci-check", "--project-path", str(dbt_project_with_compiled_sql), "-t", "1000", "--no-column-lineage", "--no-cache"])
+        assert result.exit_code == 0, result.output
+        assert "lineage skipped (--no-column-lineage)" in result.output
+    analyze.assert_not_called()
+
+
+def test_sweep_command_requires_a_config_or_grid(dbt_project_with_compiled_sql):
+    result = runner.invoke(app, ["sweep", "--project-path", str(dbt_project_with_compiled_sql)])
+    assert result.exit_code == 1
+    assert "--config or a --grid" in result.output
+
+
+def test_impact_all_writes_an_index_that_later_queries_reuse(dbt_project_with_compiled_sql):
+    index_path = dbt_project_with_compiled_sql / "target" / "modaryn_reachability.json"
+    index_path.unlink(missing_ok=True)
+    try:
+        result = runner.invoke(app, ["impact", "--project-path", str(dbt_project_with_compiled_sql), "--all", "-n", "3", "--no-cache"])
+        assert result.exit_code == 0, result.output
+        assert "Column Blast Radius" in result.output
+        assert "--tests is ignored" not in result.output
+        assert index_path.exists()
+
+        result = runner.invoke(app, ["impact", "--project-path", str(dbt_project_with_compiled_sql), "--all", "--tests"])
+        assert result.exit_code == 0, result.output
+        assert "Warning: --tests is ignored with --all" in " ".join(result.output.split())
+        assert "dbt test --select" not in result.output
+
+        with patch("modaryn.cli.LineageAnalyzer.analyze") as analyze:
+            result = runner.invoke(app, ["impact", "--project-path", str(dbt_project_with_compiled_sql), "-m", "stg_orders", "-c", "customer_id"])
+        assert result.exit_code == 0, result.output
+        assert "Using reachability index" in result.output
+        analyze.assert_not_called()
+    finally:
+        index_path.unlink(missing_ok=True)
+
+
+def test_impact_requires_a_column_or_all(dbt_project_with_compiled_sql):
+    result = runner.invoke(app, ["impact", "--project-path", str(dbt_project_with_compiled_sql)])
+    assert result.exit_code == 1
+    assert "--all" in result.output
+
+
+def test_impact_traces_several_sources_at_once(dbt_project_with_compiled_sql):
+    result = runner.invoke(app, [
+        "impact", "--project-path", str(dbt_project_with_compiled_sql),
+        "-m", "stg_customers", "-c", "stg_orders.order_date", "--no-cache",
+    ])
+    assert result.exit_code == 0, result.output
+    output = " ".join(result.output.split())  # undo console line wrapping
+    assert "Impact Analysis: 6 changed column(s)" in output
+    assert "int_customer_cohorts.conversion_type ← stg_orders.order_date, stg_customers.signup_date" in output
+    assert "stg_orders.order_date: 1 column(s)" in output
+
+
+def test_impact_model_named_by_a_qualified_column_is_not_expanded(dbt_project_with_compiled_sql):
+    result = runner.invoke(app, [
+        "impact", "--project-path", str(dbt_project_with_compiled_sql),
+        "-m", "stg_orders", "-c", "stg_orders.order_date", "--no-cache",
+    ])
+    assert result.exit_code == 0, result.output
+    assert "Impact Analysis: stg_orders.order_date" in result.output
+    assert "changed column(s)" not in result.output
+
+
+def test_impact_and_lineage_reject_a_malformed_selector(dbt_project_with_compiled_sql):
+    for command in (["impact", "--all"], ["lineage", "-m", "stg_orders", "-c", "order_id"]):
+        result = runner.invoke(app, [*command, "--project-path", str(dbt_project_with_compiled_sql), "-s", "@+x", "--no-cache"])
+        assert result.exit_code == 1
+        assert "Invalid selector '@+x'" in result.output
+        assert result.exception is None or isinstance(result.exception, SystemExit)
+
+
+def test_lineage_command_shows_upstream_roots_and_downstream(dbt_project_with_compiled_sql):
+    result = runner.invoke(app, [
+        "lineage", "--project-path", str(dbt_project_with_compiled_sql),
+        "-m", "int_customer_cohorts", "-c", "conversion_type", "--no-cache",
+    ])
+    assert result.exit_code == 0, result.output
+    output = " ".join(result.output.split())
+    assert "Direct upstream: ← stg_customers.signup_date ← stg_orders.order_date" in output
+    assert "Root source columns: ◆ stg_customers.signup_date ◆ stg_orders.order_date" in output
+
+
+def test_lineage_command_respects_max_results(dbt_project_with_compiled_sql):
+    result = runner.invoke(app, [
+        "lineage", "--project-path", str(dbt_project_with_compiled_sql), "-m", "stg_customers", "-c", "signup_date",
+        "--direction", "downstream", "--max-results", "1", "--no-cache",
+    ])
+    assert result.exit_code == 0, result.output
+    assert "int_customer_cohorts.signup_date" in result.output
+    assert "conversion_type" not in result.output
+    assert "Stopped after 1 downstream column(s)" in result.output
+
+
+def test_slim_ci_selects_models_reached_by_changed_columns(dbt_project_with_compiled_sql, tmp_path):
+    import json
+
+    manifest = json.loads((dbt_project_with_compiled_sql / "target" / "manifest.json").read_text())
+    node = manifest["nodes"]["model.sample_project.stg_customers"]
+    # The "previous" manifest differs from the current one only in how segment is computed.
+    node["checksum"]["checksum"] = "previous"
+    node["compiled_code"] = node["compiled_code"].replace("segment,", "lower(segment) as segment,", 1)
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest))
+
+    result = runner.invoke(app, ["slim-ci", "--project-path", str(dbt_project_with_compiled_sql), "--state", str(tmp_path), "--no-cache", "-v"])
+
+    assert result.exit_code == 0, result.output
+    assert "0 added, 0 removed, 1 modified" in result.output
+    assert "modified stg_customers.segment" in result.output
+    command = result.output.strip().splitlines()[-1]
+    assert command.startswith("dbt build --select ")
+    assert "stg_customers" in command.split()
+    assert "stg_orders" not in command.split()
+
+
+def test_slim_ci_reports_nothing_to_rebuild_without_changes(dbt_project_with_compiled_sql):
+    result = runner.invoke(app, ["slim-ci", "--project-path", str(dbt_project_with_compiled_sql), "--state", str(dbt_project_with_compiled_sql / "target"), "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert "No models need rebuilding" in result.output
+
+
+def test_diff_emits_changed_columns_and_their_impact_as_json(dbt_project_with_compiled_sql, tmp_path):
+    import json
+
+    manifest = json.loads((dbt_project_with_compiled_sql / "target" / "manifest.json").read_text())
+    node = manifest["nodes"]["model.sample_project.stg_customers"]
+    node["checksum"]["checksum"] = "previous"
+    node["compiled_code"] = node["compiled_code"].replace("customer_id,", "customer_id + 0 as customer_id,", 1)
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest))
+
+    result = runner.invoke(app, [
+        "diff", "--project-path", str(dbt_project_with_compiled_sql), "--state", str(tmp_path), "--impact", "-f", "json", "--no-cache",
+    ])
+
+    assert result.exit_code == 0, result.output
+    payload = json.loads(result.stdout)
+    assert [(c["model"], c["column"], c["change"]) for c in payload["changes"]] == [("stg_customers", "customer_id", "modified")]
+    assert payload["modified_models"] == ["model.sample_project.stg_customers"]
+    affected = {(c["model"], c["column"]) for c in payload["impact"]["affected"]}
+    assert ("int_customer_cohorts", "customer_id") in affected
+    assert all(c["sources"][0]["column"] == "customer_id" for c in payload["impact"]["affected"])
+
+
+def test_diff_reports_no_changes_against_the_same_manifest(dbt_project_with_compiled_sql):
+    result = runner.invoke(app, ["diff", "--project-path", str(dbt_project_with_compiled_sql), "--state", str(dbt_project_with_compiled_sql / "target"), "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert "0 added, 0 removed, 0 modified" in result.output
+    assert "No column changes" in result.output
+
+
+def test_impact_tests_prints_a_selector_of_impacted_tests(dbt_project_with_compiled_sql):
+    result = runner.invoke(app, [
+        "impact", "--project-path", str(dbt_project_with_compiled_sql), "-m", "stg_customers", "-c", "customer_id", "--tests", "--no-cache",
+    ])
+    assert result.exit_code == 0, result.output
+    selected = result.output.strip().splitlines()[-1].split()
+    assert selected[:3] == ["dbt", "test", "--select"]
+    assert "not_null_stg_customers_customer_id" in selected
+    assert "not_null_int_customer_cohorts_customer_id" in selected
+    assert not any(name.endswith("_email") for name in selected)
@@ -0,0 +1,98 @@
+from modaryn.analyzers.column_diff import ADDED, MODIFIED, REMOVED, column_fingerprints, diff_project
+from modaryn.analyzers.impact import ImpactAnalyzer
+from modaryn.analyzers.lineage import LineageAnalyzer
+from modaryn.analyzers.rebuild import plan_rebuild
+from modaryn.domain.model import DbtProject
+from tests.helpers import sql_project
+
+BASE_SQL = "WITH base AS (SELECT id, x + 1 AS y FROM raw WHERE z > 1) SELECT base.id, y, 3 AS k FROM base"
+
+
+def _changed(sql: str):
+    old, new = column_fingerprints(BASE_SQL, "duckdb"), column_fingerprints(sql, "duckdb")
+    return {name for name in set(old) | set(new) if old.get(name) != new.get(name)}
+
+
+def test_fingerprints_ignore_formatting_and_follow_ctes():
+    assert _changed("with base as (select id, x+1 as y from raw where z>1) -- reformatted\nselect base.id, y, 3 as k from base") == set()
+    assert _changed(BASE_SQL.replace("3 AS k", "4 AS k")) == {"k"}
+    assert _changed(BASE_SQL.replace("x + 1", "x + 2")) == {"y"}
+    # A filter changes the rows of every column.
+    assert _changed(BASE_SQL.replace("z > 1", "z > 2")) == {"id", "y", "k"}
+    assert column_fingerprints("SELECT * FROM raw", "duckdb") is None
+
+
+def _project(fct_sql="SELECT id, amount * 2 AS doubled FROM stg"):
+    return sql_project([
+        ("stg", "SELECT 1 AS id, 10 AS amount, 'x' AS label", ["id", "amount", "label"]),
+        ("fct", fct_sql, ["id", "doubled"], ["stg"]),
+        ("dim", "SELECT id, label FROM stg", ["id", "label"], ["stg"]),
+        ("rpt", "SELECT id, label FROM dim", ["id", "label"], ["dim"]),
+    ])
+
+
+def test_diff_and_rebuild_follow_only_changed_columns():
+    previous = _project()
+    previous_models = {unique_id: (m.checksum, tuple(m.columns)) for unique_id, m in previous.models.items()}
+    previous_sql = {unique_id: m.raw_sql for unique_id, m in previous.models.items()}
+
+    project = _project()
+    stg = project.models["model.stg"]
+    stg.raw_sql = stg.checksum = "SELECT 1 AS id, 20 AS amount, 'x' AS label"
+
+    diff = diff_project(project, previous_models, previous_sql, "duckdb")
+    assert diff.modified_models == ["model.stg"]
+    assert [(c.model_id, c.column, c.kind) for c in diff.changes] == [("model.stg", "amount", MODIFIED)]
+
+    plan = plan_rebuild(project, diff, ImpactAnalyzer(project, LineageAnalyzer(dialect="duckdb")))
+    # dim and rpt read only id/label, so they are not rebuilt; state:modified+ would build everything.
+    assert plan.models == ["model.stg", "model.fct"]
+    assert plan.modified_plus == ["model.stg", "model.fct", "model.dim", "model.rpt"]
+
+
+def test_removed_column_rebuilds_its_readers_from_previous_lineage():
+    previous = _project()
+    LineageAnalyzer(dialect="duckdb").analyze(previous)
+    previous_models = {unique_id: (m.checksum, tuple(m.columns)) for unique_id, m in previous.models.items()}
+    previous_upstream = {
+        unique_id: {name: [(r.model_unique_id, r.column_name) for r in c.upstream_columns] for name, c in m.columns.items()}
+        for unique_id, m in previous.models.items()
+    }
+
+    project = _project()
+    stg = project.models["model.stg"]
+    stg.raw_sql = stg.checksum = "SELECT 1 AS id, 10 AS amount"
+    del stg.columns["label"]
+    project = DbtProject(models=project.models)
+
+    diff = diff_project(project, previous_models, {u: m.raw_sql for u, m in previous.models.items()}, "duckdb")
+    assert diff.columns(REMOVED) == [("model.stg", "label")]
+    assert diff.columns(ADDED, MODIFIED) == []
+
+    plan = plan_rebuild(project, diff, ImpactAnalyzer(project, LineageAnalyzer(dialect="duckdb")), previous_upstream)
+    assert plan.sources == [("model.dim", "label")]
+    assert plan.models == ["model.stg", "model.dim", "model.rpt"]
+
+
+def test_undocumented_changed_column_rebuilds_the_children():
+    def project(extra):
+        # Only "id" is documented, so "extra" has no place in the column graph.
+        return sql_project([
+            ("a", f"SELECT 1 AS id, {extra} AS extra", ["id"]),
+            ("b", "SELECT * FROM a", ["id"], ["a"]),
+        ])
+
+    previous = project("3")
+    current = project("4")
+    diff = diff_project(
+        current,
+        {unique_id: (m.checksum, tuple(m.columns)) for unique_id, m in previous.models.items()},
+        {unique_id: m.raw_sql for unique_id, m in previous.models.items()},
+        "duckdb",
+    )
+    assert diff.columns(MODIFIED) == [("model.a", "extra")]
+
+    plan = plan_rebuild(current, diff, ImpactAnalyzer(current, LineageAnalyzer(dialect="duckdb")))
+    # b's "id" lineage resolves, but the star passes the undocumented change through.
+    assert plan.models == ["model.a", "model.b"]
+    assert plan.opaque_models == ["model.b"]
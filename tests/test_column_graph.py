@@ -0,0 +1,116 @@
+from pathlib import Path
+
+import pytest
+
+from modaryn.domain.column_graph import ColumnGraph
+from modaryn.domain.model import ColumnReference, DbtColumn, DbtModel, DbtProject, ModelMetrics
+
+
+def test_column_graph_interns_columns_and_looks_them_up_case_insensitively():
+    graph = ColumnGraph()
+    amount = graph.add_column("model.a", "Amount")
+
+    assert graph.add_column("model.a", "Amount") == amount
+    assert graph.column_id("model.a", "amount") is None
+    assert graph.column_id("model.a", "amount", casefold=True) == amount
+    assert graph.column_id("model.missing", "Amount") is None
+    assert graph.column_ref(amount) == ("model.a", "Amount")
+    assert len(graph) == 1
+
+
+def test_column_graph_builds_csr_adjacency_in_insertion_order():
+    graph = ColumnGraph.from_columns([("model.a", "id"), ("model.b", "id"), ("model.c", "id"), ("model.c", "total")])
+    a, b, c, total = range(4)
+
+    assert graph.add_edge(b, total)
+    assert graph.add_edge(a, total)
+    assert not graph.add_edge(a, total)  # duplicate
+    assert graph.add_edge(a, c)
+
+    assert list(graph.upstream(total)) == [b, a]
+    assert list(graph.downstream(a)) == [total, c]
+    assert graph.downstream_degree(a) == 2
+    assert graph.upstream_degree(a) == 0
+    assert graph.edge_count == 3
+
+    # Edges and columns added after a read are served from the per-column deltas until the
+    # CSR is rebuilt, and duplicates are still rejected.
+    graph.add_edge(c, total)
+    assert not graph.add_edge(b, total)
+    late = graph.add_column("model.d", "total")
+    graph.add_edge(total, late)
+    assert list(graph.upstream(total)) == [b, a, c]
+    assert list(graph.downstream(total)) == [late]
+    assert graph.upstream_degree(total) == 3 and graph.upstream_degree(late) == 1
+    assert graph._csr_edges == 3
+    for source in (a, b, c):
+        graph.add_edge(source, late)
+    assert list(graph.upstream(late)) == [total, a, b, c]
+    assert graph._csr_edges == graph.edge_count == 8
+
+
+def test_dbt_column_accessors_are_views_over_the_project_graph():
+    def model(unique_id, columns):
+        return DbtModel(
+            unique_id=unique_id,
+            model_name=unique_id.split(".")[-1],
+            file_path=Path(f"models/{unique_id}.sql"),
+            raw_sql="",
+            columns={c: DbtColumn(name=c, description="") for c in columns},
+        )
+
+    project = DbtProject(models={"model.a": model("model.a", ["id"]), "model.b": model("model.b", ["id", "ref_id"])})
+    graph = project.column_graph
+    source = project.models["model.a"].columns["id"]
+    for target in project.models["model.b"].columns.values():
+        graph.add_edge(source.column_id, target.column_id)
+
+    assert source.downstream_columns == (ColumnReference("model.b", "id"), ColumnReference("model.b", "ref_id"))
+    assert project.models["model.b"].columns["ref_id"].upstream_columns == (ColumnReference("model.a", "id"),)
+    assert project.models["model.a"].downstream_column_count == 2
+    assert project.models["model.a"].downstream_column_model_spread == 1
+    assert DbtColumn(name="detached", description="").upstream_columns == ()
+    # The views are read-only; edges are added through the graph.
+    with pytest.raises(AttributeError):
+        source.downstream_columns.append(ColumnReference("model.b", "other"))
+
+
+def test_project_metrics_are_materialized_once_and_invalidated_explicitly():
+    def model(unique_id, columns, tested=()):
+        return DbtModel(
+            unique_id=unique_id,
+            model_name=unique_id.split(".")[-1],
+            file_path=Path(f"models/{unique_id}.sql"),
+            raw_sql="",
+            columns={c: DbtColumn(name=c, description="", test_count=int(c in tested)) for c in columns},
+        )
+
+    project = DbtProject(models={
+        "model.a": model("model.a", ["id", "amount"], tested=["id"]),
+        "model.b": model("model.b", ["id", "amount"]),
+        "model.c": model("model.c", ["amount"]),
+    })
+    graph = project.column_graph
+    a = project.models["model.a"]
+    graph.add_edge(a.columns["id"].column_id, project.models["model.b"].columns["id"].column_id)
+    graph.add_edge(a.columns["amount"].column_id, project.models["model.b"].columns["amount"].column_id)
+    project.materialize_metrics()
+
+    assert project.metrics_current
+    assert a.metrics == ModelMetrics(
+        column_count=2,
+        tested_column_count=1,
+        downstream_column_count=2,
+        downstream_column_model_spread=1,
+        untested_downstream_column_count=1,
+        column_test_coverage=50.0,
+    )
+
+    # A new edge makes the record stale; the properties keep serving it until it is refreshed.
+    graph.add_edge(a.columns["amount"].column_id, project.models["model.c"].columns["amount"].column_id)
+    assert not project.metrics_current
+    assert a.downstream_column_model_spread == 1
+    project.invalidate_metrics()
+    assert a.metrics is None
+    assert a.downstream_column_model_spread == 2
+    assert a.untested_downstream_column_count == 2
@@ -1,3 +1,4 @@
+import sys
 from modaryn.domain.model import DbtModel, SqlComplexityResult
 from pathlib import Path
 import pytest
@@ -37,3 +38,16 @@ def test_dbtmodel_default_raw_score_is_zero():
     )
     assert model.raw_score == 0.0
 
+
+def test_dbtmodel_release_sql_drops_or_compresses_compiled_sql():
+    raw_sql = "SELECT 1 AS id"
+    dropped = DbtModel(unique_id="model.a", model_name="a", file_path=Path("a.sql"), raw_sql=raw_sql)
+    compressed = DbtModel(unique_id="model.b", model_name="b", file_path=Path("b.sql"), raw_sql=raw_sql)
+
+    dropped.release_sql()
+    compressed.release_sql(compress=True)
+
+    assert dropped.raw_sql == "" and dropped.compiled_sql == ""
+    assert compressed.raw_sql == ""
+    assert compressed.compiled_sql == raw_sql
+    assert not hasattr(compressed, "__dict__") or sys.version_info < (3, 10)
@@ -0,0 +1,94 @@
+from modaryn.analyzers.impact import ImpactAnalyzer, impacted_tests
+from modaryn.analyzers.lineage import LineageAnalyzer
+from modaryn.domain.model import DbtTest
+from tests.helpers import sql_project
+
+
+MODELS = [
+    ("orders", "SELECT 1 AS id, 10 AS amount", ["id", "amount"]),
+    ("stg_amounts", "SELECT id, amount FROM orders", ["id", "amount"], ["orders"]),
+    ("stg_ids", "SELECT id FROM orders", ["id"], ["orders"]),
+    ("fct_revenue", "SELECT SUM(amount) AS revenue FROM stg_amounts", ["revenue"], ["stg_amounts"]),
+    ("fct_ids", "SELECT id FROM stg_ids", ["id"], ["stg_ids"]),
+]
+
+
+def test_impact_traces_only_reachable_descendants_in_topological_order():
+    project = sql_project(MODELS)
+    analyzer = ImpactAnalyzer(project, LineageAnalyzer(dialect="duckdb"))
+
+    assert analyzer.descendants("model.orders") == ["model.stg_amounts", "model.stg_ids", "model.fct_revenue", "model.fct_ids"]
+
+    results = analyzer.downstream("model.orders", "amount")
+
+    assert results == {1: [("model.stg_amounts", "amount")], 2: [("model.fct_revenue", "revenue")]}
+    # stg_ids is traced (a child of orders) but gets no impacted column, so fct_ids is never traced.
+    assert analyzer.traced == {"model.stg_amounts", "model.stg_ids", "model.fct_revenue"}
+
+
+def test_lazy_impact_matches_a_full_lineage_analysis():
+    full = sql_project(MODELS)
+    LineageAnalyzer(dialect="duckdb").analyze(full)
+
+    for unique_id, model in full.models.items():
+        for column in model.columns:
+            lazy = ImpactAnalyzer(sql_project(MODELS), LineageAnalyzer(dialect="duckdb"))
+            assert lazy.downstream(unique_id, column) == ImpactAnalyzer(full).downstream(unique_id, column)
+
+
+def test_downstream_many_unions_sources_with_attribution():
+    project = sql_project(MODELS)
+    analyzer = ImpactAnalyzer(project, LineageAnalyzer(dialect="duckdb"))
+
+    result = analyzer.downstream_many([("model.orders", "amount"), ("model.stg_ids", "id"), ("model.orders", "missing")])
+
+    assert result.sources == [("model.orders", "amount"), ("model.stg_ids", "id")]
+    assert result.by_hop == {
+        1: [("model.stg_amounts", "amount"), ("model.fct_ids", "id")],
+        2: [("model.fct_revenue", "revenue")],
+    }
+    assert result.attribution == {
+        ("model.stg_amounts", "amount"): [("model.orders", "amount")],
+        ("model.fct_ids", "id"): [("model.stg_ids", "id")],
+        ("model.fct_revenue", "revenue"): [("model.orders", "amount")],
+    }
+
+
+def test_downstream_many_attributes_shared_columns_to_every_source():
+    full = sql_project(MODELS)
+    LineageAnalyzer(dialect="duckdb").analyze(full)
+
+    result = ImpactAnalyzer(full).downstream_many([("model.orders", "id"), ("model.stg_ids", "id")])
+
+    # stg_ids.id is itself a source, so it is not listed; fct_ids.id is reached from both.
+    assert result.by_hop == {1: [("model.stg_amounts", "id"), ("model.fct_ids", "id")]}
+    assert result.attribution[("model.fct_ids", "id")] == [("model.orders", "id"), ("model.stg_ids", "id")]
+    assert result.attribution[("model.stg_amounts", "id")] == [("model.orders", "id")]
+
+
+def test_impacted_tests_cover_affected_columns_and_their_models():
+    project = sql_project(MODELS)
+    tests = [
+        DbtTest("test.not_null_orders_amount", "not_null_orders_amount", [("model.orders", "amount")]),
+        DbtTest("test.not_null_orders_id", "not_null_orders_id", [("model.orders", "id")]),
+        DbtTest("test.revenue_positive", "revenue_positive", [("model.fct_revenue", None)]),
+        DbtTest("test.unique_stg_amounts_id", "unique_stg_amounts_id", [("model.stg_amounts", "id")]),
+        DbtTest("test.fct_ids_rowcount", "fct_ids_rowcount", [("model.fct_ids", None)]),
+    ]
+    project.tests = {test.unique_id: test for test in tests}
+
+    result = ImpactAnalyzer(project, LineageAnalyzer(dialect="duckdb")).downstream_many([("model.orders", "amount")])
+
+    assert [test.name for test in impacted_tests(project, result)] == ["not_null_orders_amount", "revenue_positive"]
+
+
+def test_lazy_tracing_drops_metrics_materialized_before_it():
+    project = sql_project(MODELS)
+    project.materialize_metrics()
+    orders = project.models["model.orders"]
+    assert orders.downstream_column_count == 0
+
+    ImpactAnalyzer(project, LineageAnalyzer(dialect="duckdb")).downstream("model.orders", "amount")
+
+    assert not project.metrics_current and orders.metrics is None
+    assert orders.downstream_column_count == 3
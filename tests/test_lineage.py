@@ -216,3 +216,255 @@ def test_lineage_analyzer_dialect_postgres():
     analyzer = LineageAnalyzer(dialect="postgres")
     analyzer.analyze(project)
     assert len(model_b.columns["id"].upstream_columns) == 1
+
+def test_lineage_analyzer_parses_each_model_once():
+    from modaryn.analyzers.sql_complexity import SqlComplexityAnalyzer
+    from modaryn.analyzers.sql_parse import SqlParseCache
+
+    model_a = DbtModel(
+        unique_id="model.a",
+        model_name="table_a",
+        file_path=Path("models/a.sql"),
+        raw_sql="SELECT 1 as id, 'Alice' as name, 2 as score",
+        columns={c: DbtColumn(name=c, description="") for c in ("id", "name", "score")}
+    )
+    model_b = DbtModel(
+        unique_id="model.b",
+        model_name="table_b",
+        file_path=Path("models/b.sql"),
+        raw_sql="SELECT id, name, score FROM table_a",
+        columns={c: DbtColumn(name=c, description="") for c in ("id", "name", "score")},
+        dependencies=["model.a"]
+    )
+    project = DbtProject(models={"model.a": model_a, "model.b": model_b})
+
+    cache = SqlParseCache(dialect="duckdb")
+    complexity = SqlComplexityAnalyzer(dialect="duckdb", parse_cache=cache)
+    for model in project.models.values():
+        model.complexity = complexity.analyze(model.raw_sql)
+    LineageAnalyzer(dialect="duckdb", parse_cache=cache).analyze(project)
+
+    # One parse per model shared by both analyzers, released once lineage is done.
+    assert cache.parse_count == 2
+    assert len(cache) == 0
+    assert [ref.column_name for ref in model_b.columns["score"].upstream_columns] == ["score"]
+
+    # A model served from stored results is never traced; its AST is released all the same.
+    for model in project.models.values():
+        complexity.analyze(model.raw_sql)
+    LineageAnalyzer(dialect="duckdb", parse_cache=cache).analyze(project, reuse={"model.a": ({}, [], [])})
+    assert cache.parse_count == 4
+    assert len(cache) == 0
+
+def _build_chain_project():
+    models = {
+        "model.a": DbtModel(
+            unique_id="model.a",
+            model_name="table_a",
+            file_path=Path("models/a.sql"),
+            raw_sql="SELECT 1 as id, 'Alice' as name, 10 as amount",
+            columns={c: DbtColumn(name=c, description="") for c in ("id", "name", "amount")},
+        ),
+        "model.b": DbtModel(
+            unique_id="model.b",
+            model_name="table_b",
+            file_path=Path("models/b.sql"),
+            raw_sql="SELECT id, name, amount * 2 as amount, id || name as label FROM table_a",
+            columns={c: DbtColumn(name=c, description="") for c in ("id", "name", "amount", "label", "ghost")},
+            dependencies=["model.a"],
+        ),
+        "model.c": DbtModel(
+            unique_id="model.c",
+            model_name="table_c",
+            file_path=Path("models/c.sql"),
+            raw_sql="SELECT a.id, b.label, a.amount + b.amount as total FROM table_a a JOIN table_b b ON a.id = b.id",
+            columns={c: DbtColumn(name=c, description="") for c in ("id", "label", "total")},
+            dependencies=["model.a", "model.b"],
+        ),
+        "model.broken": DbtModel(
+            unique_id="model.broken",
+            model_name="broken",
+            file_path=Path("models/broken.sql"),
+            raw_sql="SELECT FROM WHERE (",
+            columns={"x": DbtColumn(name="x", description="")},
+        ),
+    }
+    return DbtProject(models=models)
+
+
+def _lineage_snapshot(project):
+    return {
+        (uid, name): (
+            [(r.model_unique_id, r.column_name) for r in col.upstream_columns],
+            [(r.model_unique_id, r.column_name) for r in col.downstream_columns],
+        )
+        for uid, model in project.models.items()
+        for name, col in model.columns.items()
+    }
+
+
+def test_lineage_analyzer_parallel_matches_serial():
+    import warnings
+
+    results = []
+    for jobs in (1, 2):
+        project = _build_chain_project()
+        analyzer = LineageAnalyzer(dialect="duckdb", jobs=jobs)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            analyzer.analyze(project)
+        results.append((_lineage_snapshot(project), [str(w.message) for w in caught], analyzer.model_warnings))
+
+    assert results[0] == results[1]
+    snapshot, messages, _ = results[0]
+    assert snapshot[("model.c", "total")][0] == [("model.a", "amount"), ("model.b", "amount")]
+    assert len(messages) == 2
+    assert "ghost" in messages[0] and "broken" in messages[1]
+
+
+@pytest.mark.parametrize("sql", [
+    "WITH s AS (SELECT id, amount * 2 AS amt FROM a) SELECT s.id, amt AS amount FROM s",
+    "WITH s AS (SELECT id, amount FROM a UNION ALL SELECT id, amount FROM b) SELECT id, amount FROM s",
+    "SELECT id, (SELECT MAX(amount) FROM b WHERE b.id = a.id) AS amount FROM a",
+    "SELECT t.id, t.amount FROM (SELECT a.id, a.amount + b.amount AS amount FROM a JOIN b ON a.id = b.id) t",
+    "WITH b AS (SELECT id, y AS amount FROM b) SELECT a.id, b.amount FROM a JOIN b USING (id)",
+    "SELECT id, amount FROM a UNION SELECT id, amount FROM b",
+])
+def test_model_column_resolver_matches_per_column_lineage(sql):
+    from sqlglot.lineage import lineage
+    from modaryn.analyzers.column_resolver import ModelColumnResolver, node_source
+    from modaryn.analyzers.project_schema import ProjectSchema
+
+    schema = {
+        "a": {"id": "UNKNOWN", "amount": "UNKNOWN"},
+        "b": {"id": "UNKNOWN", "amount": "UNKNOWN", "y": "UNKNOWN"},
+    }
+    analyzer = LineageAnalyzer(dialect="duckdb")
+    scope = analyzer._build_scope(sql, ProjectSchema(schema, "duckdb"))
+    resolver = ModelColumnResolver(scope, "duckdb")
+
+    for column in ("id", "amount"):
+        node = lineage(column, sql=scope.expression, dialect="duckdb", scope=scope, copy=False)
+        expected = {node_source(n.name, n.expression) for n in node.walk()} - {None}
+        assert set(resolver.resolve(column)) == expected
+
+
+def test_project_schema_view_is_limited_to_referenced_tables():
+    import sqlglot
+    from modaryn.analyzers.project_schema import ProjectSchema
+
+    schema = ProjectSchema(
+        {"table_a": {"id": "UNKNOWN"}, "table_b": {"id": "UNKNOWN", "amount": "UNKNOWN"}, "table_c": {"x": "UNKNOWN"}},
+        "snowflake",
+    )
+    view = schema.view(sqlglot.parse_one("SELECT a.id, b.amount FROM table_a a JOIN Table_B b ON a.id = b.id", read="snowflake"))
+
+    # Normalized once for the dialect (Snowflake uppercases); only the referenced tables are visible.
+    assert set(view.mapping) == {"TABLE_A", "TABLE_B"}
+    assert view.column_names("TABLE_B") == ["ID", "AMOUNT"]
+
+
+def test_lineage_analyzer_resolves_columns_in_one_attempt_and_reports_stats():
+    model_a = DbtModel(
+        unique_id="model.a",
+        model_name="table_a",
+        file_path=Path("models/a.sql"),
+        raw_sql="SELECT 1 AS id, 2 AS amount",
+        columns={c: DbtColumn(name=c, description="") for c in ("id", "amount")}
+    )
+    model_b = DbtModel(
+        unique_id="model.b",
+        model_name="table_b",
+        file_path=Path("models/b.sql"),
+        raw_sql='SELECT ID, amount AS "Total" FROM table_a',
+        columns={c: DbtColumn(name=c, description="") for c in ("id", "total", "missing")},
+        dependencies=["model.a"]
+    )
+    project = DbtProject(models={"model.a": model_a, "model.b": model_b})
+
+    analyzer = LineageAnalyzer(dialect="postgres")
+    with pytest.warns(UserWarning, match="Cannot find column 'missing' in query"):
+        analyzer.analyze(project)
+
+    assert [ref.column_name for ref in model_b.columns["id"].upstream_columns] == ["id"]
+    # "total" is only projected as the quoted "Total": matched by the case-insensitive fallback.
+    assert [ref.column_name for ref in model_b.columns["total"].upstream_columns] == ["amount"]
+
+    stats = analyzer.resolution_stats["postgres"]
+    # Both spellings of "total" fold to the same name, so the case-insensitive match is the 2nd try.
+    assert stats.attempts == {1: 3, 2: 1}
+    assert stats.retried == 1
+    assert stats.unresolved == 1
+
+
+def test_lineage_analyzer_reports_unparseable_model_once():
+    import warnings
+
+    broken = DbtModel(
+        unique_id="model.broken",
+        model_name="broken",
+        file_path=Path("models/broken.sql"),
+        raw_sql="SELECT FROM WHERE (",
+        columns={f"col_{i}": DbtColumn(name=f"col_{i}", description="") for i in range(50)},
+    )
+    python_model = DbtModel(
+        unique_id="model.py",
+        model_name="py",
+        file_path=Path("models/py.py"),
+        raw_sql="def model(dbt, session):\n    return dbt.ref('broken')",
+        columns={"id": DbtColumn(name="id", description="")},
+        language="python",
+    )
+    project = DbtProject(models={"model.broken": broken, "model.py": python_model})
+
+    analyzer = LineageAnalyzer(dialect="duckdb")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        analyzer.analyze(project)
+
+    messages = [str(w.message) for w in caught]
+    assert len(messages) == 1
+    assert messages[0].startswith("Lineage unavailable for model 'broken' (50 column(s) skipped): ParseError")
+    assert analyzer.unresolved_columns("model.broken") is None
+    # Parsed once for the whole model; the Python model is never parsed.
+    assert analyzer.parse_cache.parse_count == 1
+    assert analyzer.resolution_stats["duckdb"].resolved == 0
+
+
+def test_lineage_analyzer_passthrough_models_match_full_resolution(monkeypatch):
+    import modaryn.analyzers.lineage as lineage_module
+
+    def build_project():
+        columns = ("id", "amount", "name")
+        return DbtProject(models={
+            "model.a": DbtModel(
+                unique_id="model.a", model_name="table_a", file_path=Path("models/a.sql"),
+                raw_sql="SELECT 1 AS id, 2 AS amount, 'x' AS name",
+                columns={c: DbtColumn(name=c, description="") for c in columns},
+            ),
+            "model.star": DbtModel(
+                unique_id="model.star", model_name="star", file_path=Path("models/star.sql"),
+                raw_sql="SELECT * FROM table_a",
+                columns={c: DbtColumn(name=c, description="") for c in columns},
+                dependencies=["model.a"],
+            ),
+            "model.renamed": DbtModel(
+                unique_id="model.renamed", model_name="renamed", file_path=Path("models/renamed.sql"),
+                raw_sql="SELECT s.id AS star_id, amount AS total, missing FROM star AS s WHERE s.id > 0",
+                columns={c: DbtColumn(name=c, description="") for c in ("star_id", "total", "missing")},
+                dependencies=["model.star"],
+            ),
+        })
+
+    fast = build_project()
+    analyzer = LineageAnalyzer(dialect="duckdb")
+    analyzer.analyze(fast)
+    assert analyzer.resolution_stats["duckdb"].passthrough_models == 2
+
+    monkeypatch.setattr(lineage_module, "passthrough_sources", lambda *args: None)
+    full = build_project()
+    LineageAnalyzer(dialect="duckdb").analyze(full)
+
+    assert _lineage_snapshot(fast) == _lineage_snapshot(full)
+    assert [(r.model_unique_id, r.column_name) for r in fast.models["model.renamed"].columns["total"].upstream_columns] == [("model.star", "amount")]
+    assert fast.models["model.renamed"].columns["missing"].upstream_columns == ()
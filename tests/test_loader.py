@@ -0,0 +1,146 @@
+import json
+
+import pytest
+
+from modaryn.analyzers.lineage import LineageAnalyzer
+from modaryn.loaders.manifest import ManifestLoader, apply_select
+from modaryn.loaders.stream import iter_manifest, resolve_artifact_path
+from tests.helpers import dbt_test_node, model_node, write_project
+
+
+@pytest.fixture
+def demo_nodes():
+    return {
+        # Test listed before its model to exercise deferred linking.
+        "test.demo.not_null_b_id": dbt_test_node("model.demo.b", "id"),
+        "model.demo.a": model_node("a", columns=["id", "name"]),
+        "model.demo.b": model_node("b", columns=["id"], depends_on=["model.demo.a"], tags=["daily"]),
+        "test.demo.unique_a_id": dbt_test_node("model.demo.a", "id"),
+        "test.demo.model_level_b": dbt_test_node("model.demo.b"),
+        "seed.demo.raw": {"resource_type": "seed", "name": "raw"},
+    }
+
+
+@pytest.fixture
+def demo_sql():
+    return {
+        "a": "select 1 as id, 'x' as name",
+        "b": "select a.id from a join a as a2 on a.id = a2.id",
+    }
+
+
+def test_iter_manifest_streams_nodes_and_skips_other_sections(tmp_path, demo_nodes, demo_sql):
+    write_project(tmp_path, demo_nodes, demo_sql)
+    entries = list(iter_manifest(tmp_path / "target" / "manifest.json"))
+
+    assert entries[0] == ("metadata", None, {"adapter_type": "duckdb"})
+    assert [key for section, key, _ in entries[1:]] == list(demo_nodes)
+    assert all(section == "nodes" for section, _, _ in entries[1:])
+
+
+def test_iter_manifest_handles_values_across_chunk_boundaries(tmp_path, monkeypatch):
+    import modaryn.loaders.stream as stream
+
+    monkeypatch.setattr(stream, "_CHUNK_SIZE", 7)
+    path = tmp_path / "manifest.json"
+    nodes = {f"model.demo.m{i}": {"name": f"m{i}", "n": 12345678901234, "s": "é" * i} for i in range(20)}
+    path.write_text(json.dumps({"nodes": nodes, "metadata": {"adapter_type": "snowflake"}}))
+
+    entries = list(iter_manifest(path))
+    assert {key: value for section, key, value in entries if section == "nodes"} == nodes
+    assert entries[-1] == ("metadata", None, {"adapter_type": "snowflake"})
+
+
+def test_loader_links_tests_in_single_pass(tmp_path, demo_nodes, demo_sql):
+    project = ManifestLoader(write_project(tmp_path, demo_nodes, demo_sql)).load()
+
+    model_a = project.get_model("model.demo.a")
+    model_b = project.get_model("model.demo.b")
+    assert set(project.models) == {"model.demo.a", "model.demo.b"}
+    assert model_a.test_count == 1
+    assert model_a.columns["id"].test_count == 1
+    assert model_b.test_count == 2
+    assert model_b.columns["id"].test_count == 1
+    assert model_b.tags == ["daily"]
+    assert model_b.parents == {"model.demo.a": model_a}
+    assert model_b.complexity.join_count == 1
+    assert {unique_id: test.attachments for unique_id, test in project.tests.items()} == {
+        "test.demo.not_null_b_id": [("model.demo.b", "id")],
+        "test.demo.unique_a_id": [("model.demo.a", "id")],
+        "test.demo.model_level_b": [("model.demo.b", None)],
+    }
+
+
+def test_loader_reads_gzip_manifest(tmp_path, demo_nodes, demo_sql):
+    write_project(tmp_path, demo_nodes, demo_sql, adapter_type="snowflake", compress="gzip")
+    loader = ManifestLoader(tmp_path)
+
+    assert loader.manifest_path == resolve_artifact_path(tmp_path / "target" / "manifest.json")
+    assert loader.manifest_path.name == "manifest.json.gz"
+    assert loader.detect_dialect() == "snowflake"
+    project = loader.load()
+    assert loader.dialect == "snowflake"
+    assert project.get_model("model.demo.b").columns["id"].test_count == 1
+
+
+def test_loader_parallel_jobs_match_serial(tmp_path, demo_nodes, demo_sql):
+    write_project(tmp_path, demo_nodes, demo_sql)
+    serial = ManifestLoader(tmp_path).load()
+    parallel = ManifestLoader(tmp_path, jobs=2).load()
+
+    assert list(parallel.models) == list(serial.models)
+    for unique_id, model in serial.models.items():
+        assert parallel.models[unique_id].raw_sql == model.raw_sql
+        assert parallel.models[unique_id].complexity == model.complexity
+
+
+def test_loader_skips_python_models_without_reading_code(tmp_path, demo_nodes, demo_sql):
+    import warnings
+
+    demo_nodes["model.demo.py_model"] = {**model_node("py_model", columns=["id"], depends_on=["model.demo.a"]), "language": "python"}
+    write_project(tmp_path, demo_nodes, demo_sql)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # no "compiled SQL not found" warning for Python models
+        project = ManifestLoader(tmp_path).load()
+
+    py_model = project.models["model.demo.py_model"]
+    assert py_model.language == "python"
+    assert py_model.raw_sql == ""
+    assert py_model.complexity is None
+    assert project.models["model.demo.a"].language == "sql"
+
+
+def test_loader_select_reads_only_the_lineage_boundary(tmp_path, demo_nodes, demo_sql):
+    import warnings
+
+    demo_nodes["model.demo.c"] = model_node("c", columns=["id"], depends_on=["model.demo.b"])
+    # No compiled SQL: reading it would warn.
+    demo_nodes["model.demo.unrelated"] = model_node("unrelated", columns=["id"])
+    write_project(tmp_path, demo_nodes, {**demo_sql, "c": "select id from b"})
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        project = ManifestLoader(tmp_path, select=["b"]).load()
+    LineageAnalyzer(dialect="duckdb").analyze(project)
+
+    model_b = project.models["model.demo.b"]
+    assert list(project.models) == ["model.demo.b"]
+    assert list(project.context_models) == ["model.demo.a", "model.demo.c"]
+    # The parent only contributes its declared columns; the child is traced for b's downstream edges.
+    assert project.context_models["model.demo.a"].raw_sql == ""
+    assert project.context_models["model.demo.c"].complexity is None
+    assert model_b.complexity is not None
+    assert model_b.downstream_model_count == 1
+    assert model_b.downstream_column_count == 1
+    assert set(project.tests) == {"test.demo.not_null_b_id", "test.demo.model_level_b"}
+
+
+def test_apply_select_returns_a_closed_sub_dag(tmp_path, demo_nodes, demo_sql):
+    demo_nodes["model.demo.c"] = model_node("c", columns=["id"], depends_on=["model.demo.b"])
+    write_project(tmp_path, demo_nodes, {**demo_sql, "c": "select id from b"})
+    project = apply_select(ManifestLoader(tmp_path).load(), ["+b"])
+
+    assert list(project.models) == ["model.demo.a", "model.demo.b"]
+    assert list(project.models["model.demo.b"].children) == []
+    assert list(project.models["model.demo.a"].children) == ["model.demo.b"]
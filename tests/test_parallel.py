@@ -0,0 +1,35 @@
+import pytest
+
+import modaryn.parallel as parallel
+from modaryn.parallel import available_cpus, resolve_jobs
+
+
+def test_resolve_jobs_accepts_integers():
+    assert resolve_jobs(None) == 1
+    assert resolve_jobs("4") == 4
+    assert resolve_jobs(2) == 2
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "many"])
+def test_resolve_jobs_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        resolve_jobs(value)
+
+
+def test_resolve_jobs_auto_respects_cgroup_v2_quota(tmp_path, monkeypatch):
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("150000 100000\n")
+    monkeypatch.setattr(parallel, "_CGROUP_V2_CPU_MAX", cpu_max)
+    monkeypatch.setattr(parallel.os, "sched_getaffinity", lambda _pid: set(range(64)), raising=False)
+
+    assert resolve_jobs("auto") == 2
+
+
+def test_available_cpus_ignores_unlimited_cgroup(tmp_path, monkeypatch):
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("max 100000\n")
+    monkeypatch.setattr(parallel, "_CGROUP_V2_CPU_MAX", cpu_max)
+    monkeypatch.setattr(parallel, "_CGROUP_V1_QUOTA", tmp_path / "missing")
+    monkeypatch.setattr(parallel.os, "sched_getaffinity", lambda _pid: {0, 1, 2}, raising=False)
+
+    assert available_cpus() == 3
@@ -0,0 +1,67 @@
+from modaryn.analyzers.impact import ImpactAnalyzer
+from modaryn.analyzers.lineage import LineageAnalyzer
+from modaryn.analyzers.reachability import ReachabilityIndex, manifest_fingerprint
+from modaryn.domain.model import DbtProject
+from tests.helpers import sql_project
+
+
+MODELS = [
+    ("orders", "SELECT 1 AS id, 10 AS amount", ["id", "amount"]),
+    ("stg_orders", "SELECT id, amount FROM orders", ["id", "amount"], ["orders"]),
+    ("fct_revenue", "SELECT id, SUM(amount) AS revenue FROM stg_orders GROUP BY id", ["id", "revenue"], ["stg_orders"]),
+    ("fct_ids", "SELECT id FROM stg_orders", ["id"], ["stg_orders"]),
+]
+
+
+def _project() -> DbtProject:
+    project = sql_project(MODELS)
+    LineageAnalyzer(dialect="duckdb").analyze(project)
+    return project
+
+
+def test_index_answers_like_a_full_impact_analysis():
+    project = _project()
+    index = ReachabilityIndex.build(project, "fingerprint")
+    impact = ImpactAnalyzer(project)
+
+    for unique_id, model in project.models.items():
+        for column in model.columns:
+            hops = impact.downstream(unique_id, column)
+            assert index.downstream_many([(unique_id, column)]).by_hop == hops
+            column_id = index.column_id(unique_id, column)
+            reached = sorted(index.column_id(*key) for keys in hops.values() for key in keys)
+            assert index.reachable(column_id) == reached
+            assert index.reachable_count(column_id) == len(reached)
+
+
+def test_blast_radius_counts_columns_and_models():
+    index = ReachabilityIndex.build(_project(), "fingerprint")
+    radius = {key: (columns, models) for key, columns, models in index.blast_radius()}
+
+    # orders.id -> stg_orders.id -> fct_revenue.id, fct_ids.id
+    assert radius[("model.orders", "id")] == (3, 3)
+    assert radius[("model.orders", "amount")] == (2, 2)
+    assert ("model.fct_ids", "id") not in radius
+
+
+def test_index_round_trips_and_is_rejected_for_another_manifest(tmp_path):
+    project = _project()
+    index = ReachabilityIndex.build(project, "fingerprint")
+    index.write(tmp_path)
+
+    loaded = ReachabilityIndex.read(tmp_path, "fingerprint")
+    assert loaded is not None
+    assert loaded.downstream_many([("model.orders", "id")]).by_hop == index.downstream_many([("model.orders", "id")]).by_hop
+    assert ReachabilityIndex.read(tmp_path, "other") is None
+    assert ReachabilityIndex.read(tmp_path / "missing", "fingerprint") is None
+
+
+def test_fingerprint_follows_manifest_stat_and_dialect(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text("{}")
+    fingerprint = manifest_fingerprint(manifest, "duckdb")
+
+    assert manifest_fingerprint(manifest, "duckdb") == fingerprint
+    assert manifest_fingerprint(manifest, "snowflake") != fingerprint
+    manifest.write_text('{"nodes": {}}')
+    assert manifest_fingerprint(manifest, "duckdb") != fingerprint
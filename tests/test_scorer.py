@@ -1,4 +1,6 @@
 from modaryn.scorers.score import Scorer
+from modaryn.domain.features import FeatureMatrix
+from modaryn.scorers.sweep import load_grid, rank_correlation
 from modaryn.domain.model import DbtProject, DbtModel, SqlComplexityResult
 from pathlib import Path
 import pytest
@@ -177,3 +179,77 @@ def test_score_project_calculates_statistics():
     assert pytest.approx(single_model_project.statistics.median, abs=1e-3) == 10.0
     assert pytest.approx(single_model_project.statistics.std_dev, abs=1e-3) == 0.0
 
+
+
+def test_score_project_exposes_a_columnar_score_table():
+    scorer = Scorer()
+    project = create_dummy_project({
+        "model.test.a": {"model_name": "a", "join_count": 1},
+        "model.test.b": {"model_name": "b", "join_count": 3},
+        "model.test.c": {"model_name": "c", "join_count": 1},
+        "model.test.d": {"model_name": "d"},
+    })
+    project.models["model.test.d"].complexity = None
+    scorer.weights = {"sql_complexity": {"join_count": 1.0}, "quality": {"test_count": 0.5}}
+    project.models["model.test.c"].test_count = 4
+
+    scorer.score_project(project, apply_zscore=True)
+    table = project.score_table
+
+    assert table.features.unique_ids == list(project.models)
+    assert table.features.column("join_count").tolist() == [1.0, 3.0, 1.0, 0.0]
+    assert table.features.has_complexity.tolist() == [True, True, True, False]
+    # c: 1 join - 2.0 quality is clamped to 0, tying with d; ties keep project order.
+    assert table.raw_scores.tolist() == [1.0, 3.0, 0.0, 0.0]
+    assert table.quality_scores.tolist() == [0.0, 0.0, 2.0, 0.0]
+    assert table.ranking(apply_zscore=True).tolist() == [1, 0, 2, 3]
+    assert [m.score for m in project.models.values()] == table.scores.tolist()
+
+
+def test_score_features_scores_a_matrix_without_touching_the_models():
+    scorer = Scorer()
+    project = create_dummy_project({
+        "model.test.a": {"model_name": "a", "join_count": 2, "cte_count": 1},
+        "model.test.b": {"model_name": "b", "join_count": 1},
+    })
+    features = FeatureMatrix.from_project(project)
+    scorer.weights = {"sql_complexity": {"join_count": 1.0, "cte_count": 10.0}}
+
+    table = scorer.score_features(features)
+
+    assert table.raw_scores.tolist() == [12.0, 1.0]
+    assert table.scores is None
+    assert all(m.raw_score == 0.0 for m in project.models.values())
+
+
+def test_needs_column_lineage_only_while_a_lineage_weight_is_set(tmp_path):
+    assert Scorer().needs_column_lineage
+    config = tmp_path / "no_lineage.yml"
+    config.write_text(
+        "importance:\n  downstream_column_count: 0\n  downstream_column_model_spread: 0\n"
+        "quality:\n  untested_downstream_column_penalty: 0\n"
+    )
+    assert not Scorer(config).needs_column_lineage
+    assert Scorer(config, overrides={"quality": {"untested_downstream_column_penalty": 0.1}}).needs_column_lineage
+
+
+def test_load_grid_expands_every_combination(tmp_path):
+    grid = tmp_path / "grid.yml"
+    grid.write_text("importance:\n  downstream_column_count: [0.1, 0.2]\nquality:\n  test_count: [0, 1]\n  column_coverage: 0.5\n")
+
+    combinations = load_grid(grid)
+
+    assert [label for label, _ in combinations] == [
+        "downstream_column_count=0.1, test_count=0, column_coverage=0.5",
+        "downstream_column_count=0.1, test_count=1, column_coverage=0.5",
+        "downstream_column_count=0.2, test_count=0, column_coverage=0.5",
+        "downstream_column_count=0.2, test_count=1, column_coverage=0.5",
+    ]
+    assert combinations[1][1] == {"importance": {"downstream_column_count": 0.1}, "quality": {"test_count": 1, "column_coverage": 0.5}}
+    assert Scorer(overrides=combinations[1][1]).weights["quality"]["test_count"] == 1
+
+
+def test_rank_correlation_uses_average_ranks_for_ties():
+    assert rank_correlation(np.array([1.0, 2.0, 3.0]), np.array([3.0, 2.0, 1.0])) == pytest.approx(-1.0)
+    assert rank_correlation(np.array([0.0, 0.0, 5.0, 1.0]), np.array([0.0, 0.0, 9.0, 2.0])) == pytest.approx(1.0)
+    assert rank_correlation(np.array([1.0, 1.0]), np.array([1.0, 2.0])) is None
@@ -0,0 +1,64 @@
+import pytest
+
+from modaryn.domain.model import DbtModel
+from modaryn.loaders.selector import SelectorIndex, parse_selector
+
+
+def _model(name, depends_on=(), tags=(), path=None):
+    return DbtModel(
+        unique_id=f"model.demo.{name}",
+        model_name=name,
+        file_path=path or f"{name}.sql",
+        raw_sql="",
+        dependencies=[f"model.demo.{dep}" for dep in depends_on],
+        tags=list(tags),
+    )
+
+
+@pytest.fixture
+def index():
+    # raw_a -> stg_a -> int_ab -> fct_ab -> rpt_ab
+    # raw_b -> stg_b ---^   other (reads stg_b) ; lone
+    return SelectorIndex([
+        _model("raw_a", path="staging/raw_a.sql"),
+        _model("raw_b", path="staging/raw_b.sql"),
+        _model("stg_a", ["raw_a"], tags=["daily"], path="staging/stg_a.sql"),
+        _model("stg_b", ["raw_b"], path="staging/stg_b.sql"),
+        _model("int_ab", ["stg_a", "stg_b"], path="intermediate/int_ab.sql"),
+        _model("fct_ab", ["int_ab"], tags=["daily"], path="marts/fct_ab.sql"),
+        _model("rpt_ab", ["fct_ab"], path="marts/reports/rpt_ab.sql"),
+        _model("other", ["stg_b"], path="marts_old/other.sql"),
+        _model("lone"),
+    ])
+
+
+def _names(unique_ids):
+    return [unique_id.rsplit(".", 1)[1] for unique_id in unique_ids]
+
+
+def test_parse_selector_reads_graph_operators():
+    selector = parse_selector("2+tag:daily+")
+    assert (selector.method, selector.value, selector.parents, selector.children, selector.at) == ("tag", "daily", 2, -1, False)
+    selector = parse_selector("@path:marts/")
+    assert (selector.method, selector.value, selector.parents, selector.children, selector.at) == ("path", "marts", None, None, True)
+    assert parse_selector("fct_*").pattern is not None
+    assert parse_selector("fct_ab").pattern is None
+    with pytest.raises(ValueError):
+        parse_selector("@+fct_ab")
+
+
+def test_select_matches_names_tags_and_path_prefixes(index):
+    assert _names(index.select(["stg_*"])) == ["stg_a", "stg_b"]
+    assert _names(index.select(["tag:daily"])) == ["stg_a", "fct_ab"]
+    # Path prefixes match like str.startswith, as before.
+    assert _names(index.select(["path:marts/"])) == ["fct_ab", "rpt_ab", "other"]
+    assert _names(index.select(["lone", "path:marts/reports"])) == ["rpt_ab", "lone"]
+
+
+def test_select_applies_graph_operators_over_the_dag(index):
+    assert _names(index.select(["+int_ab"])) == ["raw_a", "raw_b", "stg_a", "stg_b", "int_ab"]
+    assert _names(index.select(["1+int_ab"])) == ["stg_a", "stg_b", "int_ab"]
+    assert _names(index.select(["stg_a+"])) == ["stg_a", "int_ab", "fct_ab", "rpt_ab"]
+    assert _names(index.select(["stg_b+1"])) == ["stg_b", "int_ab", "other"]
+    # @: the model, its descendants and every ancestor of those.
+    assert _names(index.select(["@stg_a"])) == ["raw_a", "raw_b", "stg_a", "stg_b", "int_ab", "fct_ab", "rpt_ab"]
@@ -0,0 +1,105 @@
+import shutil
+import warnings
+
+from typer.testing import CliRunner
+
+from modaryn.analyzers.lineage import LineageAnalyzer
+from modaryn.cli import app
+from modaryn.loaders.manifest import ManifestLoader
+from modaryn.loaders.state import STATE_FILE_NAME, AnalysisState
+from tests.helpers import model_node, write_project
+
+runner = CliRunner()
+
+NODES = {
+    "model.demo.a": model_node("a", columns=["id", "name"]),
+    "model.demo.b": model_node("b", columns=["id", "name"], depends_on=["model.demo.a"]),
+    "model.demo.c": model_node("c", columns=["id", "label"], depends_on=["model.demo.b"]),
+    "model.demo.d": model_node("d", columns=["id"], depends_on=["model.demo.c"]),
+    "model.demo.e": model_node("e", columns=["name"], depends_on=["model.demo.a"]),
+}
+SQL = {
+    "a": "select 1 as id, 'x' as name",
+    "b": "select id, name from a",
+    "c": "select id, name as label from b",
+    "d": "select id from c",
+    "e": "select name from a where id > 0",
+}
+
+
+def _analyze(project_path, state_path=None):
+    loader = ManifestLoader(project_path, state_path=state_path)
+    project = loader.load()
+    analyzer = LineageAnalyzer(dialect=loader.dialect, parse_cache=loader.parse_cache)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        analyzer.analyze(project, reuse=loader.lineage_reuse)
+    return loader, analyzer, project
+
+
+def _edges(project):
+    return {
+        (unique_id, name): (
+            sorted((r.model_unique_id, r.column_name) for r in column.upstream_columns),
+            sorted((r.model_unique_id, r.column_name) for r in column.downstream_columns),
+        )
+        for unique_id, model in project.models.items()
+        for name, column in model.columns.items()
+    }
+
+
+def _snapshot_previous_run(tmp_path):
+    prod = tmp_path / "prod"
+    prod.mkdir()
+    write_project(prod, {k: dict(v) for k, v in NODES.items()}, SQL)
+    loader, analyzer, project = _analyze(prod)
+    loader.write_state(project, analyzer.model_warnings, analyzer.unresolved)
+    state_dir = tmp_path / "state"
+    shutil.copytree(prod / "target", state_dir)
+    return state_dir
+
+
+def test_state_reanalyzes_only_changed_models_and_direct_children(tmp_path):
+    state_dir = _snapshot_previous_run(tmp_path)
+    pr = tmp_path / "pr"
+    pr.mkdir()
+    changed_sql = dict(SQL, b="select id, upper(name) as name from a")
+    write_project(pr, {k: dict(v) for k, v in NODES.items()}, changed_sql)
+
+    loader, _, project = _analyze(pr, state_path=state_dir)
+    _, _, full = _analyze(pr)
+
+    # b changed, c is its direct child; a, d and e are reused from the snapshot.
+    assert set(loader.state_reuse) == {"model.demo.a", "model.demo.d", "model.demo.e"}
+    assert loader.parse_cache.parse_count == 2
+    assert _edges(project) == _edges(full)
+    for unique_id, model in full.models.items():
+        assert project.models[unique_id].complexity == model.complexity
+
+
+def test_state_detects_column_set_changes(tmp_path):
+    state_dir = _snapshot_previous_run(tmp_path)
+    pr = tmp_path / "pr"
+    pr.mkdir()
+    nodes = {k: dict(v) for k, v in NODES.items()}
+    nodes["model.demo.a"] = model_node("a", columns=["id"])
+    write_project(pr, nodes, SQL)
+
+    loader, _, project = _analyze(pr, state_path=state_dir)
+
+    assert set(loader.state_reuse) == {"model.demo.c", "model.demo.d"}
+    assert project.models["model.demo.e"].columns["name"].upstream_columns == ()
+
+
+def test_score_with_state_writes_and_reuses_snapshot(tmp_path):
+    write_project(tmp_path, {k: dict(v) for k, v in NODES.items()}, SQL)
+    result = runner.invoke(app, ["score", "--project-path", str(tmp_path), "--no-cache"])
+    assert result.exit_code == 0
+    assert AnalysisState.read(tmp_path / "target") is not None
+
+    state_dir = tmp_path / "state"
+    shutil.copytree(tmp_path / "target", state_dir)
+    result = runner.invoke(app, ["score", "--project-path", str(tmp_path), "--no-cache", "--state", str(state_dir)])
+    assert result.exit_code == 0
+    assert "5 of 5 model(s)" in result.stdout
+    assert (state_dir / STATE_FILE_NAME).exists()
@@ -0,0 +1,66 @@
+from modaryn.analyzers.lineage import LineageAnalyzer
+from modaryn.analyzers.traversal import ColumnTraversal
+from tests.helpers import sql_project
+
+
+MODELS = [
+    ("orders", "SELECT 1 AS id, 10 AS amount", ["id", "amount"]),
+    ("refunds", "SELECT 1 AS id, 2 AS refunded", ["id", "refunded"]),
+    ("stg_orders", "SELECT id, amount FROM orders", ["id", "amount"], ["orders"]),
+    (
+        "fct_net",
+        "SELECT o.id, o.amount - r.refunded AS net FROM stg_orders AS o JOIN refunds AS r ON o.id = r.id",
+        ["id", "net"],
+        ["stg_orders", "refunds"],
+    ),
+    ("rpt_net", "SELECT id, net FROM fct_net", ["id", "net"], ["fct_net"]),
+]
+
+
+def test_upstream_walk_resolves_root_sources_and_traces_only_ancestors():
+    traversal = ColumnTraversal(sql_project(MODELS), LineageAnalyzer(dialect="duckdb"))
+
+    result = traversal.upstream("model.rpt_net", "net")
+
+    assert result.by_hop == {
+        1: [("model.fct_net", "net")],
+        2: [("model.refunds", "refunded"), ("model.stg_orders", "amount")],
+        3: [("model.orders", "amount")],
+    }
+    assert traversal.root_sources("model.rpt_net", "net") == [("model.orders", "amount"), ("model.refunds", "refunded")]
+    assert traversal.root_sources("model.orders", "amount") == []
+    assert traversal.traced == {"model.rpt_net", "model.fct_net", "model.stg_orders", "model.refunds", "model.orders"}
+
+
+def test_root_sources_trace_each_upstream_level_at_once():
+    analyzer = LineageAnalyzer(dialect="duckdb")
+    calls = []
+    trace_models = analyzer.trace_models
+    analyzer.trace_models = lambda project, unique_ids: calls.append(list(unique_ids)) or trace_models(project, unique_ids)
+
+    roots = ColumnTraversal(sql_project(MODELS), analyzer).root_sources("model.rpt_net", "net")
+
+    assert roots == [("model.orders", "amount"), ("model.refunds", "refunded")]
+    assert calls == [["model.rpt_net"], ["model.fct_net"], ["model.refunds", "model.stg_orders"], ["model.orders"]]
+
+
+def test_walks_stop_at_depth_and_result_limits():
+    project = sql_project(MODELS)
+    LineageAnalyzer(dialect="duckdb").analyze(project)
+    traversal = ColumnTraversal(project)
+
+    full = traversal.downstream("model.orders", "amount")
+    assert full.by_hop == {1: [("model.stg_orders", "amount")], 2: [("model.fct_net", "net")], 3: [("model.rpt_net", "net")]}
+    assert not full.truncated and not full.depth_limited
+
+    shallow = traversal.downstream("model.orders", "amount", max_depth=2)
+    assert shallow.by_hop == {1: [("model.stg_orders", "amount")], 2: [("model.fct_net", "net")]}
+    assert shallow.depth_limited
+    # rpt_net.net feeds nothing, so stopping right after it loses nothing.
+    exact = traversal.downstream("model.orders", "amount", max_depth=3)
+    assert exact.by_hop == full.by_hop
+    assert not exact.depth_limited
+
+    capped = traversal.upstream("model.rpt_net", "net", max_results=2)
+    assert capped.by_hop == {1: [("model.fct_net", "net")], 2: [("model.refunds", "refunded")]}
+    assert capped.truncated and capped.count == 2